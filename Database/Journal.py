@@ -7,25 +7,39 @@ import os,sys
 print(f">>> Debug: importing file {os.path.abspath(__file__)} as module __name__={__name__}")
 matching = [n for n in sys.modules if n.lower().endswith('database.journal') or 'journal' in n.lower()]
 print(">>> sys.modules matching 'journal':", matching)
-from datetime import datetime, date
-from typing import Optional, List, Dict, Any
+from datetime import datetime, date, timedelta
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 import uuid
+import re
+import math
+import json
+import base64
+import bisect
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 # Import shared Base & engine
-from Database.db import Base, engine, SessionLocal, get_db
+from Database.db import Base, engine, SessionLocal, get_db, get_session_stats, DEBUG_SESSIONS
+from Database.summary_counts import TOP_EMOTIONS_PER_ENTRY, contribution as summary_contribution
 from backend.Auth.models import User
 
 
 # PostgreSQL imports
-from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, DateTime, Date, Text, JSON
+from sqlalchemy import create_engine, Column, String, Integer, SmallInteger, Float, Boolean, DateTime, Date, Text, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, UniqueConstraint, Index, select, insert, update, delete, case, func, text, inspect, union_all, literal
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
 # MongoDB imports
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne, UpdateMany, ReturnDocument
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
 
 # Environment variables
 from dotenv import load_dotenv
@@ -43,11 +57,22 @@ MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/")
 mongo_client = MongoClient(MONGO_URL)
 mongo_db = mongo_client.ecoapp
 journal_collection = mongo_db.journal_entries
+checkpoint_collection = mongo_db.job_checkpoints
+search_postings_collection = mongo_db.journal_search_postings
+search_stats_collection = mongo_db.journal_search_stats
+summary_collection = mongo_db.journal_summaries
+summary_daily_collection = mongo_db.journal_summary_daily
+reminder_collection = mongo_db.streak_reminders
+import_job_collection = mongo_db.journal_import_jobs
 
 class UserStats(Base):
     """PostgreSQL UserStats model for streak tracking"""
     __tablename__ = "user_stats"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        UniqueConstraint("user_id", name="uq_user_stats_user_id"),  # upsert conflict target
+        Index("ix_user_stats_last_entry_user", "last_entry_date", "user_id"),  # scheduled range scans
+        {'extend_existing': True}
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -59,6 +84,7 @@ class UserStats(Base):
     streak_frozen = Column(Boolean, default=False)
     freeze_count = Column(Integer, default=0)
     max_freezes_per_month = Column(Integer, default=3)
+    achievements_mask = Column(SmallInteger, nullable=False, default=0, server_default="0")  # bits from ACHIEVEMENT_BITS
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -68,8 +94,13 @@ class UserStats(Base):
 class StreakEvent(Base):
     """PostgreSQL model for tracking streak events"""
     __tablename__ = "streak_events"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_streak_events_user_created", "user_id", "created_at"),  # per-user time-range scans
+        # Monthly range partitions on Postgres, see ensure_streak_event_partitions()
+        {'extend_existing': True, 'postgresql_partition_by': 'RANGE (created_at)'}
+    )
     
+    # The partition key has to be part of the primary key
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     event_type = Column(String(50), nullable=False)  # 'continued', 'broken', 'frozen', 'milestone'
@@ -77,14 +108,28 @@ class StreakEvent(Base):
     previous_streak = Column(Integer, default=0)
     # metadata = Column(JSON, nullable=True)  # Additional event data
     meta_info = Column("metadata", JSON, nullable=True)  # ✅ safe name in Python, DB column still "metadata"
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
 
     user = relationship("User", back_populates="streak_events")
 
+class StreakEventRollup(Base):
+    """Per-user daily counts of streak events compacted out of streak_events"""
+    __tablename__ = "streak_event_rollups"
+    __table_args__ = {'extend_existing': True}
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    event_type = Column(String(50), primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+    max_streak = Column(Integer, nullable=False, default=0)
+
 class Achievement(Base):
     """PostgreSQL model for user achievements"""
     __tablename__ = "achievements"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        UniqueConstraint("user_id", "achievement_type", name="uq_achievements_user_type"),  # award once
+        {'extend_existing': True}
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -156,15 +201,220 @@ class DatabaseManager:
 #db_manager = DatabaseManager()
 
 
+logger = logging.getLogger(__name__)
+
+
+def _dialect_insert(db_session: Session, table):
+    """INSERT construct with ON CONFLICT support for the session's database"""
+    dialect = db_session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return dialect_insert(table)
+
+
+def ensure_streak_constraints():
+    """Add constraints and columns that create_all() cannot add to tables that already exist"""
+    with engine.begin() as connection:
+        columns = {column['name'] for column in inspect(connection).get_columns('user_stats')}
+        if 'achievements_mask' not in columns:
+            connection.execute(text(
+                "ALTER TABLE user_stats ADD COLUMN achievements_mask SMALLINT NOT NULL DEFAULT 0"
+            ))
+            # Backfill the mask from the achievements already awarded
+            bits = " ".join(
+                f"WHEN '{key}' THEN {bit}" for key, bit in ACHIEVEMENT_BITS.items()
+            )
+            connection.execute(text(
+                "UPDATE user_stats SET achievements_mask = ("
+                f" SELECT COALESCE(SUM(DISTINCT CASE achievement_type {bits} ELSE 0 END), 0)"
+                " FROM achievements WHERE achievements.user_id = user_stats.user_id)"
+            ))
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_user_stats_user_id ON user_stats (user_id)"
+        ))
+        # Keep the earliest copy of any achievement awarded twice before the constraint existed
+        connection.execute(text(
+            "DELETE FROM achievements WHERE EXISTS ("
+            " SELECT 1 FROM achievements earlier"
+            " WHERE earlier.user_id = achievements.user_id"
+            " AND earlier.achievement_type = achievements.achievement_type"
+            " AND (earlier.earned_at < achievements.earned_at"
+            " OR (earlier.earned_at = achievements.earned_at AND earlier.id < achievements.id)))"
+        ))
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_achievements_user_type "
+            "ON achievements (user_id, achievement_type)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_streak_events_user_created "
+            "ON streak_events (user_id, created_at)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_user_stats_last_entry_user "
+            "ON user_stats (last_entry_date, user_id)"
+        ))
+    ensure_streak_event_partitions()
+
+
+def month_start(day: date, months: int = 0) -> date:
+    """First day of the month `months` after (or before) the month containing day"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partition(connection, month: date):
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS streak_events_p{month:%Y%m} PARTITION OF streak_events "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_start(month, 1).isoformat()}')"
+    ))
+
+
+# Serializes partition maintenance across processes (every worker runs it at startup)
+_PARTITION_LOCK_KEY = 0x5E7A_0050
+
+
+def _streak_events_relkind(connection) -> Optional[str]:
+    """'r' for a plain table, 'p' for a partitioned one, None when missing"""
+    return connection.execute(text(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = 'streak_events' AND n.nspname = current_schema()"
+    )).scalar()
+
+
+def _create_partitions(connection, first_month: date, months_ahead: int):
+    """Default partition plus one per month from first_month to months_ahead months from now"""
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS streak_events_default PARTITION OF streak_events DEFAULT"
+    ))
+    last_month = month_start(date.today(), months_ahead)
+    month = first_month
+    while month <= last_month:
+        _create_month_partition(connection, month)
+        month = month_start(month, 1)
+
+
+def ensure_streak_event_partitions(months_ahead: int = 2):
+    """
+    Make sure streak_events partitions exist from the current month to
+    `months_ahead` months ahead (Postgres only, idempotent)
+    
+    Rows outside every partition (e.g. back-dated imports) land in a default
+    partition. A table created before partitioning is left alone until
+    convert_streak_events_to_partitioned() has been run; other databases
+    keep a plain table and compaction still works there, by DELETE.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY})
+        kind = _streak_events_relkind(connection)
+        if kind == "r":
+            logger.warning(
+                "⚠️ streak_events is not partitioned yet, run: python -m Database.partition_streak_events"
+            )
+            return
+        if kind == "p":
+            _create_partitions(connection, month_start(date.today()), months_ahead)
+
+
+def convert_streak_events_to_partitioned(months_ahead: int = 2) -> Optional[int]:
+    """
+    One-off migration of an unpartitioned streak_events table to monthly partitions
+    
+    Renames the old table, creates the partitioned one with partitions covering
+    every existing row, copies the rows and drops the old table, all in one
+    transaction. Writers wait on the table lock for the duration, so run it
+    during a quiet period.
+    
+    Returns:
+        Number of rows copied, or None when there was nothing to convert
+    """
+    if engine.dialect.name != "postgresql":
+        return None
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PARTITION_LOCK_KEY})
+        if _streak_events_relkind(connection) != "r":
+            return None
+        connection.execute(text("LOCK TABLE streak_events IN ACCESS EXCLUSIVE MODE"))
+        logger.info("🗂️ Converting streak_events to a partitioned table")
+        for statement in (
+            "ALTER TABLE streak_events RENAME TO streak_events_unpartitioned",
+            "ALTER TABLE streak_events_unpartitioned RENAME CONSTRAINT streak_events_pkey "
+            "TO streak_events_unpartitioned_pkey",
+            "ALTER INDEX IF EXISTS ix_streak_events_user_created "
+            "RENAME TO ix_streak_events_unpartitioned_user_created",
+            "UPDATE streak_events_unpartitioned SET created_at = now() WHERE created_at IS NULL",
+            "CREATE TABLE streak_events (LIKE streak_events_unpartitioned INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)",
+            "ALTER TABLE streak_events ADD PRIMARY KEY (id, created_at)",
+            "ALTER TABLE streak_events ADD FOREIGN KEY (user_id) REFERENCES users (id)",
+            "CREATE INDEX ix_streak_events_user_created ON streak_events (user_id, created_at)",
+        ):
+            connection.execute(text(statement))
+        
+        first_month = month_start(date.today())
+        oldest = connection.execute(text("SELECT min(created_at) FROM streak_events_unpartitioned")).scalar()
+        if oldest is not None:
+            first_month = min(first_month, month_start(oldest.date()))
+        _create_partitions(connection, first_month, months_ahead)
+        
+        copied = connection.execute(
+            text("INSERT INTO streak_events SELECT * FROM streak_events_unpartitioned")
+        ).rowcount
+        connection.execute(text("DROP TABLE streak_events_unpartitioned"))
+    logger.info(f"✅ streak_events partitioned, {copied} rows copied")
+    return copied
+
+
+def drop_streak_event_partitions_before(cutoff: date) -> List[str]:
+    """
+    Drop monthly streak_events partitions that end on or before cutoff
+    
+    Only call once their rows have been compacted into streak_event_rollups.
+    
+    Returns:
+        Names of the dropped partitions
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+    dropped = []
+    with engine.begin() as connection:
+        partitions = connection.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'streak_events'::regclass"
+        )).scalars()
+        for name in partitions:
+            match = re.fullmatch(r"streak_events_p(\d{4})(\d{2})", name)
+            if match and month_start(date(int(match[1]), int(match[2]), 1), 1) <= cutoff:
+                connection.execute(text(f"DROP TABLE {name}"))
+                dropped.append(name)
+    return dropped
+
+
+def _commit(db_session: Session):
+    """Commit, or only flush when the session belongs to a unit of work (it commits once at the end)"""
+    if db_session.info.get("unit_of_work"):
+        db_session.flush()
+    else:
+        db_session.commit()
+
+
 class UserRepository:
     """Repository for UserStats operations"""
     
     def __init__(self, db_session: Session):
         self.db = db_session
     
-    def get_user_by_id(self, user_id: str) -> Optional[UserStats]:
-        """Get user by ID"""
-        return self.db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    def get_user_by_id(self, user_id: str, for_update: bool = False) -> Optional[UserStats]:
+        """Get user by ID, optionally locking the row until the transaction ends"""
+        query = self.db.query(UserStats).filter(UserStats.user_id == user_id)
+        if for_update:
+            query = query.with_for_update()
+        return query.first()
     
     def create_user(self, user_id: str, username: str = None) -> UserStats:
         """Create new user"""
@@ -176,7 +426,7 @@ class UserRepository:
             username=username
         )
         self.db.add(user)
-        self.db.commit()
+        _commit(self.db)
         self.db.refresh(user)
         return user
     
@@ -194,13 +444,254 @@ class UserRepository:
         if new_streak > user.longest_streak:
             user.longest_streak = new_streak
         
-        self.db.commit()
+        _commit(self.db)
         self.db.refresh(user)
         return user
     
+    def get_streak_state_for_update(self, user_id: str) -> Dict:
+        """
+        Lock the user's stats row and read its streak counters and earned-achievements mask
+        
+        Concurrent updates for the same user queue on the row lock, so each one
+        sees the previous one's counts. A first-time user's row is created
+        (ON CONFLICT DO NOTHING) before locking so two first entries cannot
+        both take the "new user" path.
+        
+        Returns:
+            Stats dict including 'achievements_mask'
+        """
+        query = (
+            select(
+                UserStats.current_streak, UserStats.longest_streak, UserStats.total_entries,
+                UserStats.last_entry_date, UserStats.streak_frozen, UserStats.achievements_mask
+            )
+            .where(UserStats.user_id == user_id)
+            .with_for_update()
+        )
+        row = self.db.execute(query).first()
+        if row is None:
+            self.db.execute(
+                _dialect_insert(self.db, UserStats).values(
+                    id=str(uuid.uuid4()), user_id=user_id, username=f"user_{user_id}",
+                    current_streak=0, longest_streak=0, total_entries=0, streak_frozen=False,
+                    freeze_count=0, max_freezes_per_month=3, achievements_mask=0,
+                    created_at=datetime.utcnow(), updated_at=datetime.utcnow()
+                ).on_conflict_do_nothing(index_elements=[UserStats.user_id])
+            )
+            row = self.db.execute(query).one()
+        
+        return dict(row._mapping)
+    
+    def upsert_streak(self, user_id: str, new_streak: int, entry_date: date, streak_frozen: bool,
+                      new_achievement_bits: int = 0):
+        """
+        Record an entry's streak with one INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+        
+        Args:
+            new_achievement_bits: ACHIEVEMENT_BITS of achievements awarded in the same transaction
+        
+        Returns:
+            Row with the stored streak counters
+        """
+        now = datetime.utcnow()
+        statement = _dialect_insert(self.db, UserStats).values(
+            user_id=user_id,
+            username=f"user_{user_id}",
+            current_streak=new_streak,
+            longest_streak=new_streak,
+            total_entries=1,
+            last_entry_date=entry_date,
+            streak_frozen=streak_frozen,
+            achievements_mask=new_achievement_bits,
+            created_at=now,
+            updated_at=now
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={
+                'current_streak': statement.excluded.current_streak,
+                'longest_streak': case(
+                    (UserStats.longest_streak > statement.excluded.current_streak, UserStats.longest_streak),
+                    else_=statement.excluded.current_streak
+                ),
+                'total_entries': UserStats.total_entries + 1,
+                'last_entry_date': statement.excluded.last_entry_date,
+                'streak_frozen': statement.excluded.streak_frozen,
+                'achievements_mask': UserStats.achievements_mask.op('|')(statement.excluded.achievements_mask),
+                'updated_at': now
+            }
+        ).returning(
+            UserStats.current_streak, UserStats.longest_streak, UserStats.total_entries,
+            UserStats.streak_frozen, UserStats.freeze_count
+        )
+        return self.db.execute(statement).one()
+    
+    def iter_streak_scores(self, batch_size: int = 10000) -> Iterator[Tuple[int, int, int]]:
+        """(user_id, current_streak, longest_streak) for every user, read in user_id keyset batches"""
+        after_user_id = 0
+        while True:
+            rows = self.db.execute(
+                select(UserStats.user_id, UserStats.current_streak, UserStats.longest_streak)
+                .where(UserStats.user_id > after_user_id)
+                .order_by(UserStats.user_id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return
+            for row in rows:
+                yield row.user_id, row.current_streak or 0, row.longest_streak or 0
+            after_user_id = rows[-1].user_id
+    
+    def get_streak_states(self, user_ids: List[Any]) -> Dict[Any, Any]:
+        """Stored streak counters and achievement masks for many users in one query"""
+        rows = self.db.execute(
+            select(
+                UserStats.user_id, UserStats.current_streak, UserStats.longest_streak,
+                UserStats.total_entries, UserStats.last_entry_date, UserStats.achievements_mask
+            ).where(UserStats.user_id.in_(user_ids))
+        ).all()
+        return {row.user_id: row for row in rows}
+    
+    def bulk_upsert_streak_states(self, states: List[Dict]):
+        """
+        Overwrite many users' streak counters with one multi-row INSERT ... ON CONFLICT DO UPDATE
+        
+        Args:
+            states: Dicts with user_id, current_streak, longest_streak, total_entries,
+                last_entry_date and achievements_mask (OR-ed into the stored mask)
+        """
+        if not states:
+            return
+        now = datetime.utcnow()
+        statement = _dialect_insert(self.db, UserStats).values([
+            {
+                'id': str(uuid.uuid4()),
+                'username': f"user_{state['user_id']}",
+                'streak_frozen': False,
+                'freeze_count': 0,
+                'max_freezes_per_month': 3,
+                'created_at': now,
+                'updated_at': now,
+                **state
+            }
+            for state in states
+        ])
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={
+                'current_streak': statement.excluded.current_streak,
+                'longest_streak': statement.excluded.longest_streak,
+                'total_entries': statement.excluded.total_entries,
+                'last_entry_date': statement.excluded.last_entry_date,
+                'achievements_mask': UserStats.achievements_mask.op('|')(statement.excluded.achievements_mask),
+                'updated_at': now
+            }
+        ))
+    
+    def set_streak_state(self, user_id: str, current_streak: int, longest_streak: int,
+                         total_entries: int, last_entry_date: Optional[date]) -> UserStats:
+        """Overwrite a user's streak counters (used when history is rebuilt)"""
+        user = self.get_user_by_id(user_id, for_update=True)
+        if not user:
+            user = self.create_user(user_id)
+        
+        user.current_streak = current_streak
+        user.longest_streak = longest_streak
+        user.total_entries = total_entries
+        user.last_entry_date = last_entry_date
+        user.streak_frozen = False
+        user.updated_at = datetime.utcnow()
+        
+        _commit(self.db)
+        return user
+    
+    def get_at_risk_user_ids(self, last_entry_date: date, after_user_id: int, limit: int) -> List[int]:
+        """
+        Next batch of users whose live, unfrozen streak ends on last_entry_date
+        
+        A range scan on (last_entry_date, user_id), keyset-paginated by user_id.
+        """
+        return list(self.db.execute(
+            select(UserStats.user_id)
+            .where(
+                UserStats.last_entry_date == last_entry_date,
+                UserStats.user_id > after_user_id,
+                UserStats.streak_frozen.is_(False),
+                UserStats.current_streak > 0
+            )
+            .order_by(UserStats.user_id)
+            .limit(limit)
+        ).scalars())
+    
+    def reset_freezes_batch(self, after_user_id: int, limit: int) -> Tuple[Optional[int], int, List[int]]:
+        """
+        Reset freeze_count for the next `limit` users after after_user_id with one UPDATE
+        
+        Returns:
+            (last user id covered or None when there are no more users,
+             users covered, ids that were reset)
+        """
+        batch = (
+            select(UserStats.user_id)
+            .where(UserStats.user_id > after_user_id)
+            .order_by(UserStats.user_id)
+            .limit(limit)
+            .subquery()
+        )
+        upper, covered = self.db.execute(select(func.max(batch.c.user_id), func.count()).select_from(batch)).one()
+        if upper is None:
+            return None, 0, []
+        
+        reset_ids = list(self.db.execute(
+            update(UserStats)
+            .where(
+                UserStats.user_id > after_user_id,
+                UserStats.user_id <= upper,
+                UserStats.freeze_count > 0
+            )
+            .values(freeze_count=0, updated_at=datetime.utcnow())
+            .returning(UserStats.user_id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        _commit(self.db)
+        return upper, covered, reset_ids
+    
+    def expire_frozen_streaks_batch(self, last_entry_before: date, after_user_id: int,
+                                    limit: int) -> List[Tuple[int, int]]:
+        """
+        End frozen streaks whose freeze window has passed, for the next batch of users
+        
+        Rows a live update is holding are skipped (SKIP LOCKED); the next run picks them up.
+        
+        Returns:
+            (user_id, streak that was frozen) for every expired streak
+        """
+        rows = self.db.execute(
+            select(UserStats.user_id, UserStats.current_streak)
+            .where(
+                UserStats.last_entry_date < last_entry_before,
+                UserStats.user_id > after_user_id,
+                UserStats.streak_frozen.is_(True)
+            )
+            .order_by(UserStats.user_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return []
+        
+        self.db.execute(
+            update(UserStats)
+            .where(UserStats.user_id.in_([row.user_id for row in rows]))
+            .values(streak_frozen=False, current_streak=0, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        _commit(self.db)
+        return [(row.user_id, row.current_streak) for row in rows]
+    
     def use_streak_freeze(self, user_id: str) -> bool:
         """Use a streak freeze for user"""
-        user = self.get_user_by_id(user_id)
+        user = self.get_user_by_id(user_id, for_update=True)
         if not user or user.freeze_count >= user.max_freezes_per_month:
             return False
         
@@ -208,7 +699,7 @@ class UserRepository:
         user.freeze_count += 1
         user.updated_at = datetime.utcnow()
         
-        self.db.commit()
+        _commit(self.db)
         return True
 
 class StreakEventRepository:
@@ -229,10 +720,61 @@ class StreakEventRepository:
         )
 
         self.db.add(event)
-        self.db.commit()
+        _commit(self.db)
         self.db.refresh(event)
         return event
     
+    def insert_events(self, user_id: str, events: List[Dict]):
+        """Insert events with one multi-row INSERT (no per-row refresh)"""
+        self.insert_events_bulk([{**event, 'user_id': user_id} for event in events])
+    
+    def insert_events_bulk(self, events: List[Dict]):
+        """Insert events for any number of users (each dict carries its user_id) in one INSERT"""
+        if not events:
+            return
+        now = datetime.utcnow()
+        self.db.execute(insert(StreakEvent).values([
+            {
+                'id': str(uuid.uuid4()),
+                'user_id': event['user_id'],
+                'event_type': event['event_type'],
+                'streak_count': event['streak_count'],
+                'previous_streak': event.get('previous_streak', 0),
+                'meta_info': event.get('metadata') or {},
+                'created_at': event.get('created_at', now)
+            }
+            for event in events
+        ]))
+    
+    # Events produced by journal entries; 'frozen' events come from user actions and are kept
+    ENTRY_EVENT_TYPES = ('started', 'continued', 'broken', 'same_day', 'unfrozen', 'past_entry')
+    
+    def replace_entry_events(self, user_id: str, events: List[Dict]) -> int:
+        """Replace a user's entry-driven events with a rebuilt history in one flush"""
+        self.db.query(StreakEvent).filter(
+            StreakEvent.user_id == user_id,
+            StreakEvent.event_type.in_(self.ENTRY_EVENT_TYPES)
+        ).delete(synchronize_session=False)
+        # Compacted history is rebuilt too: the replayed raw events are rolled up again later
+        self.db.query(StreakEventRollup).filter(
+            StreakEventRollup.user_id == user_id,
+            StreakEventRollup.event_type.in_(self.ENTRY_EVENT_TYPES)
+        ).delete(synchronize_session=False)
+        
+        self.db.add_all([
+            StreakEvent(
+                user_id=user_id,
+                event_type=event['event_type'],
+                streak_count=event['streak_count'],
+                previous_streak=event['previous_streak'],
+                meta_info=event.get('metadata') or {},
+                created_at=event['created_at']
+            )
+            for event in events
+        ])
+        _commit(self.db)
+        return len(events)
+    
     def get_user_events(self, user_id: str, limit: int = 50) -> List[StreakEvent]:
         """Get user's streak events"""
         return self.db.query(StreakEvent)\
@@ -240,49 +782,995 @@ class StreakEventRepository:
                      .order_by(StreakEvent.created_at.desc())\
                      .limit(limit)\
                      .all()
+    
+    # Events that begin a new streak run
+    RUN_START_TYPES = ('started', 'broken')
+    
+    def _history(self, user_id: str, since: Optional[datetime] = None):
+        """
+        A user's events as one stream: daily rollups for compacted periods, raw rows after
+        
+        Columns: ts, event_type, event_count, streak_count (the day's highest for
+        rollups) and tiebreak. Compaction moves whole days, so no day is in both;
+        a `since` inside a compacted day counts that whole day.
+        """
+        raw = select(
+            StreakEvent.created_at.label('ts'), StreakEvent.event_type,
+            literal(1).label('event_count'), StreakEvent.streak_count,
+            StreakEvent.id.label('tiebreak')
+        ).where(StreakEvent.user_id == user_id)
+        rolled = select(
+            StreakEventRollup.day, StreakEventRollup.event_type,
+            StreakEventRollup.event_count, StreakEventRollup.max_streak,
+            literal(0).label('tiebreak')
+        ).where(StreakEventRollup.user_id == user_id)
+        if since is not None:
+            raw = raw.where(StreakEvent.created_at >= since)
+            rolled = rolled.where(StreakEventRollup.day >= since.date())
+        return union_all(raw, rolled).subquery()
+    
+    def get_event_counts(self, user_id: str, since: datetime) -> Tuple[Dict[str, int], int]:
+        """
+        Count a user's events by type since a point in time with one GROUP BY
+        
+        Returns:
+            ({event_type: count}, highest streak_count in the range)
+        """
+        history = self._history(user_id, since)
+        rows = self.db.execute(
+            select(history.c.event_type, func.sum(history.c.event_count), func.max(history.c.streak_count))
+            .group_by(history.c.event_type)
+        ).all()
+        return {row[0]: int(row[1]) for row in rows}, max((row[2] for row in rows), default=0)
+    
+    def get_streak_progression(self, user_id: str, since: datetime, limit: int = 30) -> List[Dict]:
+        """Latest events in a time range as plain dicts, oldest first (one per type and day once compacted)"""
+        history = self._history(user_id, since)
+        rows = self.db.execute(
+            select(history.c.ts, history.c.streak_count, history.c.event_type)
+            .order_by(history.c.ts.desc(), history.c.tiebreak.desc())
+            .limit(limit)
+        ).all()
+        return [
+            {
+                'date': str(row.ts)[:10],
+                'streak_count': row.streak_count,
+                'event_type': row.event_type
+            }
+            for row in reversed(rows)
+        ]
+    
+    def get_average_run_length(self, user_id: str) -> float:
+        """
+        Average length of every streak run in the user's full history
+        
+        A running SUM() window numbers the runs (a new one begins at each
+        'started' or 'broken' event); a run's length is its highest streak_count.
+        Run starts sort first within a timestamp, so a compacted day's other
+        events join the run that began that day.
+        """
+        history = self._history(user_id)
+        starts = case((history.c.event_type.in_(self.RUN_START_TYPES), history.c.event_count), else_=0)
+        run_number = func.sum(starts).over(order_by=(history.c.ts, starts.desc(), history.c.tiebreak))
+        numbered = (
+            select(history.c.streak_count, run_number.label('run'))
+            .subquery()
+        )
+        runs = (
+            select(func.max(numbered.c.streak_count).label('length'))
+            .where(numbered.c.run > 0)
+            .group_by(numbered.c.run)
+            .subquery()
+        )
+        average = self.db.execute(select(func.avg(runs.c.length))).scalar()
+        return float(average) if average is not None else 0.0
+    
+    def compact_events_batch(self, before: datetime, after_user_id: int,
+                             limit: int) -> Tuple[Optional[int], int]:
+        """
+        Roll the next batch of users' events older than `before` into daily rollups
+        
+        The batch's raw rows are locked (FOR UPDATE) first, the rollup upsert adds
+        to existing counts and the raw rows are deleted in the same transaction,
+        so every event is counted exactly once even when a run is interrupted and
+        repeated. A concurrent run over the same users waits on the row locks and
+        then no longer sees the deleted rows.
+        
+        Returns:
+            (last user id of the batch or None when done, users compacted)
+        """
+        user_ids = list(self.db.execute(
+            select(StreakEvent.user_id)
+            .where(StreakEvent.created_at < before, StreakEvent.user_id > after_user_id)
+            .distinct()
+            .order_by(StreakEvent.user_id)
+            .limit(limit)
+        ).scalars())
+        if not user_ids:
+            return None, 0
+        
+        self.db.execute(
+            select(StreakEvent.id)
+            .where(StreakEvent.user_id.in_(user_ids), StreakEvent.created_at < before)
+            .with_for_update()
+        )
+        day = func.date(StreakEvent.created_at)
+        daily = (
+            select(
+                StreakEvent.user_id, day, StreakEvent.event_type,
+                func.count(), func.max(StreakEvent.streak_count)
+            )
+            .where(StreakEvent.user_id.in_(user_ids), StreakEvent.created_at < before)
+            .group_by(StreakEvent.user_id, day, StreakEvent.event_type)
+        )
+        statement = _dialect_insert(self.db, StreakEventRollup).from_select(
+            ['user_id', 'day', 'event_type', 'event_count', 'max_streak'], daily
+        )
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[StreakEventRollup.user_id, StreakEventRollup.day, StreakEventRollup.event_type],
+            set_={
+                'event_count': StreakEventRollup.event_count + statement.excluded.event_count,
+                'max_streak': case(
+                    (StreakEventRollup.max_streak > statement.excluded.max_streak, StreakEventRollup.max_streak),
+                    else_=statement.excluded.max_streak
+                )
+            }
+        ))
+        self.db.execute(
+            delete(StreakEvent)
+            .where(StreakEvent.user_id.in_(user_ids), StreakEvent.created_at < before)
+            .execution_options(synchronize_session=False)
+        )
+        _commit(self.db)
+        return user_ids[-1], len(user_ids)
+
+def _encode_cursor(state: Dict) -> str:
+    """Opaque pagination cursor"""
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(state, dict):
+        raise ValueError("Invalid cursor")
+    return state
+
+
+class JournalSearchRepository:
+    """Per-user inverted index over journal entries with BM25 ranking"""
+    
+    K1 = 1.2
+    B = 0.75
+    MAX_POSTINGS_PER_TERM = 5000  # highest-tf postings read per query term
+    RANKED_CACHE_SIZE = 256  # ranked result lists kept for paging
+    RANKED_CACHE_SECONDS = 60
+    STOPWORDS = frozenset(
+        "a an and are as at be but by did do for from had has have i if in into is it its "
+        "me my of on or our so that the their them then there they this to was we were "
+        "what when where which who why will with you your".split()
+    )
+    _WORD_RE = re.compile(r"[a-z0-9']+")
+    
+    def __init__(self, postings_collection, stats_collection):
+        self.postings = postings_collection
+        self.stats = stats_collection
+        self._ranked_cache: "OrderedDict[Tuple, Tuple[float, List[Tuple[str, float]]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def ensure_indexes(self):
+        """Create the indexes the postings queries rely on"""
+        self.postings.create_index([("user_id", 1), ("term", 1), ("tf", -1)])
+        self.postings.create_index("entry_id")
+    
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """Lowercase, drop stopwords and strip common suffixes (composting -> compost)"""
+        terms = []
+        for word in cls._WORD_RE.findall((text or "").lower()):
+            word = word.strip("'")
+            if not word or word in cls.STOPWORDS:
+                continue
+            if len(word) > 5 and word.endswith("ing"):
+                word = word[:-3]
+            elif len(word) > 4 and word.endswith("ies"):
+                word = word[:-3] + "y"
+            elif len(word) > 4 and word.endswith("ed"):
+                word = word[:-2]
+            elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+                word = word[:-1]
+            terms.append(word)
+        return terms
+    
+    def index_entry(self, entry: Dict):
+        """Write one posting per distinct term of a newly saved entry"""
+        self.index_entries([entry])
+    
+    def index_entries(self, entries: List[Dict]):
+        """Index several new entries with one postings insert and one stats update per user"""
+        postings = []
+        stats: Dict[Any, Dict[str, int]] = {}
+        for entry in entries:
+            terms = self.tokenize(entry.get("content", ""))
+            if not terms:
+                continue
+            sentiment = ((entry.get("analysis") or {}).get("sentiment") or {}).get("label")
+            postings.extend(
+                {
+                    "user_id": entry["user_id"],
+                    "term": term,
+                    "entry_id": entry["_id"],
+                    "tf": tf,
+                    "length": len(terms),
+                    "eco_tags": entry.get("eco_tags", []),
+                    "sentiment": sentiment
+                }
+                for term, tf in Counter(terms).items()
+            )
+            user_stats = stats.setdefault(entry["user_id"], {"doc_count": 0, "total_length": 0})
+            user_stats["doc_count"] += 1
+            user_stats["total_length"] += len(terms)
+        
+        if not postings:
+            return
+        self.postings.insert_many(postings, ordered=False)
+        self.stats.bulk_write([
+            UpdateOne({"_id": user_id}, {"$inc": increments}, upsert=True)
+            for user_id, increments in stats.items()
+        ], ordered=False)
+    
+    def update_filters(self, entry_id: ObjectId, eco_tags: List[str], sentiment: Optional[str]):
+        """Refresh the filterable fields once an entry's analysis changes"""
+        self.postings.update_many(
+            {"entry_id": entry_id},
+            {"$set": {"eco_tags": eco_tags, "sentiment": sentiment}}
+        )
+    
+    def bulk_update_filters(self, updates: List[Tuple[ObjectId, List[str], Optional[str]]]):
+        """Refresh filterable fields for many entries in one unordered bulk write"""
+        if not updates:
+            return
+        self.postings.bulk_write([
+            UpdateMany({"entry_id": entry_id}, {"$set": {"eco_tags": eco_tags, "sentiment": sentiment}})
+            for entry_id, eco_tags, sentiment in updates
+        ], ordered=False)
+    
+    def search(self, user_id: str, query: str, limit: int = 20, cursor: Optional[str] = None,
+               eco_tag: Optional[str] = None, sentiment: Optional[str] = None) -> Tuple[List[Tuple[str, float]], Optional[str]]:
+        """
+        Rank a user's entries against a query with BM25
+        
+        Only the postings of the query terms are read, never the user's whole history.
+        The ranked list is cached briefly, so later pages are sliced from it
+        instead of re-ranking; a new entry changes the user's stats and so the key.
+        
+        Raises:
+            ValueError: The cursor is not one this method returned
+        
+        Returns:
+            ([(entry_id, score)], next_cursor) - next_cursor is None on the last page
+        """
+        last = None
+        if cursor:
+            last = _decode_cursor(cursor)
+            if not isinstance(last.get("score"), (int, float)) or not isinstance(last.get("id"), str):
+                raise ValueError("Invalid cursor")
+        
+        terms = list(dict.fromkeys(self.tokenize(query)))
+        stats = self.stats.find_one({"_id": user_id})
+        if not terms or not stats or not stats.get("doc_count"):
+            return [], None
+        
+        key = (user_id, tuple(terms), eco_tag, sentiment, stats["doc_count"], stats["total_length"])
+        ranked = self._cached_ranking(key)
+        if ranked is None:
+            ranked = self._rank(user_id, terms, stats, eco_tag, sentiment)
+            self._cache_ranking(key, ranked)
+        
+        start = 0
+        if last is not None:
+            # First item ranked strictly after the cursor (score desc, id asc)
+            start = bisect.bisect_right(
+                [(-score, entry_id) for entry_id, score in ranked], (-last["score"], last["id"])
+            )
+        page = ranked[start:start + limit]
+        next_cursor = None
+        if start + limit < len(ranked):
+            next_cursor = _encode_cursor({"score": page[-1][1], "id": page[-1][0]})
+        return page, next_cursor
+    
+    def _cached_ranking(self, key: Tuple) -> Optional[List[Tuple[str, float]]]:
+        with self._cache_lock:
+            cached = self._ranked_cache.get(key)
+            if cached is None or time.monotonic() - cached[0] > self.RANKED_CACHE_SECONDS:
+                return None
+            self._ranked_cache.move_to_end(key)
+            return cached[1]
+    
+    def _cache_ranking(self, key: Tuple, ranked: List[Tuple[str, float]]):
+        with self._cache_lock:
+            self._ranked_cache[key] = (time.monotonic(), ranked)
+            self._ranked_cache.move_to_end(key)
+            while len(self._ranked_cache) > self.RANKED_CACHE_SIZE:
+                self._ranked_cache.popitem(last=False)
+    
+    def _rank(self, user_id: str, terms: List[str], stats: Dict, eco_tag: Optional[str],
+              sentiment: Optional[str]) -> List[Tuple[str, float]]:
+        """Score every entry in the query terms' capped postings, best first"""
+        doc_count = stats["doc_count"]
+        avg_length = stats["total_length"] / doc_count
+        posting_filter = {"user_id": user_id}
+        if eco_tag:
+            posting_filter["eco_tags"] = eco_tag
+        if sentiment:
+            posting_filter["sentiment"] = sentiment
+        
+        # Document frequencies over this user's entries only, like doc_count (one query)
+        doc_freqs = {
+            row["_id"]: row["df"] for row in self.postings.aggregate([
+                {"$match": {"user_id": user_id, "term": {"$in": terms}}},
+                {"$group": {"_id": "$term", "df": {"$sum": 1}}}
+            ])
+        }
+        
+        scores: Dict[ObjectId, float] = {}
+        for term in terms:
+            df = doc_freqs.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            postings = self.postings.find(
+                {**posting_filter, "term": term}, {"entry_id": 1, "tf": 1, "length": 1, "_id": 0}
+            ).sort("tf", -1).limit(self.MAX_POSTINGS_PER_TERM)
+            for posting in postings:
+                tf = posting["tf"]
+                norm = self.K1 * (1 - self.B + self.B * posting["length"] / avg_length)
+                scores[posting["entry_id"]] = scores.get(posting["entry_id"], 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+        
+        return sorted(
+            ((str(entry_id), round(score, 6)) for entry_id, score in scores.items()),
+            key=lambda item: (-item[1], item[0])
+        )
+    
+    def rebuild(self, journal_collection, batch_size: int = 1000) -> int:
+        """Rebuild the index from existing entries, streaming in _id order"""
+        self.postings.delete_many({})
+        self.stats.delete_many({})
+        indexed = 0
+        for entry in journal_collection.find(
+            {}, {"user_id": 1, "content": 1, "eco_tags": 1, "analysis.sentiment.label": 1}
+        ).sort("_id", 1).batch_size(batch_size):
+            self.index_entry(entry)
+            indexed += 1
+        return indexed
+    
+
+
+class JournalSummaryRepository:
+    """Per-user all-time and daily counts of sentiments, eco tags and emotions, maintained with $inc"""
+    
+    WINDOW_DAYS = 30  # daily rollups expire after this many days
+    TOP_EMOTIONS_PER_ENTRY = TOP_EMOTIONS_PER_ENTRY
+    
+    def __init__(self, summaries_collection, daily_collection):
+        self.summaries = summaries_collection
+        self.daily = daily_collection
+    
+    def ensure_indexes(self):
+        """Index daily rollups by user and day and let MongoDB expire days outside the window"""
+        self.daily.create_index([("user_id", 1), ("day", 1)])
+        self.daily.create_index("day", expireAfterSeconds=(self.WINDOW_DAYS + 1) * 86400)
+    
+    @classmethod
+    def contribution(cls, analysis: Optional[Dict]) -> Dict[str, int]:
+        """Counter paths an analysis adds to (see Database.summary_counts)"""
+        return summary_contribution(analysis, cls.TOP_EMOTIONS_PER_ENTRY)
+    
+    def _operations(self, user_id: Any, created_at: datetime, increments: Dict[str, int]) -> Tuple[UpdateOne, UpdateOne]:
+        """Build the all-time and daily $inc updates for one change"""
+        day = datetime(created_at.year, created_at.month, created_at.day)
+        all_time = UpdateOne(
+            {"_id": user_id},
+            {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        daily = UpdateOne(
+            {"_id": f"{user_id}:{day.date().isoformat()}"},
+            {"$inc": increments, "$setOnInsert": {"user_id": user_id, "day": day}},
+            upsert=True
+        )
+        return all_time, daily
+    
+    def _apply(self, changes: List[Tuple[Any, datetime, Dict[str, int]]]):
+        all_time_ops, daily_ops = [], []
+        for user_id, created_at, increments in changes:
+            if not increments:
+                continue
+            all_time, daily = self._operations(user_id, created_at, increments)
+            all_time_ops.append(all_time)
+            daily_ops.append(daily)
+        if all_time_ops:
+            self.summaries.bulk_write(all_time_ops, ordered=False)
+            self.daily.bulk_write(daily_ops, ordered=False)
+    
+    def record_entry(self, user_id: Any, created_at: datetime, analysis: Optional[Dict]):
+        """Count a newly saved entry"""
+        self.record_entries([(user_id, created_at, analysis)])
+    
+    def record_entries(self, entries: List[Tuple[Any, datetime, Optional[Dict]]]):
+        """Count several new entries: (user_id, created_at, analysis)"""
+        self._apply([
+            (user_id, created_at, {"total_entries": 1, **self.contribution(analysis)})
+            for user_id, created_at, analysis in entries
+        ])
+    
+    def record_analysis_changes(self, changes: List[Tuple[Any, datetime, Optional[Dict], Optional[Dict]]]):
+        """Move counts from each entry's old analysis to its new one: (user_id, created_at, old, new)"""
+        deltas = []
+        for user_id, created_at, old, new in changes:
+            increments = self.contribution(new)
+            for path, count in self.contribution(old).items():
+                increments[path] = increments.get(path, 0) - count
+            deltas.append((user_id, created_at, {path: n for path, n in increments.items() if n}))
+        self._apply(deltas)
+    
+    def get_summary(self, user_id: Any, window_days: int = WINDOW_DAYS) -> Dict[str, Any]:
+        """
+        Read a user's all-time counts and their sum over the last window_days days
+        
+        Returns:
+            {'all_time': counts, 'recent': counts, 'window_days': n} where counts holds
+            total_entries, sentiments, eco_tags and emotions
+        """
+        window_days = min(window_days, self.WINDOW_DAYS)
+        all_time = self.summaries.find_one({"_id": user_id}) or {}
+        
+        today = datetime.utcnow()
+        since = datetime(today.year, today.month, today.day) - timedelta(days=window_days - 1)
+        recent = {"total_entries": 0, "sentiments": {}, "eco_tags": {}, "emotions": {}}
+        for day in self.daily.find({"user_id": user_id, "day": {"$gte": since}}):
+            recent["total_entries"] += day.get("total_entries", 0)
+            for group in ("sentiments", "eco_tags", "emotions"):
+                for key, count in day.get(group, {}).items():
+                    recent[group][key] = recent[group].get(key, 0) + count
+        
+        return {
+            "all_time": {
+                "total_entries": all_time.get("total_entries", 0),
+                "sentiments": all_time.get("sentiments", {}),
+                "eco_tags": all_time.get("eco_tags", {}),
+                "emotions": all_time.get("emotions", {})
+            },
+            "recent": recent,
+            "window_days": window_days
+        }
+    
+    def rebuild(self, journal_collection, batch_size: int = 1000) -> int:
+        """Recompute every summary from existing entries, streaming in _id order"""
+        self.summaries.delete_many({})
+        self.daily.delete_many({})
+        changes = []
+        rebuilt = 0
+        for entry in journal_collection.find(
+            {}, {"user_id": 1, "created_at": 1, "analysis": 1}
+        ).sort("_id", 1).batch_size(batch_size):
+            changes.append((entry["user_id"], entry["created_at"],
+                            {"total_entries": 1, **self.contribution(entry.get("analysis"))}))
+            rebuilt += 1
+            if len(changes) >= batch_size:
+                self._apply(changes)
+                changes = []
+        self._apply(changes)
+        return rebuilt
+
 
 class JournalRepository:
     """Repository for Journal entries in MongoDB"""
     
-    def __init__(self, collection):
+    # Field projections for entry listings
+    ENTRY_VIEWS = {
+        "full": {"embedding": 0},
+        "summary": {
+            "user_id": 1, "content": 1, "created_at": 1, "eco_tags": 1, "inspiration": 1,
+            "analysis_status": 1, "analysis.sentiment": 1
+        },
+        "ids": {"_id": 1, "created_at": 1}
+    }
+    
+    # Entries whose analysis the deferred worker still owns
+    WORKER_OWNED_STATUSES = ("pending", "provisional")
+    
+    def _reanalyzable(self) -> Dict[str, Any]:
+        """
+        Filter for entries the re-analysis job may rewrite: anything the worker does
+        not own, plus entries still without a model analysis (a parked or lost
+        upgrade task would otherwise leave them unversioned forever)
+        """
+        return {"$or": [
+            {"analysis_status": {"$nin": list(self.WORKER_OWNED_STATUSES)}},
+            {"analysis_version": None}
+        ]}
+    
+    def __init__(self, collection, search: Optional[JournalSearchRepository] = None,
+                 summaries: Optional[JournalSummaryRepository] = None):
         self.collection = collection
+        self.search = search
+        self.summaries = summaries
     
-    def save_entry(self, user_id: str, content: str, analysis_result: Dict, 
-                   inspiration: str, eco_tags: List[str]) -> str:
+    def ensure_indexes(self):
+        """Create MongoDB indexes used by journal queries"""
+        self.collection.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+        if self.search is not None:
+            self.search.ensure_indexes()
+        if self.summaries is not None:
+            self.summaries.ensure_indexes()
+    
+    def save_entry(self, user_id: str, content: str, analysis_result: Optional[Dict], 
+                   inspiration: Optional[str], eco_tags: List[str],
+                   analysis_status: str = "complete") -> str:
         """Save journal entry to MongoDB"""
+        analysis_result, embedding = self._split_embedding(analysis_result)
         entry = {
             "_id": ObjectId(),
             "user_id": user_id,
             "content": content,
             "analysis": analysis_result,
+            "embedding": embedding,
             "inspiration": inspiration,
             "eco_tags": eco_tags,
+            "analysis_version": (analysis_result or {}).get("analysis_metadata", {}).get("analysis_version"),
+            "analysis_status": analysis_status,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
         
         result = self.collection.insert_one(entry)
+        if self.search is not None:
+            self.search.index_entry(entry)
+        if self.summaries is not None:
+            self.summaries.record_entry(user_id, entry["created_at"], analysis_result)
         return str(result.inserted_id)
     
-    def get_user_entries(self, user_id: str, limit: int = 50) -> List[Dict]:
-        """Get user's journal entries"""
-        entries = self.collection.find(
-            {"user_id": user_id}
-        ).sort("created_at", -1).limit(limit)
+    def save_entries_bulk(self, user_id: str, entries: List[Dict]) -> List[str]:
+        """
+        Insert many analyzed entries for one user in a single round trip
+        
+        Args:
+            user_id: User identifier
+            entries: Dicts with content, analysis, created_at and optional inspiration
+            
+        Returns:
+            Inserted entry ids, in input order
+        """
+        if not entries:
+            return []
         
-        return [self._convert_objectid(entry) for entry in entries]
+        now = datetime.utcnow()
+        documents = []
+        for item in entries:
+            analysis_result, embedding = self._split_embedding(item["analysis"])
+            version = (analysis_result or {}).get("analysis_metadata", {}).get("analysis_version")
+            documents.append({
+                "_id": ObjectId(),
+                "user_id": user_id,
+                "content": item["content"],
+                "analysis": analysis_result,
+                "embedding": embedding,
+                "inspiration": item.get("inspiration"),
+                "eco_tags": (analysis_result or {}).get("eco_tags", []),
+                "analysis_version": version,
+                "analysis_status": "complete" if version else "provisional",
+                "imported": True,
+                "created_at": item["created_at"],
+                "updated_at": now
+            })
+        
+        self.collection.insert_many(documents)
+        if self.search is not None:
+            self.search.index_entries(documents)
+        if self.summaries is not None:
+            self.summaries.record_entries([
+                (user_id, document["created_at"], document["analysis"]) for document in documents
+            ])
+        return [str(document["_id"]) for document in documents]
+    
+    def iter_user_id_batches(self, batch_size: int) -> Iterator[List[Any]]:
+        """Every user id with at least one entry, in ascending batches"""
+        batch = []
+        for row in self.collection.aggregate(
+            [{"$group": {"_id": "$user_id"}}, {"$sort": {"_id": 1}}], allowDiskUse=True
+        ):
+            batch.append(row["_id"])
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def get_entry_day_counts(self, user_ids: List[Any]) -> List[Tuple[Any, str, int]]:
+        """
+        Distinct entry days for a set of users, grouped server-side
+        
+        Returns:
+            (user_id, 'YYYY-MM-DD', entries that day) tuples in no particular order
+        """
+        rows = self.collection.aggregate([
+            {"$match": {"user_id": {"$in": user_ids}}},
+            {"$group": {
+                "_id": {
+                    "user_id": "$user_id",
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+                },
+                "entries": {"$sum": 1}
+            }}
+        ], allowDiskUse=True)
+        return [(row["_id"]["user_id"], row["_id"]["day"], row["entries"]) for row in rows]
+    
+    def get_user_entry_dates(self, user_id: str) -> List[date]:
+        """Dates of all of a user's entries, oldest first (reads only created_at)"""
+        cursor = self.collection.find(
+            {"user_id": user_id}, {"created_at": 1, "_id": 0}
+        ).sort("created_at", 1)
+        return [entry["created_at"].date() for entry in cursor]
+    
+    def update_entry_analysis(self, entry_id: str, analysis_result: Dict,
+                              inspiration: Optional[str], eco_tags: List[str],
+                              analysis_status: str = "complete") -> bool:
+        """Attach a deferred or upgraded analysis result to a saved entry"""
+        analysis_result, embedding = self._split_embedding(analysis_result)
+        fields = {
+            "analysis": analysis_result,
+            "embedding": embedding,
+            "eco_tags": eco_tags,
+            "analysis_version": analysis_result.get("analysis_metadata", {}).get("analysis_version"),
+            "analysis_status": analysis_status,
+            "updated_at": datetime.utcnow()
+        }
+        if inspiration is not None:
+            fields["inspiration"] = inspiration
+        
+        # Take the previous analysis atomically so the summary counts can be moved over
+        previous = self.collection.find_one_and_update(
+            {"_id": ObjectId(entry_id)},
+            {"$set": fields},
+            projection={"user_id": 1, "created_at": 1, "analysis": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            return False
+        if self.search is not None:
+            self.search.update_filters(
+                ObjectId(entry_id), eco_tags, (analysis_result.get("sentiment") or {}).get("label")
+            )
+        if self.summaries is not None:
+            self.summaries.record_analysis_changes([
+                (previous["user_id"], previous["created_at"], previous.get("analysis"), analysis_result)
+            ])
+        return True
+    
+    def get_user_entries(self, user_id: str, limit: int = 50, view: str = "full") -> List[Dict]:
+        """Get user's most recent journal entries"""
+        entries, _ = self.get_user_entries_page(user_id, limit=limit, view=view)
+        return entries
+    
+    def get_user_entries_page(self, user_id: str, limit: int = 50, cursor: Optional[str] = None,
+                              view: str = "full") -> Tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of a user's entries, newest first
+        
+        Keyset pagination on (created_at, _id) walks the (user_id, created_at, _id)
+        index, so each page costs the same however deep it is.
+        
+        Args:
+            user_id: User identifier
+            limit: Page size
+            cursor: Cursor returned with the previous page
+            view: Projection name from ENTRY_VIEWS
+            
+        Returns:
+            (entries, next_cursor) - next_cursor is None on the last page
+        """
+        if view not in self.ENTRY_VIEWS:
+            raise ValueError(f"Unknown view '{view}', expected one of {sorted(self.ENTRY_VIEWS)}")
+        
+        query: Dict[str, Any] = {"user_id": user_id}
+        if cursor:
+            try:
+                last = _decode_cursor(cursor)
+                last_created = datetime.fromisoformat(last["created_at"])
+                last_id = ObjectId(last["id"])
+            except (KeyError, TypeError, InvalidId) as e:
+                raise ValueError("Invalid cursor") from e
+            query["$or"] = [
+                {"created_at": {"$lt": last_created}},
+                {"created_at": last_created, "_id": {"$lt": last_id}}
+            ]
+        
+        entries = list(
+            self.collection.find(query, self.ENTRY_VIEWS[view])
+            .sort([("created_at", -1), ("_id", -1)])
+            .limit(limit + 1)
+        )
+        
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = _encode_cursor({
+                "created_at": entries[-1]["created_at"].isoformat(),
+                "id": str(entries[-1]["_id"])
+            })
+        return [self._convert_objectid(entry) for entry in entries], next_cursor
     
     def get_entry_by_id(self, entry_id: str) -> Optional[Dict]:
         """Get specific journal entry"""
-        entry = self.collection.find_one({"_id": ObjectId(entry_id)})
+        entry = self.collection.find_one({"_id": ObjectId(entry_id)}, {"embedding": 0})
         return self._convert_objectid(entry) if entry else None
     
+    def get_entries_after(self, after_id: Optional[ObjectId], limit: int,
+                          exclude_version: str = None) -> List[Dict]:
+        """Get the next range of re-analyzable entries in _id order (ids stay as ObjectId)"""
+        query: Dict[str, Any] = self._reanalyzable()
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+        if exclude_version is not None:
+            query["analysis_version"] = {"$ne": exclude_version}
+        
+        return list(
+            self.collection.find(query, {"content": 1})
+                           .sort("_id", 1)
+                           .limit(limit)
+        )
+    
+    def get_reanalyzable_entries(self, entry_ids: List[ObjectId]) -> List[Dict]:
+        """Get the content of specific re-analyzable entries (ids stay as ObjectId)"""
+        return list(self.collection.find({"_id": {"$in": entry_ids}, **self._reanalyzable()}, {"content": 1}))
+    
+    def bulk_update_analysis(self, updates: List[Dict]) -> int:
+        """
+        Write re-computed model analyses back to their entries
+        
+        Each entry's previous analysis is taken in the same operation that
+        replaces it (find_one_and_update), so summary counts move from exactly
+        what was overwritten. Updates without an analysis_version and entries
+        the deferred worker has completed since they were read are skipped.
+        
+        Returns:
+            Number of entries updated
+        """
+        now = datetime.utcnow()
+        filter_updates, summary_changes = [], []
+        for update in updates:
+            if not update.get("analysis_version"):
+                continue
+            analysis_result, embedding = self._split_embedding(update["analysis"])
+            previous = self.collection.find_one_and_update(
+                {"_id": update["_id"], **self._reanalyzable()},
+                {"$set": {
+                    "analysis": analysis_result,
+                    "embedding": embedding,
+                    "eco_tags": analysis_result.get("eco_tags", []),
+                    "analysis_version": update["analysis_version"],
+                    "analysis_status": "complete",
+                    "updated_at": now
+                }},
+                projection={"user_id": 1, "created_at": 1, "analysis": 1},
+                return_document=ReturnDocument.BEFORE
+            )
+            if previous is None:
+                continue
+            filter_updates.append((
+                update["_id"], analysis_result.get("eco_tags", []),
+                (analysis_result.get("sentiment") or {}).get("label")
+            ))
+            summary_changes.append(
+                (previous["user_id"], previous["created_at"], previous.get("analysis"), analysis_result)
+            )
+        if self.search is not None and filter_updates:
+            self.search.bulk_update_filters(filter_updates)
+        if self.summaries is not None:
+            self.summaries.record_analysis_changes(summary_changes)
+        return len(summary_changes)
+    
+    def get_entry_embedding(self, entry_id: str) -> Optional[Dict]:
+        """Get an entry's owner and stored embedding"""
+        return self.collection.find_one(
+            {"_id": ObjectId(entry_id)}, {"user_id": 1, "embedding": 1}
+        )
+    
+    def get_user_embeddings(self, user_id: str) -> Iterator[Tuple[str, bytes]]:
+        """Stream (entry_id, embedding bytes) for one user"""
+        cursor = self.collection.find(
+            {"user_id": user_id, "embedding": {"$ne": None}}, {"embedding": 1}
+        )
+        for entry in cursor:
+            yield str(entry["_id"]), entry["embedding"]
+    
+    def iter_embeddings(self, batch_size: int = 5000) -> Iterator[Tuple[str, bytes]]:
+        """Stream (entry_id, embedding bytes) for every entry"""
+        cursor = self.collection.find(
+            {"embedding": {"$ne": None}}, {"embedding": 1}
+        ).batch_size(batch_size)
+        for entry in cursor:
+            yield str(entry["_id"]), entry["embedding"]
+    
+    def get_entries_by_ids(self, entry_ids: List[str], projection: Dict) -> Dict[str, Dict]:
+        """Fetch several entries with a projection, keyed by string id"""
+        entries = self.collection.find(
+            {"_id": {"$in": [ObjectId(entry_id) for entry_id in entry_ids]}}, projection
+        )
+        return {str(entry["_id"]): self._convert_objectid(entry) for entry in entries}
+    
+    def get_user_summary(self, user_id: str) -> Dict[str, Any]:
+        """All-time and rolling-window counts for a user (one document plus the window's daily rollups)"""
+        if self.summaries is None:
+            return {"all_time": {}, "recent": {}, "window_days": 0}
+        return self.summaries.get_summary(user_id)
+    
+    def _split_embedding(self, analysis_result: Optional[Dict]) -> Tuple[Optional[Dict], Optional[bytes]]:
+        """Separate the float16 embedding from the analysis so it is stored as raw bytes"""
+        if not analysis_result or analysis_result.get("embedding") is None:
+            return analysis_result, None
+        analysis_result = dict(analysis_result)
+        embedding = analysis_result.pop("embedding")
+        return analysis_result, embedding.astype("<f2").tobytes()
+    
     def _convert_objectid(self, entry: Dict) -> Dict:
         """Convert ObjectId to string for JSON serialization"""
         if entry and "_id" in entry:
             entry["_id"] = str(entry["_id"])
         return entry
 
+class JobCheckpointRepository:
+    """Repository for resumable batch job checkpoints in MongoDB"""
+    
+    LEASE_FIELDS = ("_id", "lease_owner", "lease_expires_at")
+    
+    def __init__(self, collection):
+        self.collection = collection
+    
+    def load(self, job_name: str) -> Optional[Dict]:
+        """Get the saved state for a job"""
+        return self.collection.find_one({"_id": job_name})
+    
+    def save(self, job_name: str, state: Dict):
+        """Upsert the state for a job (the lease fields are left alone)"""
+        fields = {key: value for key, value in state.items() if key not in self.LEASE_FIELDS}
+        self.collection.update_one(
+            {"_id": job_name},
+            {"$set": {**fields, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+    
+    def acquire_lease(self, job_name: str, owner: str, seconds: int) -> bool:
+        """
+        Take or renew the job's lease with one atomic find_one_and_update
+        
+        Succeeds when the lease is free, expired or already held by owner, so only
+        one process at a time runs a job even when every worker runs a scheduler.
+        
+        Returns:
+            True when owner now holds the lease
+        """
+        now = datetime.utcnow()
+        try:
+            job = self.collection.find_one_and_update(
+                {"_id": job_name, "$or": [
+                    {"lease_owner": None},
+                    {"lease_owner": owner},
+                    {"lease_expires_at": {"$lt": now}}
+                ]},
+                {"$set": {"lease_owner": owner, "lease_expires_at": now + timedelta(seconds=seconds)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The checkpoint exists and someone else holds a live lease
+            return False
+        return job is not None and job.get("lease_owner") == owner
+    
+    def release_lease(self, job_name: str, owner: str):
+        """Give the lease up early (only if owner still holds it)"""
+        self.collection.update_one(
+            {"_id": job_name, "lease_owner": owner},
+            {"$set": {"lease_owner": None, "lease_expires_at": None}}
+        )
+    
+    def clear(self, job_name: str):
+        """Forget a job's progress so it starts from the beginning"""
+        self.collection.delete_one({"_id": job_name})
+
+class ImportJobRepository:
+    """Repository for background journal import jobs in MongoDB (progress and final result)"""
+    
+    def __init__(self, collection):
+        self.collection = collection
+    
+    def create(self, user_id: Any, total: int) -> str:
+        """Record a queued import and return its job id"""
+        now = datetime.utcnow()
+        result = self.collection.insert_one({
+            "user_id": user_id, "status": "queued", "total": total, "imported": 0,
+            "created_at": now, "updated_at": now
+        })
+        return str(result.inserted_id)
+    
+    def mark_running(self, job_id: str):
+        """Flag a job as picked up by the import pool"""
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)}, {"$set": {"status": "running", "updated_at": datetime.utcnow()}}
+        )
+    
+    def update_progress(self, job_id: str, imported: int):
+        """Store how many entries have been saved so far"""
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)}, {"$set": {"imported": imported, "updated_at": datetime.utcnow()}}
+        )
+    
+    def finish(self, job_id: str, result: Dict):
+        """Store the import summary; the job is 'complete' or 'failed' depending on it"""
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {
+                "status": "complete" if result.get("success") else "failed",
+                "imported": result.get("imported", 0),
+                "result": result,
+                "updated_at": datetime.utcnow()
+            }}
+        )
+    
+    def get(self, job_id: str, user_id: Any) -> Optional[Dict]:
+        """A user's import job, or None when the id is unknown or belongs to someone else"""
+        try:
+            job = self.collection.find_one({"_id": ObjectId(job_id), "user_id": user_id})
+        except InvalidId:
+            return None
+        if job:
+            job["job_id"] = str(job.pop("_id"))
+        return job
+
+class StreakReminderRepository:
+    """Repository for streak-at-risk reminders in MongoDB (one per user per day)"""
+    
+    RETENTION_DAYS = 7
+    
+    def __init__(self, collection):
+        self.collection = collection
+    
+    def ensure_indexes(self):
+        """One reminder per user and day; MongoDB expires old reminders"""
+        self.collection.create_index([("user_id", 1), ("day", 1)], unique=True)
+        self.collection.create_index("created_at", expireAfterSeconds=self.RETENTION_DAYS * 86400)
+    
+    def add_reminders(self, user_ids: List[Any], day: date, reason: str) -> int:
+        """Upsert reminders for a batch of users in one bulk write (re-runs are no-ops)"""
+        if not user_ids:
+            return 0
+        now = datetime.utcnow()
+        result = self.collection.bulk_write([
+            UpdateOne(
+                {"user_id": user_id, "day": day.isoformat()},
+                {"$setOnInsert": {"reason": reason, "created_at": now, "dismissed": False}},
+                upsert=True
+            )
+            for user_id in user_ids
+        ], ordered=False)
+        return result.upserted_count
+    
+    def get_reminders(self, user_id: Any) -> List[Dict]:
+        """A user's undismissed reminders, newest first"""
+        cursor = self.collection.find(
+            {"user_id": user_id, "dismissed": False}, {"_id": 0, "day": 1, "reason": 1}
+        ).sort("day", -1)
+        return list(cursor)
+    
+    def dismiss(self, user_id: Any) -> int:
+        """Mark all of a user's reminders as seen"""
+        return self.collection.update_many(
+            {"user_id": user_id, "dismissed": False}, {"$set": {"dismissed": True}}
+        ).modified_count
+
 # Achievement definitions
 ACHIEVEMENTS = {
     "first_entry": {
@@ -317,6 +1805,28 @@ ACHIEVEMENTS = {
     }
 }
 
+# One bit per achievement for UserStats.achievements_mask - only ever append to ACHIEVEMENTS
+ACHIEVEMENT_BITS = {key: 1 << position for position, key in enumerate(ACHIEVEMENTS)}
+
+# Milestones sorted by required streak, for bisect lookups
+MILESTONE_KEYS = sorted(ACHIEVEMENTS, key=lambda key: ACHIEVEMENTS[key]["streak_required"])
+MILESTONE_THRESHOLDS = [ACHIEVEMENTS[key]["streak_required"] for key in MILESTONE_KEYS]
+# MILESTONE_REACHED_MASKS[i] holds the bits of the first i milestones
+MILESTONE_REACHED_MASKS = [0]
+for _key in MILESTONE_KEYS:
+    MILESTONE_REACHED_MASKS.append(MILESTONE_REACHED_MASKS[-1] | ACHIEVEMENT_BITS[_key])
+
+
+def reached_achievements_mask(streak: int) -> int:
+    """Bits of every achievement whose required streak is at most `streak`"""
+    return MILESTONE_REACHED_MASKS[bisect.bisect_right(MILESTONE_THRESHOLDS, streak)]
+
+
+def achievement_keys(mask: int) -> List[str]:
+    """Achievement keys set in a mask, in milestone order"""
+    return [key for key in MILESTONE_KEYS if mask & ACHIEVEMENT_BITS[key]]
+
+
 class AchievementRepository:
     """Repository for Achievement operations"""
     
@@ -337,10 +1847,42 @@ class AchievementRepository:
         )
         
         self.db.add(achievement)
-        self.db.commit()
+        self.db.execute(
+            update(UserStats)
+            .where(UserStats.user_id == user_id)
+            .values(achievements_mask=UserStats.achievements_mask.op('|')(ACHIEVEMENT_BITS[achievement_key]))
+            .execution_options(synchronize_session=False)
+        )
+        _commit(self.db)
         self.db.refresh(achievement)
         return achievement
     
+    def insert_achievements(self, user_id: str, achievement_keys: List[str], streak_count: int):
+        """Award several achievements with one multi-row INSERT"""
+        self.insert_awards([(user_id, key, streak_count) for key in achievement_keys])
+    
+    def insert_awards(self, awards: List[Tuple[Any, str, int]]):
+        """Insert (user_id, achievement_key, streak_count) awards for any number of users at once"""
+        if not awards:
+            return
+        now = datetime.utcnow()
+        # The (user_id, achievement_type) constraint makes a duplicate award a no-op
+        self.db.execute(_dialect_insert(self.db, Achievement).on_conflict_do_nothing(
+            index_elements=[Achievement.user_id, Achievement.achievement_type]
+        ).values([
+            {
+                'id': str(uuid.uuid4()),
+                'user_id': user_id,
+                'achievement_type': key,
+                'achievement_name': ACHIEVEMENTS[key]["name"],
+                'description': ACHIEVEMENTS[key]["description"],
+                'badge_emoji': ACHIEVEMENTS[key]["badge"],
+                'earned_at': now,
+                'streak_count_when_earned': streak_count
+            }
+            for user_id, key, streak_count in awards
+        ]))
+    
     def get_user_achievements(self, user_id: str) -> List[Achievement]:
         """Get all user achievements"""
         return self.db.query(Achievement)\
@@ -348,64 +1890,170 @@ class AchievementRepository:
                      .order_by(Achievement.earned_at.desc())\
                      .all()
     
-    def check_and_award_achievements(self, user_id: str, current_streak: int) -> List[Achievement]:
-        """Check and award any new achievements"""
-        existing_achievements = {
-            a.achievement_type for a in self.get_user_achievements(user_id)
-        }
-        
-        new_achievements = []
-        for key, info in ACHIEVEMENTS.items():
-            if (key not in existing_achievements and 
-                current_streak >= info["streak_required"]):
-                achievement = self.award_achievement(user_id, key, current_streak)
-                new_achievements.append(achievement)
+    def check_and_award_achievements(self, user: UserStats, current_streak: int) -> List[Achievement]:
+        """Award achievements newly reached at current_streak, using the stats row's earned mask"""
+        new_bits = reached_achievements_mask(current_streak) & ~(user.achievements_mask or 0)
+        if not new_bits:
+            return []  # nothing new: no achievement queries at all
         
+        new_achievements = [
+            self.award_achievement(user.user_id, key, current_streak)
+            for key in achievement_keys(new_bits)
+        ]
+        user.achievements_mask = (user.achievements_mask or 0) | new_bits
         return new_achievements
 
+class UnitOfWork:
+    """One Postgres session and transaction shared by the user, streak and achievement repositories"""
+    
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._session: Optional[Session] = None
+        self._repositories: Dict[str, Any] = {}
+    
+    @property
+    def session(self) -> Session:
+        """The shared session, opened on first use"""
+        if self._session is None:
+            self._session = self._session_factory()
+            self._session.info["unit_of_work"] = True
+        return self._session
+    
+    @property
+    def users(self) -> "UserRepository":
+        return self._repository("users", UserRepository)
+    
+    @property
+    def streak_events(self) -> "StreakEventRepository":
+        return self._repository("streak_events", StreakEventRepository)
+    
+    @property
+    def achievements(self) -> "AchievementRepository":
+        return self._repository("achievements", AchievementRepository)
+    
+    def _repository(self, name: str, repository_class):
+        if name not in self._repositories:
+            self._repositories[name] = repository_class(self.session)
+        return self._repositories[name]
+    
+    def commit(self):
+        if self._session is not None:
+            self._session.commit()
+    
+    def rollback(self):
+        if self._session is not None:
+            self._session.rollback()
+    
+    def close(self):
+        """Close the session (rolling back anything uncommitted)"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        self._repositories.clear()
+
+
+# The unit of work bound to the current request, if any
+_current_unit_of_work: ContextVar[Optional[UnitOfWork]] = ContextVar("current_unit_of_work", default=None)
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Run a block in one transaction
+    
+    Joins the request's unit of work when there is one, otherwise opens a
+    standalone one. Commits when the block succeeds, rolls back when it raises,
+    and closes the session if this block opened it.
+    """
+    current = _current_unit_of_work.get()
+    uow = current or UnitOfWork()
+    try:
+        yield uow
+        uow.commit()
+    except Exception:
+        uow.rollback()
+        raise
+    finally:
+        if current is None:
+            uow.close()
+
+
+@contextmanager
+def request_scope():
+    """Bind one unit of work to the current request and close it deterministically when it ends"""
+    uow = UnitOfWork()
+    token = _current_unit_of_work.set(uow)
+    leaked_before = get_session_stats()["leaked"] if DEBUG_SESSIONS else 0
+    try:
+        yield uow
+    finally:
+        _current_unit_of_work.reset(token)
+        uow.close()
+        if DEBUG_SESSIONS:
+            stats = get_session_stats()
+            if stats["leaked"] > leaked_before:
+                logger.warning(
+                    f"⚠️ {stats['leaked'] - leaked_before} database session(s) leaked during request "
+                    f"({stats['leaked']} total, {stats['open']} open)"
+                )
+
+
+def _resolve_session(db_session: Optional[Session]) -> Session:
+    """
+    Pick the session for a repository factory: the one passed in, else the active unit of work's
+    
+    There is deliberately no fallback to a fresh SessionLocal(): nothing would close it.
+    """
+    if db_session is not None:
+        return db_session
+    current = _current_unit_of_work.get()
+    if current is None:
+        raise RuntimeError(
+            "No active unit of work - use `with unit_of_work() as uow:` or pass a session you close"
+        )
+    return current.session
+
+
 # Factory functions for repositories
 #def get_user_repository() -> UserRepository:
     #return UserRepository(db_manager.get_postgres_session()) #earlier code when db_manager was called
 def get_user_repository(db_session: Session | None = None) -> UserRepository:
-    """Return a UserRepository. If db_session is None, make a new SessionLocal()."""
-    close_after = False
-    if db_session is None:
-        db_session = SessionLocal()
-        close_after = True
-    repo = UserRepository(db_session)
-    # attach a flag so callers know whether to close the session
-    setattr(repo, "_close_session_on_finish", close_after)
-    return repo
+    """Return a UserRepository on db_session, or on the active unit of work's session."""
+    return UserRepository(_resolve_session(db_session))
 
 
 #def get_streak_event_repository() -> StreakEventRepository:
     #return StreakEventRepository(db_manager.get_postgres_session())
 def get_streak_event_repository(db_session: Session | None = None) -> StreakEventRepository:
-    close_after = False
-    if db_session is None:
-        db_session = SessionLocal()
-        close_after = True
-    repo = StreakEventRepository(db_session)
-    setattr(repo, "_close_session_on_finish", close_after)
-    return repo
+    return StreakEventRepository(_resolve_session(db_session))
 
 #def get_journal_repository() -> JournalRepository:
     #return JournalRepository(db_manager.mongo_collection)
 def get_journal_repository() -> JournalRepository:
     """Journal repository uses the module-level mongo collection created earlier."""
-    return JournalRepository(journal_collection)
+    return JournalRepository(
+        journal_collection,
+        JournalSearchRepository(search_postings_collection, search_stats_collection),
+        JournalSummaryRepository(summary_collection, summary_daily_collection)
+    )
+
+
+def get_job_checkpoint_repository() -> JobCheckpointRepository:
+    return JobCheckpointRepository(checkpoint_collection)
+
+
+def get_streak_reminder_repository() -> "StreakReminderRepository":
+    return StreakReminderRepository(reminder_collection)
+
+
+def get_import_job_repository() -> ImportJobRepository:
+    return ImportJobRepository(import_job_collection)
 
 
 #def get_achievement_repository() -> AchievementRepository:
     #return AchievementRepository(db_manager.get_postgres_session())
 def get_achievement_repository(db_session: Session | None = None) -> AchievementRepository:
-    close_after = False
-    if db_session is None:
-        db_session = SessionLocal()
-        close_after = True
-    repo = AchievementRepository(db_session)
-    setattr(repo, "_close_session_on_finish", close_after)
-    return repo
+    return AchievementRepository(_resolve_session(db_session))
 
 #if __name__ == "__main__":
     #db_manager = DatabaseManager()
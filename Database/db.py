@@ -1,7 +1,11 @@
 import os
+import logging
+import threading
+import traceback
+import weakref
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, session
+from sqlalchemy.orm import sessionmaker, session, Session
 
 from dotenv import load_dotenv
 
@@ -13,8 +17,51 @@ DATABASE_URL = os.getenv("POSTGRES_URL")
 # Create engine
 engine = create_engine(DATABASE_URL)
 
+# Session leak tracking (debug mode only: records where each session was opened)
+DEBUG_SESSIONS = os.getenv("DB_DEBUG_SESSIONS", "false").lower() == "true"
+logger = logging.getLogger(__name__)
+_session_stats = {"opened": 0, "closed": 0, "leaked": 0}
+_stats_lock = threading.Lock()
+
+
+def _on_session_collected(state: dict):
+    """Called when a tracked session is garbage-collected"""
+    if state["closed"]:
+        return
+    with _stats_lock:
+        _session_stats["leaked"] += 1
+    logger.warning("⚠️ Database session was never closed; opened at:\n%s", state["origin"])
+
+
+class TrackedSession(Session):
+    """Session that counts opens/closes and reports sessions dropped without close()"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tracking = None
+        if DEBUG_SESSIONS:
+            self._tracking = {"closed": False, "origin": "".join(traceback.format_stack(limit=8)[:-1])}
+            weakref.finalize(self, _on_session_collected, self._tracking)
+            with _stats_lock:
+                _session_stats["opened"] += 1
+
+    def close(self):
+        if self._tracking is not None and not self._tracking["closed"]:
+            self._tracking["closed"] = True
+            with _stats_lock:
+                _session_stats["closed"] += 1
+        super().close()
+
+
+def get_session_stats() -> dict:
+    """Opened/closed/leaked session counts (all zero unless DB_DEBUG_SESSIONS=true)"""
+    with _stats_lock:
+        stats = dict(_session_stats)
+    stats["open"] = stats["opened"] - stats["closed"] - stats["leaked"]
+    return stats
+
 # Create session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=TrackedSession)
 
 # Base class for models
 Base = declarative_base()
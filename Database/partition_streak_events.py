@@ -0,0 +1,26 @@
+# Database/partition_streak_events.py
+# One-off migration: convert an existing unpartitioned streak_events table to monthly partitions
+# run using: python -m Database.partition_streak_events --months-ahead 2
+
+import argparse
+
+from backend.Journal.config import Config
+from Database.Journal import convert_streak_events_to_partitioned
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Convert streak_events to a monthly partitioned table")
+    parser.add_argument("--months-ahead", type=int, default=Config.STREAK_EVENTS_PARTITIONS_AHEAD,
+                        help="Months of future partitions to create")
+    args = parser.parse_args()
+
+    copied = convert_streak_events_to_partitioned(args.months_ahead)
+    if copied is None:
+        print("streak_events is already partitioned (or not on Postgres) - nothing to do")
+    else:
+        print(f"streak_events partitioned: {copied} rows copied")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Database/stress_streaks.py
+# Manual check that concurrent entries for one user update the streak exactly once each
+# run using: python -m Database.stress_streaks --threads 32 --updates 300
+
+import argparse
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from backend.Auth.models import User
+from backend.Journal.streak_manager import StreakManager
+from Database.db import SessionLocal
+from Database.Journal import Achievement, StreakEvent, UserStats, ensure_streak_constraints
+
+parser = argparse.ArgumentParser(description="Fire parallel streak updates for a throwaway user")
+parser.add_argument("--threads", type=int, default=32)
+parser.add_argument("--updates", type=int, default=300)
+args = parser.parse_args()
+
+ensure_streak_constraints()
+session = SessionLocal()
+
+# STEP 1 — Create a throwaway user
+tag = uuid.uuid4().hex[:8]
+user = User(username=f"stress_{tag}", email=f"stress_{tag}@example.com", password="stress")
+session.add(user)
+session.commit()
+user_id = user.id
+print(f"✅ Created user: {user.username}, id={user_id}")
+
+# STEP 2 — Same-day entries from many threads at once
+manager = StreakManager()
+with ThreadPoolExecutor(max_workers=args.threads) as pool:
+    results = list(pool.map(lambda _: manager.update_user_streak(user_id, date.today()), range(args.updates)))
+errors = [r for r in results if r.get('error')]
+
+# STEP 3 — Check invariants
+session.expire_all()
+stats = session.query(UserStats).filter_by(user_id=user_id).first()
+events = [e.event_type for e in session.query(StreakEvent).filter_by(user_id=user_id)]
+awarded = [a.achievement_type for a in session.query(Achievement).filter_by(user_id=user_id)]
+
+checks = {
+    "no failed updates": not errors,
+    "total_entries == updates": stats is not None and stats.total_entries == args.updates,
+    "current_streak == 1": stats is not None and stats.current_streak == 1,
+    "one event per update": len(events) == args.updates,
+    "exactly one 'started' event": events.count('started') == 1,
+    "the rest are 'same_day'": events.count('same_day') == args.updates - 1,
+    "first_entry awarded once": awarded.count('first_entry') == 1,
+}
+
+print("\n🧭 Invariant Checks:")
+for name, ok in checks.items():
+    print(f"{'✅' if ok else '❌'} {name}")
+if errors:
+    print(f"First error: {errors[0].get('message')}")
+
+# STEP 4 — Clean up
+session.query(Achievement).filter_by(user_id=user_id).delete()
+session.query(StreakEvent).filter_by(user_id=user_id).delete()
+session.query(UserStats).filter_by(user_id=user_id).delete()
+session.query(User).filter_by(id=user_id).delete()
+session.commit()
+session.close()
+
+sys.exit(0 if all(checks.values()) else 1)
@@ -0,0 +1,32 @@
+# Database/summary_counts.py
+# Counter paths a journal analysis contributes to the per-user summaries (no database imports)
+
+from typing import Dict, Optional
+
+TOP_EMOTIONS_PER_ENTRY = 2
+
+
+def field_name(name: str) -> str:
+    """Make a label safe to use as a MongoDB field name"""
+    return str(name).replace(".", "_").replace("$", "_")
+
+
+def contribution(analysis: Optional[Dict], top_emotions: int = TOP_EMOTIONS_PER_ENTRY) -> Dict[str, int]:
+    """Counter paths an analysis adds to (empty while pending or when the analysis failed)"""
+    if not analysis or (analysis.get("analysis_metadata") or {}).get("error"):
+        return {}
+
+    sentiment = analysis.get("sentiment", {}).get("label", "Neutral")
+    if analysis.get("mixed_emotions", False):
+        sentiment = "Mixed"
+    counts = {f"sentiments.{field_name(sentiment)}": 1}
+
+    for tag in analysis.get("eco_tags", []):
+        path = f"eco_tags.{field_name(tag)}"
+        counts[path] = counts.get(path, 0) + 1
+
+    for emotion in analysis.get("emotions", {}).get("top_emotions", [])[:top_emotions]:
+        if emotion.get("label"):
+            path = f"emotions.{field_name(emotion['label'])}"
+            counts[path] = counts.get(path, 0) + 1
+    return counts
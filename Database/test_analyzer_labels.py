@@ -0,0 +1,67 @@
+# Database/test_analyzer_labels.py
+# Checks that forward-pass scores land in the right label columns when the model's
+# labels differ from the configured emotion labels
+# Needs the backend importable (transformers installed; torch is not needed, the model is a stub)
+# run using: python -m Database.test_analyzer_labels
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from backend.Journal.analyzer import EcoJournalAnalyzer
+
+# Deliberately not the configured label set: 'guilt'/'shame' are configured but missing,
+# 'stub_only' has no configured weight
+MODEL_LABELS = ["joy", "anger", "stub_only", "optimism", "neutral"]
+
+
+class StubModelAnalyzer(EcoJournalAnalyzer):
+    """Analyzer whose 'model' only exposes id2label; _forward_batch returns fixed scores"""
+
+    def _load_model(self):
+        config = SimpleNamespace(id2label=dict(enumerate(MODEL_LABELS)))
+        self.emotion_classifier = SimpleNamespace(model=SimpleNamespace(config=config))
+
+    def _forward_batch(self, texts):
+        scores = np.zeros((len(texts), len(MODEL_LABELS)))
+        for row, text in enumerate(texts):
+            scores[row, MODEL_LABELS.index(text)] = 0.9
+        pooled = np.ones((len(texts), 4), dtype=np.float32)
+        return scores, pooled
+
+
+def test_label_tables_cover_model_and_configured_labels():
+    analyzer = StubModelAnalyzer()
+    assert analyzer.labels[:len(MODEL_LABELS)] == MODEL_LABELS
+    assert "guilt" in analyzer.label_index and "shame" in analyzer.label_index
+    assert len(analyzer.labels) > len(MODEL_LABELS)
+
+
+def test_forward_scores_use_model_columns():
+    analyzer = StubModelAnalyzer()
+    analyzer.compute_embeddings = True
+    texts = ["anger", "optimism", "joy", "stub_only"]
+    matrix, embeddings = analyzer._run_bucketed(texts, [3, 8, 1, 5])
+
+    assert matrix.shape == (len(texts), len(analyzer.labels))
+    assert embeddings.shape == (len(texts), 4)
+    for row, label in enumerate(texts):
+        assert matrix[row, analyzer.label_index[label]] == 0.9
+        assert matrix[row].sum() == 0.9
+    assert not matrix[:, analyzer.label_index["guilt"]].any()
+
+
+def test_postprocess_reads_placed_scores():
+    analyzer = StubModelAnalyzer()
+    analyzer.compute_embeddings = True
+    matrix, _ = analyzer._run_bucketed(["anger", "joy"], [2, 2])
+    anger, joy = analyzer._postprocess_scores(matrix)
+    assert anger["sentiment"]["label"] == "Negative"
+    assert joy["sentiment"]["label"] == "Positive"
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"✅ {name}")
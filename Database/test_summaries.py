@@ -0,0 +1,55 @@
+# Database/test_summaries.py
+# Checks that journal summary counters skip failed analyses
+# Pure functions only - no database, backend or environment needed
+# run using: python -m Database.test_summaries
+
+from Database.summary_counts import contribution
+
+ANALYSIS = {
+    "sentiment": {"label": "Positive"},
+    "mixed_emotions": False,
+    "eco_tags": ["transport", "transport", "waste"],
+    "emotions": {"top_emotions": [{"label": "joy"}, {"label": "pride"}, {"label": "relief"}]},
+    "analysis_metadata": {"analysis_version": "v1"}
+}
+
+# What the analyzer returns when the model pass fails
+ERRORED_ANALYSIS = {
+    "sentiment": {"label": "Neutral", "score": 0.0, "confidence": 0.0},
+    "emotions": {"top_emotions": [], "breakdown": {}, "total_emotions_detected": 0},
+    "eco_tags": [],
+    "mixed_emotions": False,
+    "analysis_metadata": {"total_raw_emotions": 0, "error": True}
+}
+
+
+def test_counts_successful_analysis():
+    assert contribution(ANALYSIS) == {
+        "sentiments.Positive": 1,
+        "eco_tags.transport": 2,
+        "eco_tags.waste": 1,
+        "emotions.joy": 1,
+        "emotions.pride": 1
+    }
+
+
+def test_skips_errored_analysis():
+    assert contribution(ERRORED_ANALYSIS) == {}
+
+
+def test_skips_pending_analysis():
+    assert contribution(None) == {}
+
+
+def test_failed_reanalysis_moves_no_counts():
+    # Replacing a failed analysis with a good one only adds the good one's counts
+    new = contribution(ANALYSIS)
+    old = contribution(ERRORED_ANALYSIS)
+    assert {path: new.get(path, 0) - old.get(path, 0) for path in new} == new
+
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith("test_") and callable(check):
+            check()
+            print(f"✅ {name}")
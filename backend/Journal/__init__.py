@@ -30,6 +30,7 @@ __author__ = "Eco-App Development Team"
 from .journal_service import EcoJournalService
 from .analyzer import EcoJournalAnalyzer, InspirationGenerator  
 from .streak_manager import StreakManager
+from .keyword_tagger import EcoKeywordTagger
 from .config import Config
 
 __all__ = [
@@ -37,5 +38,6 @@ __all__ = [
     'EcoJournalAnalyzer', 
     'InspirationGenerator',
     'StreakManager',
+    'EcoKeywordTagger',
     'Config'
 ]
\ No newline at end of file
@@ -0,0 +1,128 @@
+# backend/journal/analysis_worker.py
+# Background worker that drains the deferred analysis queue
+
+import logging
+import threading
+from typing import Dict, List
+
+from backend.Journal.config import Config
+from backend.Journal.task_queue import AnalysisTaskQueue
+
+logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
+logger = logging.getLogger(__name__)
+
+
+class AnalysisWorker:
+    """Runs queued analyses in batches and writes results back to MongoDB"""
+
+    def __init__(self, queue: AnalysisTaskQueue, analyzer, inspiration_generator, journal_repo,
+                 batch_size: int = Config.ANALYSIS_WORKER_BATCH_SIZE,
+                 poll_interval: float = Config.ANALYSIS_WORKER_POLL_SECONDS,
+                 similarity_index=None, dashboard_cache=None):
+        self.queue = queue
+        self.analyzer = analyzer
+        self.inspiration_generator = inspiration_generator
+        self.journal_repo = journal_repo
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.similarity_index = similarity_index
+        self.dashboard_cache = dashboard_cache
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="analysis-worker", daemon=True)
+        self._thread.start()
+        logger.info("✅ Analysis worker started")
+
+    def stop(self, timeout: float = 10.0):
+        """Signal the worker to stop and wait for the current batch"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info("Analysis worker stopped")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                # Under load, leave low-priority upgrades until the model has headroom
+                max_priority = 0 if self.analyzer.should_shed_load() else None
+                tasks = self.queue.claim(self.batch_size, max_priority=max_priority)
+            except Exception as e:
+                logger.error(f"Failed to claim analysis tasks: {e}")
+                tasks = []
+
+            if not tasks:
+                self._stop_event.wait(self.poll_interval)
+                continue
+
+            self.process_batch(tasks)
+
+    def process_batch(self, tasks: List[Dict]):
+        """
+        Analyze a batch of queued entries and store the results
+
+        Args:
+            tasks: Claimed tasks from the queue
+        """
+        try:
+            analyses = self.analyzer.analyze_batch([task['payload']['content'] for task in tasks])
+        except Exception as e:
+            logger.error(f"Deferred analysis failed for {len(tasks)} entries: {e}")
+            for task in tasks:
+                self.queue.fail(task['id'], str(e))
+            return
+
+        completed = []
+        for task, analysis_result in zip(tasks, analyses):
+            try:
+                metadata = analysis_result['analysis_metadata']
+                if metadata.get('error'):
+                    # Keep whatever the entry holds (e.g. a provisional result) and retry
+                    self.queue.fail(task['id'], "Model analysis failed")
+                    continue
+
+                is_upgrade = task['payload'].get('upgrade', False)
+                provisional = metadata.get('needs_upgrade', False)
+
+                # An upgrade that only produced another lexicon result changes nothing
+                if not (is_upgrade and provisional):
+                    inspiration = None
+                    if not is_upgrade:  # keep the inspiration the user already saw
+                        inspiration = self.inspiration_generator.generate_inspiration(
+                            analysis_result, task['payload'].get('user_context', {})
+                        )
+                    self.journal_repo.update_entry_analysis(
+                        entry_id=task['entry_id'],
+                        analysis_result=analysis_result,
+                        inspiration=inspiration,
+                        eco_tags=analysis_result.get('eco_tags', []),
+                        analysis_status='provisional' if provisional else 'complete'
+                    )
+                    if self.dashboard_cache is not None:
+                        self.dashboard_cache.invalidate(task['payload'].get('user_id'))
+                    if self.similarity_index is not None and analysis_result.get('embedding') is not None:
+                        self.similarity_index.add(
+                            task['entry_id'], task['payload'].get('user_id'), analysis_result['embedding']
+                        )
+
+                if provisional:
+                    # Full model unavailable - keep the task and recheck later as an upgrade, so
+                    # the inspiration just stored is not generated again. An outage is not the
+                    # task's fault, so it does not use up attempts and the task is never parked.
+                    self.queue.fail(
+                        task['id'], "Full model unavailable", payload={**task['payload'], 'upgrade': True},
+                        count_attempt=False
+                    )
+                else:
+                    completed.append(task['id'])
+            except Exception as e:
+                logger.error(f"Failed to store deferred analysis for entry {task['entry_id']}: {e}")
+                self.queue.fail(task['id'], str(e))
+
+        self.queue.complete(completed)
+        logger.info(f"💾 Deferred analysis stored for {len(completed)}/{len(tasks)} entries")
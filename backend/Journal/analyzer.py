@@ -2,25 +2,75 @@
 # Sentiment and Emotion Analysis for Eco-Journal
 
 import asyncio
+import bisect
 import logging
+import threading
+import time
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from transformers import pipeline
 import numpy as np
+try:
+    import torch
+except ImportError:  # pipeline-only mode, no embeddings
+    torch = None
 from backend.Journal.config import Config
+from backend.Journal.keyword_tagger import EcoKeywordTagger
+from backend.Journal.lexicon_scorer import LexiconEmotionScorer
+from backend.metrics import registry
 
 logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+ANALYSIS_STAGE_SECONDS = registry.histogram(
+    "journal_analysis_stage_seconds", "Latency of each emotion analysis stage", ["stage"]
+)
+ANALYSIS_TOKENS_TOTAL = registry.counter(
+    "journal_analysis_tokens_total", "Tokens sent to the model, real vs padded", ["kind"]
+)
+
 class EcoJournalAnalyzer:
     """Handles sentiment analysis and emotion detection for journal entries"""
     
-    def __init__(self):
+    CATEGORY_NAMES = ('positive', 'negative', 'neutral')
+    TOP_EMOTIONS = 3
+    
+    def __init__(self, chunking: bool = Config.ENABLE_CHUNKING):
         self.emotion_classifier = None
         self.emotion_weights = Config.get_emotion_weights()
         self.eco_keywords = Config.get_eco_keywords()
+        self.eco_tagger = EcoKeywordTagger(self.eco_keywords)
         self.confidence_threshold = Config.EMOTION_CONFIDENCE_THRESHOLD
+        self.analysis_version = Config.get_analysis_version()
+        self.batch_size = Config.ANALYSIS_BATCH_SIZE
+        self.chunking = chunking
+        self.chunk_max_tokens = Config.CHUNK_MAX_TOKENS
+        self.chunk_overlap_tokens = Config.CHUNK_OVERLAP_TOKENS
+        self.bucket_edges = sorted(Config.LENGTH_BUCKET_EDGES)
+        self.padding_stats = {'real_tokens': 0, 'padded_tokens': 0, 'batches': 0}
+        self._stats_lock = threading.Lock()  # request threads and the analysis worker share the counters
+        self.lexicon_scorer = LexiconEmotionScorer(self.emotion_weights, Config.get_emotion_lexicon())
+        self.max_in_flight = Config.LOAD_SHED_MAX_IN_FLIGHT
+        self.max_wait_seconds = Config.LOAD_SHED_MAX_WAIT_SECONDS
+        self._load_lock = threading.Lock()
+        self._in_flight = 0
+        self._seconds_per_entry = None  # EWMA of model latency per entry
+        self.compute_embeddings = Config.ENABLE_EMBEDDINGS and torch is not None
+        self.embedding_dim = Config.EMBEDDING_DIM
+        self._embedding_projection = None
+        self._flat_weights = {
+            label: weight
+            for emotions in self.emotion_weights.values()
+            for label, weight in emotions.items()
+        }
         self._load_model()
+        # Built once: model labels plus any configured (lexicon) labels the model lacks
+        model_labels = self._get_model_labels()
+        self._build_label_tables(model_labels + [
+            label for label in self._flat_weights if label not in set(model_labels)
+        ])
+        # Column of each model output (id2label order) in the label tables
+        self._model_columns = np.array([self.label_index[label] for label in model_labels], dtype=np.intp)
         
     def _load_model(self):
         """Load HuggingFace emotion classification model"""
@@ -36,6 +86,29 @@ class EcoJournalAnalyzer:
             logger.error(f"❌ Failed to load model: {e}")
             self.emotion_classifier = None  # indicates fallback mode
     
+    def _get_model_labels(self) -> List[str]:
+        """Return emotion labels in the model's output order"""
+        try:
+            id2label = self.emotion_classifier.model.config.id2label
+            return [id2label[i] for i in sorted(id2label)]
+        except Exception:
+            # No model loaded - fall back to the configured labels
+            return list(self._flat_weights)
+    
+    def _build_label_tables(self, labels: List[str]):
+        """Precompute label-index aligned weight and category arrays"""
+        self.labels = list(labels)
+        self.label_index = {label: idx for idx, label in enumerate(self.labels)}
+        self.label_weights = np.array(
+            [self._flat_weights.get(label, 0.0) for label in self.labels],
+            dtype=np.float64
+        )
+        self.label_abs_weights = np.abs(self.label_weights)
+        # 0 = positive, 1 = negative, 2 = neutral (same sign rule as before)
+        self.label_categories = np.where(
+            self.label_weights > 0, 0, np.where(self.label_weights < 0, 1, 2)
+        )
+    
     def analyze_journal_entry(self, text: str) -> Dict[str, Any]:
         """
         Analyze journal entry for emotions and sentiment
@@ -46,130 +119,417 @@ class EcoJournalAnalyzer:
         Returns:
             Dictionary containing sentiment, emotions, and metadata
         """
-        if not text or not text.strip():
-            return self._create_empty_analysis()
+        return self.analyze_batch([text])[0]
+    
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze several journal entries with one batched model call
+        
+        Args:
+            texts: Journal entry texts
+            
+        Returns:
+            List of analysis dictionaries, aligned with texts
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        pending = []
+        
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                pending.append(i)
+            else:
+                results[i] = self._create_empty_analysis()
+        
+        if not pending:
+            return results
+        
+        if self.emotion_classifier is None:
+            # Model unavailable - the lexicon tier beats a blanket Neutral
+            fast_results = self.analyze_fast([texts[i] for i in pending])
+            for row, i in enumerate(pending):
+                results[i] = fast_results[row]
+            return results
+        
+        with self._load_lock:
+            self._in_flight += len(pending)
+        started = time.perf_counter()
         
         try:
-            # Get emotion predictions
-            raw_emotions = self.emotion_classifier(text)[0]
+            with ANALYSIS_STAGE_SECONDS.time(stage='tokenize'):
+                # Pre-tokenize the whole batch once with the fast tokenizer
+                encodings = self.emotion_classifier.tokenizer(
+                    [texts[i] for i in pending], add_special_tokens=False, return_offsets_mapping=True
+                )
+                
+                # Long entries become several overlapping windows, all run in one batch
+                window_texts, owners, window_lengths = [], [], []
+                first_windows, chunk_counts = [], []
+                for row, i in enumerate(pending):
+                    windows = self._split_into_windows(texts[i], encodings['offset_mapping'][row])
+                    first_windows.append(len(window_texts))
+                    chunk_counts.append(len(windows))
+                    for window_text, token_count in windows:
+                        window_texts.append(window_text)
+                        owners.append(row)
+                        window_lengths.append(token_count)
             
-            # Filter significant emotions
-            significant_emotions = [
-                e for e in raw_emotions 
-                if e['score'] >= self.confidence_threshold
-            ]
+            # Times its own tokenize and forward stages per mini-batch
+            window_matrix, window_embeddings = self._run_bucketed(window_texts, window_lengths)
             
-            # Calculate weighted sentiment
-            sentiment_result = self._calculate_weighted_sentiment(significant_emotions)
+            with ANALYSIS_STAGE_SECONDS.time(stage='postprocess'):
+                owners = np.array(owners)
+                window_weights = np.array(window_lengths, dtype=np.float64)
+                score_matrix = self._aggregate_windows(window_matrix, owners, window_weights, len(pending))
+                processed = self._postprocess_scores(score_matrix)
+                
+                embeddings = None
+                if window_embeddings is not None:
+                    embeddings = self._compact_embeddings(
+                        self._aggregate_windows(window_embeddings, owners, window_weights, len(pending))
+                    )
+                
+                for row, i in enumerate(pending):
+                    results[i] = self._assemble_analysis(
+                        texts[i], processed[row], len(self.labels), chunk_counts[row]
+                    )
+                    if embeddings is not None:
+                        results[i]['embedding'] = embeddings[row]
+                
+        except Exception as e:
+            logger.error(f"Batch analysis failed for {len(pending)} entries. Error: {e}")
+            for i in pending:
+                results[i] = self._create_empty_analysis()
+        
+        finally:
+            self._record_latency(time.perf_counter() - started, len(pending))
+        
+        return results
+    
+    def analyze_fast(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze entries with the lexicon tier (no model call)
+        
+        Results use the same format as analyze_batch but are flagged with
+        needs_upgrade so the full model can replace them later.
+        
+        Args:
+            texts: Journal entry texts
             
-            # Categorize emotions
-            emotion_breakdown = self._categorize_emotions(significant_emotions)
+        Returns:
+            List of analysis dictionaries, aligned with texts
+        """
+        raw_outputs = self.lexicon_scorer.score_batch([text or '' for text in texts])
+        processed = self._postprocess_scores(self._scores_to_matrix(raw_outputs))
+        
+        return [
+            self._assemble_analysis(text or '', processed[row], len(raw_outputs[row]), tier='lexicon')
+            for row, text in enumerate(texts)
+        ]
+    
+    def _record_latency(self, elapsed: float, entries: int):
+        """Release in-flight slots and update the per-entry latency estimate"""
+        with self._load_lock:
+            self._in_flight -= entries
+            per_entry = elapsed / max(entries, 1)
+            if self._seconds_per_entry is None:
+                self._seconds_per_entry = per_entry
+            else:
+                self._seconds_per_entry = 0.8 * self._seconds_per_entry + 0.2 * per_entry
+    
+    def predicted_wait_seconds(self, queue_depth: int = 0) -> float:
+        """Estimate how long a new entry would wait for the model"""
+        with self._load_lock:
+            backlog = self._in_flight + queue_depth
+            per_entry = self._seconds_per_entry or 0.0
+        return backlog * per_entry
+    
+    def should_shed_load(self, queue_depth: int = 0) -> bool:
+        """
+        Decide whether new work should take the lexicon tier
+        
+        Args:
+            queue_depth: Entries already waiting for the model elsewhere (e.g. the deferred queue)
             
-            # Extract eco-related tags
-            eco_tags = self._extract_eco_tags(text)
+        Returns:
+            True if in-flight work or predicted wait exceeds the configured limits
+        """
+        with self._load_lock:
+            in_flight = self._in_flight
+        
+        return (in_flight + queue_depth >= self.max_in_flight or
+                self.predicted_wait_seconds(queue_depth) > self.max_wait_seconds)
+    
+    def _split_into_windows(self, text: str, offsets: List[Tuple[int, int]]) -> List[Tuple[str, int]]:
+        """
+        Split text into overlapping token windows that fit the model
+        
+        Args:
+            text: Journal entry text
+            offsets: Token character offsets from the fast tokenizer
             
-            # Determine if mixed emotions
-            mixed_emotions = self._has_mixed_emotions(emotion_breakdown)
+        Returns:
+            List of (window text, token count) pairs; a single pair for short text
+        """
+        total_tokens = len(offsets)
+        
+        if not self.chunking or total_tokens <= self.chunk_max_tokens:
+            return [(text, max(min(total_tokens, self.chunk_max_tokens), 1))]
+        
+        # Slice the original text on token offsets so windows round-trip exactly
+        step = max(self.chunk_max_tokens - self.chunk_overlap_tokens, 1)
+        windows = []
+        for start in range(0, total_tokens, step):
+            end = min(start + self.chunk_max_tokens, total_tokens)
+            windows.append((text[offsets[start][0]:offsets[end - 1][1]], end - start))
+            if end == total_tokens:
+                break
+        
+        return windows
+    
+    def _assign_buckets(self, lengths: List[int]) -> List[List[int]]:
+        """Group sequence indices into length buckets, shortest first within each bucket"""
+        buckets = [[] for _ in range(len(self.bucket_edges) + 1)]
+        for idx in sorted(range(len(lengths)), key=lengths.__getitem__):
+            buckets[bisect.bisect_left(self.bucket_edges, lengths[idx])].append(idx)
+        return [bucket for bucket in buckets if bucket]
+    
+    def _run_bucketed(self, window_texts: List[str],
+                      window_lengths: List[int]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Run the classifier bucket by bucket so each padded batch holds similar lengths
+        
+        Args:
+            window_texts: Texts to classify
+            window_lengths: Token count of each text (without special tokens)
             
-            return {
-                'sentiment': sentiment_result,
-                'emotions': {
-                    'top_emotions': sorted(significant_emotions, key=lambda x: x['score'], reverse=True)[:3],
-                    'breakdown': emotion_breakdown,
-                    'total_emotions_detected': len(significant_emotions)
-                },
-                'eco_tags': eco_tags,
-                'mixed_emotions': mixed_emotions,
-                'analysis_metadata': {
-                    'confidence_threshold': self.confidence_threshold,
-                    'total_raw_emotions': len(raw_emotions),
-                    'analysis_timestamp': datetime.utcnow().isoformat()
-                }
-            }
+        Returns:
+            Tuple of (window x label score matrix, window x hidden embeddings or None),
+            rows in the original order of window_texts
+        """
+        raw_outputs: List[Optional[List[Dict]]] = [None] * len(window_texts)
+        score_matrix = np.zeros((len(window_texts), len(self.labels)), dtype=np.float64)
+        embeddings = None
+        special_tokens = 2  # <s> and </s>
+        
+        for bucket in self._assign_buckets(window_lengths):
+            for start in range(0, len(bucket), self.batch_size):
+                batch = bucket[start:start + self.batch_size]
+                batch_texts = [window_texts[idx] for idx in batch]
+                
+                if self.compute_embeddings:
+                    # One forward pass yields both emotion scores and pooled hidden states
+                    scores, pooled = self._forward_batch(batch_texts)
+                    score_matrix[np.ix_(batch, self._model_columns)] = scores
+                    if embeddings is None:
+                        embeddings = np.zeros((len(window_texts), pooled.shape[1]), dtype=np.float32)
+                    embeddings[batch] = pooled
+                else:
+                    # The pipeline tokenizes internally, so that time counts as forward here
+                    with ANALYSIS_STAGE_SECONDS.time(stage='forward'):
+                        outputs = self.emotion_classifier(batch_texts, batch_size=len(batch), truncation=True)
+                    for idx, output in zip(batch, outputs):
+                        raw_outputs[idx] = output
             
-        except Exception as e:
-            logger.error(f"Analysis failed for text: {text[:50]}... Error: {e}")
-            return self._create_empty_analysis()
+            # Each mini-batch is padded to its longest member
+            for start in range(0, len(bucket), self.batch_size):
+                lengths = [window_lengths[idx] + special_tokens for idx in bucket[start:start + self.batch_size]]
+                with self._stats_lock:
+                    self.padding_stats['real_tokens'] += sum(lengths)
+                    self.padding_stats['padded_tokens'] += max(lengths) * len(lengths)
+                    self.padding_stats['batches'] += 1
+                ANALYSIS_TOKENS_TOTAL.inc(sum(lengths), kind='real')
+                ANALYSIS_TOKENS_TOTAL.inc(max(lengths) * len(lengths), kind='padded')
+        
+        if not self.compute_embeddings:
+            score_matrix = self._scores_to_matrix(raw_outputs)
+        return score_matrix, embeddings
     
-    def _calculate_weighted_sentiment(self, emotions: List[Dict]) -> Dict[str, Any]:
-        """Calculate weighted sentiment score from emotions"""
-        sentiment_score = 0.0
-        total_weight = 0.0
+    def _forward_batch(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run the model directly, returning label scores and mean-pooled hidden states
         
-        for emotion in emotions:
-            label = emotion['label']
-            score = emotion['score']
-            
-            # Find emotion weight
-            weight = self._get_emotion_weight(label)
-            weighted_contribution = weight * score
-            sentiment_score += weighted_contribution
-            total_weight += abs(weight) * score
+        Scores use the same activation the pipeline would apply, in id2label order.
+        """
+        tokenizer = self.emotion_classifier.tokenizer
+        model = self.emotion_classifier.model
+        with ANALYSIS_STAGE_SECONDS.time(stage='tokenize'):
+            inputs = tokenizer(
+                texts, padding=True, truncation=True,
+                max_length=self.chunk_max_tokens + 2, return_tensors='pt'
+            ).to(model.device)
         
-        # Normalize sentiment score
-        if total_weight > 0:
-            sentiment_score = sentiment_score / total_weight * 2  # Scale factor
-        
-        # Determine sentiment label
-        if sentiment_score > Config.SENTIMENT_THRESHOLD_POSITIVE:
-            sentiment_label = "Positive"
-        elif sentiment_score < Config.SENTIMENT_THRESHOLD_NEGATIVE:
-            sentiment_label = "Negative"
+        with ANALYSIS_STAGE_SECONDS.time(stage='forward'), torch.inference_mode():
+            outputs = model(**inputs, output_hidden_states=True)
+        
+        logits = outputs.logits.float()
+        if model.config.problem_type == 'multi_label_classification' or model.config.num_labels == 1:
+            scores = torch.sigmoid(logits)
         else:
-            sentiment_label = "Neutral"
+            scores = torch.softmax(logits, dim=-1)
+        
+        hidden = outputs.hidden_states[-1].float()
+        mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
         
+        return scores.cpu().numpy(), pooled.cpu().numpy()
+    
+    def _compact_embeddings(self, pooled: np.ndarray) -> np.ndarray:
+        """Random-project pooled states to EMBEDDING_DIM, L2-normalize and store as float16"""
+        if self._embedding_projection is None or self._embedding_projection.shape[0] != pooled.shape[1]:
+            rng = np.random.default_rng(Config.EMBEDDING_SEED)
+            self._embedding_projection = (
+                rng.standard_normal((pooled.shape[1], self.embedding_dim)) / np.sqrt(self.embedding_dim)
+            ).astype(np.float32)
+        
+        projected = pooled.astype(np.float32) @ self._embedding_projection
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        return (projected / np.maximum(norms, 1e-12)).astype(np.float16)
+    
+    def get_padding_metrics(self) -> Dict[str, Any]:
+        """Return cumulative padding statistics for the batched inference path"""
+        with self._stats_lock:
+            stats = dict(self.padding_stats)
+        padded = stats['padded_tokens']
+        real = stats['real_tokens']
         return {
-            'label': sentiment_label,
-            'score': round(sentiment_score, 3),
-            'confidence': round(abs(sentiment_score), 3),
-            'raw_score': sentiment_score
+            'bucket_edges': list(self.bucket_edges),
+            'batches': stats['batches'],
+            'real_tokens': real,
+            'padded_tokens': padded,
+            'padding_ratio': round(1 - real / padded, 4) if padded else 0.0
         }
     
-    def _get_emotion_weight(self, emotion_label: str) -> float:
-        """Get weight for specific emotion"""
-        for category, emotions in self.emotion_weights.items():
-            if emotion_label in emotions:
-                return emotions[emotion_label]
-        return 0.0  # Unknown emotion
-    
-    def _categorize_emotions(self, emotions: List[Dict]) -> Dict[str, List[Dict]]:
-        """Categorize emotions into positive, negative, neutral"""
-        categorized = {'positive': [], 'negative': [], 'neutral': []}
-        
-        for emotion in emotions:
-            label = emotion['label']
-            weight = self._get_emotion_weight(label)
+    def _aggregate_windows(self, window_matrix: np.ndarray, owners: np.ndarray,
+                           window_lengths: np.ndarray, num_texts: int) -> np.ndarray:
+        """Combine window scores into one row per text, weighted by window length"""
+        if window_matrix.shape[0] == num_texts:
+            return window_matrix  # No text was split
+        
+        aggregated = np.zeros((num_texts, window_matrix.shape[1]), dtype=np.float64)
+        np.add.at(aggregated, owners, window_matrix * window_lengths[:, None])
+        totals = np.bincount(owners, weights=window_lengths, minlength=num_texts)
+        return aggregated / totals[:, None]
+    
+    def _scores_to_matrix(self, raw_outputs: List[List[Dict]]) -> np.ndarray:
+        """
+        Convert pipeline output into a (batch x labels) score matrix
+        
+        The label tables are fixed after __init__ (threads read them concurrently);
+        a label outside them has no configured weight and is dropped.
+        """
+        matrix = np.zeros((len(raw_outputs), len(self.labels)), dtype=np.float64)
+        for row, emotions in enumerate(raw_outputs):
+            for emotion in emotions:
+                idx = self.label_index.get(emotion['label'])
+                if idx is not None:
+                    matrix[row, idx] = emotion['score']
+        return matrix
+    
+    def _postprocess_scores(self, score_matrix: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Threshold, score, categorize and rank a batch of emotion scores
+        
+        Args:
+            score_matrix: (batch x labels) emotion probabilities
             
-            category = 'neutral'
-            if weight > 0:
-                category = 'positive'
-            elif weight < 0:
-                category = 'negative'
+        Returns:
+            Per-row sentiment, top emotions and categorized breakdown
+        """
+        significant = score_matrix >= self.confidence_threshold
+        masked = np.where(significant, score_matrix, 0.0)
+        
+        sentiment_scores = self._calculate_weighted_sentiment(masked)
+        sentiment_labels = np.where(
+            sentiment_scores > Config.SENTIMENT_THRESHOLD_POSITIVE, 'Positive',
+            np.where(sentiment_scores < Config.SENTIMENT_THRESHOLD_NEGATIVE, 'Negative', 'Neutral')
+        )
+        
+        # One descending sort per row serves both top-k and the category breakdown
+        order = np.argsort(-masked, axis=1, kind='stable')
+        significant_counts = significant.sum(axis=1)
+        
+        processed = []
+        for row in range(score_matrix.shape[0]):
+            count = int(significant_counts[row])
+            ranked = order[row, :count]
+            sentiment_score = float(sentiment_scores[row])
             
-            categorized[category].append({
-                'emotion': label,
-                'score': round(emotion['score'], 3),
-                'weight': weight
+            processed.append({
+                'sentiment': {
+                    'label': str(sentiment_labels[row]),
+                    'score': round(sentiment_score, 3),
+                    'confidence': round(abs(sentiment_score), 3),
+                    'raw_score': sentiment_score
+                },
+                'top_emotions': [
+                    {'label': self.labels[idx], 'score': float(score_matrix[row, idx])}
+                    for idx in ranked[:self.TOP_EMOTIONS]
+                ],
+                'breakdown': self._categorize_emotions(score_matrix[row], ranked),
+                'total_emotions_detected': count
             })
         
-        # Sort by score within each category
-        for category in categorized:
-            categorized[category].sort(key=lambda x: x['score'], reverse=True)
+        return processed
+    
+    def _calculate_weighted_sentiment(self, masked_scores: np.ndarray) -> np.ndarray:
+        """Calculate weighted sentiment scores for a batch of thresholded emotions"""
+        weighted = masked_scores @ self.label_weights
+        total_weight = masked_scores @ self.label_abs_weights
+        
+        # Normalize sentiment score
+        safe_total = np.where(total_weight > 0, total_weight, 1.0)
+        return np.where(total_weight > 0, weighted / safe_total * 2, 0.0)  # Scale factor
+    
+    def _get_emotion_weight(self, emotion_label: str) -> float:
+        """Get weight for specific emotion"""
+        return self._flat_weights.get(emotion_label, 0.0)  # 0.0 for unknown emotion
+    
+    def _categorize_emotions(self, scores: np.ndarray, ranked: np.ndarray) -> Dict[str, List[Dict]]:
+        """Categorize ranked emotions into positive, negative, neutral"""
+        categorized = {name: [] for name in self.CATEGORY_NAMES}
+        
+        # ranked is already sorted by score, so each category stays sorted
+        for idx in ranked:
+            categorized[self.CATEGORY_NAMES[self.label_categories[idx]]].append({
+                'emotion': self.labels[idx],
+                'score': round(float(scores[idx]), 3),
+                'weight': float(self.label_weights[idx])
+            })
         
         return categorized
     
+    def _assemble_analysis(self, text: str, processed: Dict[str, Any], total_raw_emotions: int,
+                           chunk_count: int = 1, tier: str = 'model') -> Dict[str, Any]:
+        """Combine post-processed emotion scores with text-level features"""
+        # Extract eco-related tags and their spans
+        eco_tags, eco_matches = self.eco_tagger.extract(text)
+        
+        return {
+            'sentiment': processed['sentiment'],
+            'emotions': {
+                'top_emotions': processed['top_emotions'],
+                'breakdown': processed['breakdown'],
+                'total_emotions_detected': processed['total_emotions_detected']
+            },
+            'eco_tags': eco_tags,
+            'eco_matches': eco_matches,
+            'mixed_emotions': self._has_mixed_emotions(processed['breakdown']),
+            'analysis_metadata': {
+                'confidence_threshold': self.confidence_threshold,
+                'total_raw_emotions': total_raw_emotions,
+                'chunks_analyzed': chunk_count,
+                'analysis_tier': tier,
+                'needs_upgrade': tier != 'model',
+                # Lexicon results stay unversioned, so the entry stays provisional until upgraded
+                'analysis_version': self.analysis_version if tier == 'model' else None,
+                'analysis_timestamp': datetime.utcnow().isoformat()
+            }
+        }
+    
     def _extract_eco_tags(self, text: str) -> List[str]:
         """Extract eco-related tags from text"""
-        text_lower = text.lower()
-        found_tags = set()
-        
-        for category, keywords in self.eco_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    found_tags.add(category)
-                    break
-        
-        return list(found_tags)
+        tags, _ = self.eco_tagger.extract(text)
+        return tags
     
     def _has_mixed_emotions(self, emotion_breakdown: Dict) -> bool:
         """Check if entry has mixed emotions"""
@@ -194,6 +554,7 @@ class EcoJournalAnalyzer:
                 'total_emotions_detected': 0
             },
             'eco_tags': [],
+            'eco_matches': [],
             'mixed_emotions': False,
             'analysis_metadata': {
                 'confidence_threshold': self.confidence_threshold,
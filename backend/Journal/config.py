@@ -2,6 +2,8 @@
 # Configuration settings for Eco-Journal
 
 import os
+import json
+import hashlib
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,10 +20,64 @@ class Config:
     SENTIMENT_THRESHOLD_POSITIVE = 0.2
     SENTIMENT_THRESHOLD_NEGATIVE = -0.2
     EMOTION_CONFIDENCE_THRESHOLD = 0.1
+    ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", "16"))
+    ENABLE_CHUNKING = os.getenv("ENABLE_CHUNKING", "true").lower() == "true"
+    CHUNK_MAX_TOKENS = 510  # roberta's 512 minus <s> and </s>
+    CHUNK_OVERLAP_TOKENS = 64
+    LENGTH_BUCKET_EDGES = [
+        int(edge) for edge in os.getenv("LENGTH_BUCKET_EDGES", "32,64,128,256").split(",")
+    ]
+    
+    # Embedding Settings
+    ENABLE_EMBEDDINGS = os.getenv("ENABLE_EMBEDDINGS", "true").lower() == "true"
+    EMBEDDING_DIM = 256
+    EMBEDDING_SEED = 42  # fixed so stored vectors stay comparable across restarts
+    SIMILARITY_EXACT_MAX = 5000  # per-index size below which search is brute force
+    SIMILARITY_IVF_LISTS = 256
+    SIMILARITY_IVF_PROBES = 8
+    SIMILARITY_USER_CACHE = 1000  # users whose index stays in memory
+    SIMILARITY_INDEX_MAX_AGE_SECONDS = float(os.getenv("SIMILARITY_INDEX_MAX_AGE_SECONDS", "3600"))  # then reloaded
+    
+    # Re-analysis Job Settings
+    REANALYSIS_PAGE_SIZE = 2048
+    IMPORT_MAX_ENTRIES = int(os.getenv("IMPORT_MAX_ENTRIES", "5000"))  # per import request
+    IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "1"))  # imports running at once per process
+    REANALYSIS_WORKERS = int(os.getenv("REANALYSIS_WORKERS", "2"))
+    
+    # Deferred Analysis Settings
+    ANALYSIS_QUEUE_PATH = os.getenv("ANALYSIS_QUEUE_PATH", "analysis_queue.db")
+    ANALYSIS_QUEUE_LEASE_SECONDS = 300
+    ANALYSIS_RETRY_MAX_BACKOFF_SECONDS = 300  # also the recheck interval while the model is unavailable
+    ANALYSIS_WORKER_BATCH_SIZE = 32
+    ANALYSIS_WORKER_POLL_SECONDS = 0.5
+    SSE_POLL_SECONDS = 0.5
+    SSE_TIMEOUT_SECONDS = 120
+    
+    # Load Shedding Settings
+    LOAD_SHED_MAX_IN_FLIGHT = int(os.getenv("LOAD_SHED_MAX_IN_FLIGHT", "32"))
+    LOAD_SHED_MAX_WAIT_SECONDS = float(os.getenv("LOAD_SHED_MAX_WAIT_SECONDS", "2.0"))
+    UPGRADE_TASK_PRIORITY = 10  # Lower numbers are claimed first
+    
+    # Dashboard Settings
+    DASHBOARD_FETCH_WORKERS = int(os.getenv("DASHBOARD_FETCH_WORKERS", "16"))  # shared across requests
+    DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "300"))
+    
+    # Leaderboard Settings
+    LEADERBOARD_REDIS_URL = os.getenv("LEADERBOARD_REDIS_URL")  # unset: in-process leaderboard
+    LEADERBOARD_MAX_K = 100
     
     # Streak Settings
     MAX_FREEZES_PER_MONTH = 3
     STREAK_RESET_AFTER_DAYS = 2  # Reset streak if no entry for 2+ days
+    STREAK_RECOMPUTE_WORKERS = int(os.getenv("STREAK_RECOMPUTE_WORKERS", "4"))
+    STREAK_RECOMPUTE_CHUNK_USERS = int(os.getenv("STREAK_RECOMPUTE_CHUNK_USERS", "5000"))  # users per worker task
+    STREAK_UPDATE_WORKERS = int(os.getenv("STREAK_UPDATE_WORKERS", "32"))  # one per concurrent entry save
+    STREAK_JOBS_ENABLED = os.getenv("STREAK_JOBS_ENABLED", "true").lower() == "true"
+    STREAK_JOBS_POLL_SECONDS = float(os.getenv("STREAK_JOBS_POLL_SECONDS", "300"))
+    STREAK_JOBS_BATCH_SIZE = int(os.getenv("STREAK_JOBS_BATCH_SIZE", "1000"))  # users per transaction
+    STREAK_JOBS_LEASE_SECONDS = int(os.getenv("STREAK_JOBS_LEASE_SECONDS", "600"))  # renewed after each batch
+    STREAK_EVENTS_RAW_MONTHS = int(os.getenv("STREAK_EVENTS_RAW_MONTHS", "3"))  # older events become daily rollups
+    STREAK_EVENTS_PARTITIONS_AHEAD = 2  # monthly partitions created in advance
     
     # Inspiration Settings
     INSPIRATION_CACHE_SIZE = 100
@@ -33,6 +89,23 @@ class Config:
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     
+    @classmethod
+    def get_analysis_version(cls):
+        """Return a short fingerprint of every setting that affects stored analysis"""
+        fingerprint = json.dumps({
+            'model': cls.EMOTION_MODEL,
+            'thresholds': [
+                cls.SENTIMENT_THRESHOLD_POSITIVE,
+                cls.SENTIMENT_THRESHOLD_NEGATIVE,
+                cls.EMOTION_CONFIDENCE_THRESHOLD
+            ],
+            'chunking': [cls.ENABLE_CHUNKING, cls.CHUNK_MAX_TOKENS, cls.CHUNK_OVERLAP_TOKENS],
+            'embedding': [cls.ENABLE_EMBEDDINGS, cls.EMBEDDING_DIM, cls.EMBEDDING_SEED],
+            'emotion_weights': cls.get_emotion_weights(),
+            'eco_keywords': cls.get_eco_keywords()
+        }, sort_keys=True)
+        return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:12]
+    
     @classmethod
     def get_emotion_weights(cls):
         """Return emotion weights for sentiment calculation"""
@@ -55,6 +128,41 @@ class Config:
             }
         }
     
+    @classmethod
+    def get_emotion_lexicon(cls):
+        """Return words that signal each emotion for the fast lexicon tier"""
+        return {
+            'joy': ['happy', 'glad', 'delighted', 'wonderful', 'great', 'amazing', 'fun'],
+            'pride': ['proud', 'accomplished', 'achievement', 'succeeded', 'successfully'],
+            'optimism': ['hopeful', 'hope', 'optimistic', 'looking forward', 'better future'],
+            'excitement': ['excited', 'thrilled', 'cant wait', "can't wait", 'eager'],
+            'love': ['love', 'loved', 'adore', 'beautiful'],
+            'relief': ['relieved', 'finally', 'phew'],
+            'gratitude': ['grateful', 'thankful', 'thanks', 'thank you', 'appreciate'],
+            'admiration': ['inspiring', 'impressed', 'admire', 'awesome'],
+            'approval': ['good', 'nice', 'agree', 'worth it'],
+            'caring': ['care', 'caring', 'protect', 'help', 'helped'],
+            'desire': ['want', 'wish', 'hope to', 'would like'],
+            'amusement': ['funny', 'laughed', 'lol', 'hilarious'],
+            'guilt': ['guilty', 'my fault', 'should have', "shouldn't have", 'forgot'],
+            'sadness': ['sad', 'unhappy', 'depressed', 'down', 'cry', 'cried'],
+            'anger': ['angry', 'furious', 'mad', 'outraged'],
+            'fear': ['afraid', 'scared', 'worried', 'anxious', 'terrified'],
+            'disappointment': ['disappointed', 'let down', 'failed', 'missed'],
+            'shame': ['ashamed', 'embarrassing'],
+            'remorse': ['sorry', 'regret', 'regretted'],
+            'frustration': ['frustrated', 'frustrating', 'annoying', 'stuck'],
+            'annoyance': ['annoyed', 'irritated', 'ugh'],
+            'embarrassment': ['embarrassed', 'awkward'],
+            'grief': ['grieving', 'mourning', 'loss', 'lost'],
+            'nervousness': ['nervous', 'uneasy', 'tense'],
+            'surprise': ['surprised', 'unexpected', 'wow'],
+            'confusion': ['confused', 'unsure', 'not sure'],
+            'curiosity': ['curious', 'wonder', 'interested', 'learn'],
+            'realization': ['realized', 'noticed', 'understood'],
+            'disapproval': ['wrong', 'bad', 'disapprove']
+        }
+    
     @classmethod
     def get_eco_keywords(cls):
         """Return eco-related keywords for categorization"""
@@ -0,0 +1,79 @@
+# backend/journal/dashboard_cache.py
+# Per-user cache of assembled dashboards with write-through invalidation
+
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict
+
+
+class DashboardCache:
+    """TTL cache of dashboard snapshots, invalidated whenever a user's data changes"""
+
+    def __init__(self, ttl_seconds: float, max_users: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._snapshots: Dict[Any, Dict[str, Any]] = {}
+        # Write counter stamp per recently invalidated user; evicted stamps raise the floor
+        self._generations: Dict[Any, int] = {}
+        self._generation_floor = 0
+        self._counter = 0
+
+    def get_or_build(self, user_id: Any, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return the cached dashboard for a user, building it on a miss
+
+        Snapshots are only served on the day they were built: streak risk and
+        the recommendations derived from it change with the calendar.
+
+        Args:
+            user_id: User identifier
+            build: Callable that assembles the dashboard from the databases
+
+        Returns:
+            Dashboard
+        """
+        now = time.monotonic()
+        today = date.today()
+        with self._lock:
+            cached = self._snapshots.get(user_id)
+            generation = self._generation(user_id)
+        if cached is not None and cached['expires_at'] > now and cached['built_on'] == today:
+            return cached['dashboard']
+
+        dashboard = build()
+        if not dashboard.get('success'):
+            return dashboard
+
+        snapshot = {
+            'dashboard': dashboard,
+            'built_on': today,
+            'expires_at': now + self.ttl_seconds
+        }
+        with self._lock:
+            # A write that landed while we were building makes this snapshot stale
+            if self._generation(user_id) == generation:
+                if len(self._snapshots) >= self.max_users and user_id not in self._snapshots:
+                    self._snapshots.pop(next(iter(self._snapshots)))
+                self._snapshots[user_id] = snapshot
+        return dashboard
+
+    def invalidate(self, user_id: Any):
+        """Drop a user's snapshot after any write that changes their dashboard"""
+        with self._lock:
+            self._snapshots.pop(user_id, None)
+            self._counter += 1
+            self._generations.pop(user_id, None)
+            self._generations[user_id] = self._counter
+            if len(self._generations) > self.max_users:
+                # Oldest stamp first; the floor keeps in-flight builds for it from caching
+                evicted = self._generations.pop(next(iter(self._generations)))
+                self._generation_floor = max(self._generation_floor, evicted)
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+    def _generation(self, user_id: Any) -> int:
+        return self._generations.get(user_id, self._generation_floor)
@@ -0,0 +1,158 @@
+# backend/journal/journal_import.py
+# Bulk import of dated journal entries (e.g. from paper journals or other apps)
+
+import argparse
+import csv
+import json
+import logging
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.Journal.config import Config
+
+logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
+logger = logging.getLogger(__name__)
+
+
+class JournalImporter:
+    """Analyzes imported entries in batches, bulk-inserts them and rebuilds the user's streak"""
+
+    def __init__(self, analyzer, journal_repo, streak_manager, similarity_index=None,
+                 analysis_queue=None,
+                 batch_size: int = Config.ANALYSIS_BATCH_SIZE,
+                 max_entries: int = Config.IMPORT_MAX_ENTRIES):
+        self.analyzer = analyzer
+        self.journal_repo = journal_repo
+        self.streak_manager = streak_manager
+        self.similarity_index = similarity_index
+        self.analysis_queue = analysis_queue
+        self.batch_size = batch_size
+        self.max_entries = max_entries
+
+    def import_entries(self, user_id: Any, entries: List[Dict[str, Any]],
+                       on_progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """
+        Import a list of dated entries for one user
+
+        Args:
+            user_id: User identifier
+            entries: Dicts with 'date' (date or ISO string) and 'content'
+            on_progress: Called with the number of entries saved so far after each batch
+
+        Returns:
+            Counts of imported and rejected rows plus the rebuilt streak
+        """
+        if len(entries) > self.max_entries:
+            return {
+                'success': False,
+                'error': f"At most {self.max_entries} entries can be imported at once"
+            }
+
+        accepted, rejected = self._validate(entries)
+        if not accepted:
+            return {'success': False, 'error': "No valid entries to import", 'rejected': rejected}
+
+        # Oldest first, so entry order and streak replay agree
+        accepted.sort(key=lambda item: item['date'])
+
+        entry_ids = []
+        try:
+            for start in range(0, len(accepted), self.batch_size):
+                batch = accepted[start:start + self.batch_size]
+                analyses = self.analyzer.analyze_batch([item['content'] for item in batch])
+                documents = [
+                    {
+                        'content': item['content'],
+                        'analysis': analysis_result,
+                        'created_at': datetime.combine(item['date'], time.min)
+                    }
+                    for item, analysis_result in zip(batch, analyses)
+                ]
+                batch_ids = self.journal_repo.save_entries_bulk(user_id, documents)
+                entry_ids.extend(batch_ids)
+
+                for entry_id, item, analysis_result in zip(batch_ids, batch, analyses):
+                    if self.similarity_index is not None and analysis_result.get('embedding') is not None:
+                        self.similarity_index.add(entry_id, user_id, analysis_result['embedding'])
+                    # Lexicon or failed analyses are stored as provisional; the worker upgrades them
+                    version = analysis_result.get('analysis_metadata', {}).get('analysis_version')
+                    if self.analysis_queue is not None and not version:
+                        self.analysis_queue.enqueue(
+                            entry_id,
+                            {'user_id': user_id, 'content': item['content'], 'upgrade': True},
+                            priority=Config.UPGRADE_TASK_PRIORITY
+                        )
+
+                logger.info(f"📥 Imported {len(entry_ids)}/{len(accepted)} entries for user {user_id}")
+                if on_progress is not None:
+                    on_progress(len(entry_ids))
+        finally:
+            # Earlier batches stay saved when a later one fails, so the streak is
+            # rebuilt over whatever is stored - one replay over every entry date
+            streak_result = None
+            if entry_ids:
+                streak_result = self.streak_manager.rebuild_streak_history(
+                    user_id, lambda: self.journal_repo.get_user_entry_dates(user_id)
+                )
+
+        return {
+            'success': not streak_result.get('error', False),
+            'imported': len(entry_ids),
+            'rejected': rejected,
+            'entry_ids': entry_ids,
+            'streak': streak_result
+        }
+
+    def _validate(self, entries: List[Dict[str, Any]]):
+        """Split rows into importable entries and rejections with reasons"""
+        today = date.today()
+        accepted, rejected = [], []
+        for index, row in enumerate(entries):
+            content = (row.get('content') or '').strip()
+            entry_date = row.get('date')
+            try:
+                if isinstance(entry_date, str):
+                    entry_date = date.fromisoformat(entry_date.strip()[:10])
+                if isinstance(entry_date, datetime):
+                    entry_date = entry_date.date()
+                if not isinstance(entry_date, date):
+                    raise ValueError("missing date")
+            except ValueError as e:
+                rejected.append({'index': index, 'reason': f"Invalid date: {e}"})
+                continue
+
+            if not content:
+                rejected.append({'index': index, 'reason': "Empty content"})
+            elif entry_date > today:
+                rejected.append({'index': index, 'reason': "Date is in the future"})
+            else:
+                accepted.append({'date': entry_date, 'content': content})
+        return accepted, rejected
+
+
+def load_entries(path: str) -> List[Dict[str, Any]]:
+    """Read entries from a JSON list or a CSV file with date and content columns"""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if path.lower().endswith('.csv'):
+            return list(csv.DictReader(handle))
+        return json.load(handle)
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Import dated journal entries for a user")
+    parser.add_argument("path", help="JSON list or CSV file of {date, content} rows")
+    parser.add_argument("--user-id", type=int, required=True, help="User to import for")
+    args = parser.parse_args()
+
+    from backend.Journal.journal_service import EcoJournalService
+    service = EcoJournalService()
+    result = service.import_journal_entries(args.user_id, load_entries(args.path))
+    result.pop('entry_ids', None)
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
+
+# run using: python -m backend.Journal.journal_import entries.csv --user-id 1
@@ -1,14 +1,26 @@
 # backend/journal/journal_service.py
 # Main service that orchestrates journal entry processing
 
+import contextvars
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
 from typing import Dict, List, Optional, Any
 from backend.Journal.config import Config
-from Database.Journal import get_journal_repository   ######10nov
+from Database.Journal import (
+    get_journal_repository, get_streak_reminder_repository, get_import_job_repository, unit_of_work
+)   ######10nov
 
 from backend.Journal.analyzer import EcoJournalAnalyzer, InspirationGenerator
 from backend.Journal.streak_manager import StreakManager
+from backend.Journal.task_queue import AnalysisTaskQueue
+from backend.Journal.analysis_worker import AnalysisWorker
+from backend.Journal.similarity_index import SimilarEntryIndex, decode_embedding
+from backend.Journal.dashboard_cache import DashboardCache
+from backend.Journal.journal_import import JournalImporter
+from backend.Journal.streak_jobs import StreakJobScheduler
+from backend.Journal.leaderboard import StreakLeaderboard
+from backend.metrics import registry
 
 # Import database repositories
 import sys
@@ -19,6 +31,19 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../../Database'))
 logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+STAGE_SECONDS = registry.histogram(
+    "journal_stage_seconds", "Latency of each journal entry pipeline stage", ["stage"]
+)
+ENTRIES_TOTAL = registry.counter(
+    "journal_entries_total", "Journal entries processed, by outcome", ["result"]
+)
+ANALYSIS_TIER_TOTAL = registry.counter(
+    "journal_analysis_tier_total", "Journal entries analyzed, by analysis tier", ["tier"]
+)
+QUEUE_DEPTH = registry.gauge(
+    "journal_analysis_queue_depth", "Interactive tasks waiting in the deferred analysis queue"
+)
+
 class EcoJournalService:
     """Main service for processing eco-journal entries"""
     
@@ -26,8 +51,38 @@ class EcoJournalService:
         # Initialize components
         self.analyzer = EcoJournalAnalyzer()
         self.inspiration_generator = InspirationGenerator()
-        self.streak_manager = StreakManager()
+        self.leaderboard = StreakLeaderboard()
+        self.streak_manager = StreakManager(leaderboard=self.leaderboard)
         self.journal_repo = get_journal_repository()
+        self.analysis_queue = AnalysisTaskQueue(
+            Config.ANALYSIS_QUEUE_PATH, lease_seconds=Config.ANALYSIS_QUEUE_LEASE_SECONDS,
+            max_backoff_seconds=Config.ANALYSIS_RETRY_MAX_BACKOFF_SECONDS
+        )
+        self.similarity_index = SimilarEntryIndex(self.journal_repo)
+        self.dashboard_cache = DashboardCache(Config.DASHBOARD_CACHE_TTL_SECONDS)
+        self.importer = JournalImporter(
+            self.analyzer, self.journal_repo, self.streak_manager,
+            similarity_index=self.similarity_index, analysis_queue=self.analysis_queue
+        )
+        self.import_jobs = get_import_job_repository()
+        # Imports run off the request; a small pool keeps them from starving live analysis
+        self.import_pool = ThreadPoolExecutor(
+            max_workers=Config.IMPORT_WORKERS, thread_name_prefix="journal-import"
+        )
+        # Bounded pool for independent store work; each task opens its own session
+        self.fetch_pool = ThreadPoolExecutor(
+            max_workers=Config.DASHBOARD_FETCH_WORKERS, thread_name_prefix="dashboard-fetch"
+        )
+        # Separate from fetch_pool so dashboard bursts never queue entry saves
+        self.streak_pool = ThreadPoolExecutor(
+            max_workers=Config.STREAK_UPDATE_WORKERS, thread_name_prefix="streak-update"
+        )
+        self.analysis_worker = AnalysisWorker(
+            self.analysis_queue, self.analyzer, self.inspiration_generator, self.journal_repo,
+            similarity_index=self.similarity_index, dashboard_cache=self.dashboard_cache
+        )
+        self.reminder_repo = get_streak_reminder_repository()
+        self.streak_jobs = StreakJobScheduler.default(on_users_changed=self._on_stats_changed)
         
         logger.info("✅ EcoJournalService initialized successfully")
     
@@ -44,6 +99,7 @@ class EcoJournalService:
             Complete processing result with analysis, inspiration, and streak updates
         """
         if not content or not content.strip():
+            ENTRIES_TOTAL.inc(result='rejected')
             return self._create_error_response("Journal entry content cannot be empty")
         
         if entry_date is None:
@@ -52,55 +108,474 @@ class EcoJournalService:
         try:
             logger.info(f"Processing journal entry for user {user_id}")
             
-            # Step 1: Analyze sentiment and emotions
-            logger.info("🧠 Analyzing emotions and sentiment...")
-            analysis_result = self.analyzer.analyze_journal_entry(content)
+            with STAGE_SECONDS.time(stage='total'):
+                # Step 1: Update user streak in the background - it does not need the analysis.
+                # It runs in this request's context, joining its unit of work; nothing below
+                # touches Postgres until the future has been waited on.
+                logger.info("🔥 Updating user streak...")
+                streak_future = self.streak_pool.submit(
+                    contextvars.copy_context().run, self._timed_streak_update, user_id, entry_date
+                )
+                
+                # Step 2: Analyze sentiment and emotions while the streak update runs
+                try:
+                    with STAGE_SECONDS.time(stage='analysis'):
+                        queue_depth = self.analysis_queue.depth(max_priority=0)
+                        QUEUE_DEPTH.set(queue_depth)
+                        if self.analyzer.should_shed_load(queue_depth):
+                            logger.info("⚡ Model saturated - using fast lexicon analysis")
+                            analysis_result = self.analyzer.analyze_fast([content])[0]
+                        else:
+                            logger.info("🧠 Analyzing emotions and sentiment...")
+                            analysis_result = self.analyzer.analyze_journal_entry(content)
+                except Exception:
+                    streak_future.exception()  # don't leave the streak write running behind the error
+                    raise
+                needs_upgrade = analysis_result['analysis_metadata'].get('needs_upgrade', False)
+                ANALYSIS_TIER_TOTAL.inc(tier=analysis_result['analysis_metadata'].get('analysis_tier', 'error'))
+                
+                streak_result = streak_future.result()
+                
+                # Step 3: Generate personalized inspiration
+                logger.info("💡 Generating inspiration...")
+                with STAGE_SECONDS.time(stage='inspiration'):
+                    user_context = {
+                        'current_streak': streak_result.get('current_streak', 0),
+                        'total_entries': streak_result.get('total_entries', 0),
+                        'new_achievements': streak_result.get('new_achievements', [])
+                    }
+                    inspiration = self.inspiration_generator.generate_inspiration(
+                        analysis_result, user_context
+                    )
+                
+                # Step 4: Save to database
+                logger.info("💾 Saving to database...")
+                with STAGE_SECONDS.time(stage='save'):
+                    entry_id = self.journal_repo.save_entry(
+                        user_id=user_id,
+                        content=content,
+                        analysis_result=analysis_result,
+                        inspiration=inspiration,
+                        eco_tags=analysis_result.get('eco_tags', []),
+                        analysis_status="provisional" if needs_upgrade else "complete"
+                    )
+                    if analysis_result.get('embedding') is not None:
+                        self.similarity_index.add(entry_id, user_id, analysis_result['embedding'])
+                
+                if needs_upgrade:
+                    # Let the background worker replace the lexicon result when load drops
+                    self.analysis_queue.enqueue(
+                        entry_id,
+                        {'user_id': user_id, 'content': content, 'upgrade': True},
+                        priority=Config.UPGRADE_TASK_PRIORITY
+                    )
+                
+                # Step 5: Compile complete response
+                response = self._create_success_response(
+                    entry_id=entry_id,
+                    analysis_result=analysis_result,
+                    inspiration=inspiration,
+                    streak_result=streak_result,
+                    user_id=user_id,
+                    entry_date=entry_date
+                )
             
-            # Step 2: Update user streak
-            logger.info("🔥 Updating user streak...")
-            streak_result = self.streak_manager.update_user_streak(user_id, entry_date)
+            ENTRIES_TOTAL.inc(result='success')
+            logger.info(f"✅ Journal entry processed successfully for user {user_id}")
+            return response
             
-            # Step 3: Generate personalized inspiration
-            logger.info("💡 Generating inspiration...")
-            user_context = {
-                'current_streak': streak_result.get('current_streak', 0),
-                'total_entries': streak_result.get('total_entries', 0),
-                'new_achievements': streak_result.get('new_achievements', [])
-            }
-            inspiration = self.inspiration_generator.generate_inspiration(
-                analysis_result, user_context
+        except Exception as e:
+            ENTRIES_TOTAL.inc(result='error')
+            logger.error(f"❌ Failed to process journal entry for user {user_id}: {e}")
+            return self._create_error_response(f"Processing failed: {str(e)}")
+        finally:
+            self.dashboard_cache.invalidate(user_id)
+    
+    def submit_journal_import(self, user_id: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Queue an import to run in the background
+        
+        Args:
+            user_id: User identifier
+            entries: Dicts with 'date' and 'content'
+            
+        Returns:
+            Job id and status URL to poll for progress and the import summary
+        """
+        if len(entries) > self.importer.max_entries:
+            return self._create_error_response(
+                f"At most {self.importer.max_entries} entries can be imported at once"
             )
+        
+        job_id = self.import_jobs.create(user_id, len(entries))
+        self.import_pool.submit(self._run_import_job, job_id, user_id, entries)
+        logger.info(f"📥 Queued import {job_id} of {len(entries)} entries for user {user_id}")
+        return {
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f"/journal/import/{job_id}"
+        }
+    
+    def _run_import_job(self, job_id: str, user_id: str, entries: List[Dict[str, Any]]):
+        """Run a queued import on the import pool and store its summary"""
+        self.import_jobs.mark_running(job_id)
+        result = self.import_journal_entries(
+            user_id, entries, on_progress=lambda imported: self.import_jobs.update_progress(job_id, imported)
+        )
+        result.pop('entry_ids', None)
+        self.import_jobs.finish(job_id, result)
+    
+    def get_import_status(self, job_id: str, user_id: str) -> Dict[str, Any]:
+        """
+        Get the progress of a user's import job
+        
+        Args:
+            job_id: Import job identifier
+            user_id: User identifier (jobs are only visible to their owner)
+            
+        Returns:
+            Status, counts and, once finished, the import summary
+        """
+        job = self.import_jobs.get(job_id, user_id)
+        if not job:
+            return self._create_error_response("Import job not found")
+        return {
+            'success': True,
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'total': job['total'],
+            'imported': job['imported'],
+            'result': job.get('result')
+        }
+    
+    def import_journal_entries(self, user_id: str, entries: List[Dict[str, Any]],
+                               on_progress=None) -> Dict[str, Any]:
+        """
+        Import many dated entries at once (batched analysis, one bulk insert per batch,
+        streak history rebuilt in date order)
+        
+        Args:
+            user_id: User identifier
+            entries: Dicts with 'date' and 'content'
+            on_progress: Called with the number of entries saved after each batch
+            
+        Returns:
+            Import summary with the rebuilt streak
+        """
+        try:
+            logger.info(f"Importing {len(entries)} journal entries for user {user_id}")
+            return self.importer.import_entries(user_id, entries, on_progress=on_progress)
+        except Exception as e:
+            logger.error(f"❌ Failed to import journal entries for user {user_id}: {e}")
+            return self._create_error_response(f"Import failed: {str(e)}")
+        finally:
+            self.dashboard_cache.invalidate(user_id)
+    
+    def _timed_streak_update(self, user_id: str, entry_date: date) -> Dict:
+        """Streak update as run on the streak pool"""
+        with STAGE_SECONDS.time(stage='streak_update'):
+            return self.streak_manager.update_user_streak(user_id, entry_date)
+    
+    def submit_journal_entry(self, user_id: str, content: str, entry_date: date = None) -> Dict[str, Any]:
+        """
+        Accept a journal entry and defer its analysis to the background worker
+        
+        The entry and the streak update are persisted before returning; analysis
+        and inspiration are filled in later and can be fetched via get_entry_status.
+        
+        Args:
+            user_id: User identifier
+            content: Journal entry text
+            entry_date: Date of the entry (defaults to today)
+            
+        Returns:
+            Entry id, streak update and pending analysis status
+        """
+        if not content or not content.strip():
+            return self._create_error_response("Journal entry content cannot be empty")
+        
+        if entry_date is None:
+            entry_date = date.today()
+        
+        try:
+            logger.info(f"Accepting journal entry for user {user_id} (deferred analysis)")
+            
+            streak_result = self.streak_manager.update_user_streak(user_id, entry_date)
             
-            # Step 4: Save to database
-            logger.info("💾 Saving to database...")
             entry_id = self.journal_repo.save_entry(
                 user_id=user_id,
                 content=content,
-                analysis_result=analysis_result,
-                inspiration=inspiration,
-                eco_tags=analysis_result.get('eco_tags', [])
+                analysis_result=None,
+                inspiration=None,
+                eco_tags=[],
+                analysis_status="pending"
             )
             
-            # Step 5: Compile complete response
-            response = self._create_success_response(
-                entry_id=entry_id,
-                analysis_result=analysis_result,
-                inspiration=inspiration,
-                streak_result=streak_result,
-                user_id=user_id,
-                entry_date=entry_date
-            )
+            self.analysis_queue.enqueue(entry_id, {
+                'user_id': user_id,
+                'content': content,
+                'user_context': {
+                    'current_streak': streak_result.get('current_streak', 0),
+                    'total_entries': streak_result.get('total_entries', 0),
+                    'new_achievements': streak_result.get('new_achievements', [])
+                }
+            })
             
-            logger.info(f"✅ Journal entry processed successfully for user {user_id}")
-            return response
+            return {
+                'success': True,
+                'entry_id': entry_id,
+                'user_id': user_id,
+                'entry_date': entry_date.isoformat(),
+                'analysis_status': 'pending',
+                'status_url': f"/journal/entry/{entry_id}/status",
+                'events_url': f"/journal/entry/{entry_id}/events",
+                'streak': self._format_streak(streak_result),
+                'processed_at': datetime.utcnow().isoformat()
+            }
             
         except Exception as e:
-            logger.error(f"❌ Failed to process journal entry for user {user_id}: {e}")
+            logger.error(f"❌ Failed to accept journal entry for user {user_id}: {e}")
             return self._create_error_response(f"Processing failed: {str(e)}")
+        finally:
+            self.dashboard_cache.invalidate(user_id)
+    
+    def get_entry_status(self, entry_id: str) -> Dict[str, Any]:
+        """
+        Get the analysis status of a journal entry
+        
+        Args:
+            entry_id: Journal entry identifier
+            
+        Returns:
+            Status plus analysis and inspiration once available
+        """
+        try:
+            entry = self.journal_repo.get_entry_by_id(entry_id)
+            if not entry:
+                return self._create_error_response("Entry not found")
+            
+            status = entry.get('analysis_status', 'complete')
+            response = {
+                'success': True,
+                'entry_id': entry_id,
+                'analysis_status': status
+            }
+            
+            if status == 'pending':
+                task = self.analysis_queue.get_task(entry_id)
+                if task and task['status'] == 'failed':
+                    response['analysis_status'] = 'failed'
+                    response['error'] = task['last_error']
+                return response
+            
+            response['analysis'] = self._format_analysis(entry['analysis'])
+            response['inspiration'] = entry.get('inspiration')
+            return response
+            
+        except Exception as e:
+            logger.error(f"Failed to get status for entry {entry_id}: {e}")
+            return self._create_error_response(str(e))
+    
+    def find_similar_entries(self, user_id: str, entry_id: str, k: int = 5,
+                             scope: str = 'user') -> Dict[str, Any]:
+        """
+        Find entries written in a similar spirit to one of the user's entries
+        
+        Args:
+            user_id: User identifier (must own the entry)
+            entry_id: Journal entry to compare against
+            k: Number of similar entries to return
+            scope: 'user' for the user's own entries, 'global' for anonymized cohort matches
+            
+        Returns:
+            Similar entries, best match first
+        """
+        try:
+            entry = self.journal_repo.get_entry_embedding(entry_id)
+            if not entry or str(entry.get('user_id')) != str(user_id):
+                return self._create_error_response("Entry not found")
+            if entry.get('embedding') is None:
+                return self._create_error_response("Entry has no embedding yet")
+            
+            query = decode_embedding(entry['embedding'])
+            if scope == 'global':
+                matches = self.similarity_index.search_global(query, k, exclude=[entry_id])
+                projection = {'eco_tags': 1, 'analysis.sentiment.label': 1}
+            else:
+                matches = self.similarity_index.search_user(entry['user_id'], query, k, exclude=[entry_id])
+                projection = {'content': 1, 'created_at': 1, 'eco_tags': 1}
+            
+            entries = self.journal_repo.get_entries_by_ids([match_id for match_id, _ in matches], projection)
+            similar = []
+            for match_id, score in matches:
+                match = entries.get(match_id)
+                if match is None:
+                    continue
+                if scope == 'global':
+                    # Other users' entries are shared only as themes, never text
+                    similar.append({
+                        'score': round(score, 4),
+                        'eco_tags': match.get('eco_tags', []),
+                        'sentiment': (match.get('analysis') or {}).get('sentiment', {}).get('label')
+                    })
+                else:
+                    content = match.get('content', '')
+                    similar.append({
+                        'entry_id': match_id,
+                        'score': round(score, 4),
+                        'date': match.get('created_at'),
+                        'snippet': content[:100] + "..." if len(content) > 100 else content,
+                        'eco_tags': match.get('eco_tags', [])
+                    })
+            
+            return {'success': True, 'entry_id': entry_id, 'scope': scope, 'similar': similar}
+            
+        except Exception as e:
+            logger.error(f"Failed to find similar entries for {entry_id}: {e}")
+            return self._create_error_response(str(e))
+    
+    def search_entries(self, user_id: str, query: str, limit: int = 20, cursor: Optional[str] = None,
+                       eco_tag: Optional[str] = None, sentiment: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Full-text search over a user's journal
+        
+        Args:
+            user_id: User identifier
+            query: Search text (e.g. "when did I start composting")
+            limit: Page size
+            cursor: Cursor returned by the previous page
+            eco_tag: Only entries with this eco tag
+            sentiment: Only entries with this sentiment label
+            
+        Returns:
+            BM25-ranked matches and the cursor for the next page
+        """
+        if not query or not query.strip():
+            return self._create_error_response("Search query cannot be empty")
+        
+        try:
+            ranked, next_cursor = self.journal_repo.search.search(
+                user_id, query, limit=limit, cursor=cursor, eco_tag=eco_tag, sentiment=sentiment
+            )
+            entries = self.journal_repo.get_entries_by_ids(
+                [entry_id for entry_id, _ in ranked],
+                {'content': 1, 'created_at': 1, 'eco_tags': 1, 'analysis.sentiment.label': 1}
+            )
+            
+            results = []
+            for entry_id, score in ranked:
+                entry = entries.get(entry_id)
+                if entry is None:
+                    continue
+                results.append({
+                    'entry_id': entry_id,
+                    'score': round(score, 4),
+                    'date': entry.get('created_at'),
+                    'snippet': self._search_snippet(entry.get('content', ''), query),
+                    'eco_tags': entry.get('eco_tags', []),
+                    'sentiment': ((entry.get('analysis') or {}).get('sentiment') or {}).get('label')
+                })
+            
+            return {'success': True, 'query': query, 'results': results, 'next_cursor': next_cursor}
+            
+        except ValueError as e:
+            return self._create_error_response(str(e))
+        except Exception as e:
+            logger.error(f"Search failed for user {user_id}: {e}")
+            return self._create_error_response(f"Search failed: {str(e)}")
+    
+    def _search_snippet(self, content: str, query: str, width: int = 100) -> str:
+        """Cut a snippet around the first query term found in the content"""
+        lowered = content.lower()
+        positions = [
+            lowered.find(term) for term in self.journal_repo.search.tokenize(query)
+            if lowered.find(term) >= 0
+        ]
+        start = max(0, min(positions) - width // 4) if positions else 0
+        snippet = content[start:start + width]
+        return ("..." if start else "") + snippet + ("..." if start + width < len(content) else "")
+    
+    def start_analysis_worker(self):
+        """Start draining the deferred analysis queue"""
+        self.analysis_worker.start()
+    
+    def stop_analysis_worker(self):
+        """Stop the deferred analysis worker and the thread pools"""
+        self.analysis_worker.stop()
+        self.fetch_pool.shutdown(wait=False)
+        self.streak_pool.shutdown(wait=False)
+        self.import_pool.shutdown(wait=False)
+    
+    def start_streak_jobs(self):
+        """Start the scheduled streak maintenance jobs"""
+        if Config.STREAK_JOBS_ENABLED:
+            self.streak_jobs.start()
+    
+    def stop_streak_jobs(self):
+        self.streak_jobs.stop()
+    
+    def get_streak_reminders(self, user_id: str, dismiss: bool = False) -> Dict[str, Any]:
+        """
+        Get the user's pending streak reminders
+        
+        Args:
+            user_id: User identifier
+            dismiss: Mark them as seen after reading
+            
+        Returns:
+            Dictionary with the reminders
+        """
+        reminders = self.reminder_repo.get_reminders(user_id)
+        if dismiss and reminders:
+            self.reminder_repo.dismiss(user_id)
+        return {'success': True, 'reminders': reminders}
+    
+    def rebuild_leaderboard(self) -> int:
+        """Load the streak leaderboards from Postgres (at startup)"""
+        with unit_of_work() as uow:
+            return self.leaderboard.rebuild(uow.users.iter_streak_scores())
+    
+    def get_leaderboard(self, user_id: str, board: str = "current", k: int = 10,
+                        friend_ids: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Get a streak leaderboard and the user's place on it
+        
+        Args:
+            user_id: User identifier
+            board: 'current' or 'longest' streak
+            k: Number of top users to return
+            friend_ids: Rank only these users (plus the user) instead of everyone
+            
+        Returns:
+            Dictionary with the ranked users and the user's own rank
+        """
+        if board not in StreakLeaderboard.BOARDS:
+            return {'success': False, 'error': f"board must be one of {', '.join(StreakLeaderboard.BOARDS)}"}
+        
+        if friend_ids is not None:
+            ranked = self.leaderboard.friends(board, [user_id, *friend_ids])
+            return {'success': True, 'board': board, 'scope': 'friends', 'leaderboard': ranked}
+        
+        return {
+            'success': True,
+            'board': board,
+            'scope': 'global',
+            'leaderboard': self.leaderboard.top(board, k),
+            'me': self.leaderboard.rank(board, user_id)
+        }
+    
+    def _on_stats_changed(self, user_ids: List[Any]):
+        """Refresh derived state after a batch job changed these users' stats"""
+        for user_id in user_ids:
+            self.dashboard_cache.invalidate(user_id)
+        with unit_of_work() as uow:
+            for row in uow.users.get_streak_states(user_ids).values():
+                self.leaderboard.update(row.user_id, row.current_streak, row.longest_streak)
     
     def get_user_dashboard(self, user_id: str) -> Dict[str, Any]:
         """
-        Get comprehensive user dashboard data
+        Get comprehensive user dashboard data (served from cache between writes)
         
         Args:
             user_id: User identifier
@@ -108,20 +583,38 @@ class EcoJournalService:
         Returns:
             Dashboard data including streak, recent entries, achievements, etc.
         """
+        return self.dashboard_cache.get_or_build(user_id, lambda: self._build_user_dashboard(user_id))
+    
+    def use_streak_freeze(self, user_id: str) -> Dict[str, Any]:
+        """Use a streak freeze for the user and drop their cached dashboard"""
+        try:
+            return self.streak_manager.use_streak_freeze(user_id)
+        finally:
+            self.dashboard_cache.invalidate(user_id)
+    
+    def _build_user_dashboard(self, user_id: str) -> Dict[str, Any]:
+        """Assemble the dashboard from the databases"""
         try:
             logger.info(f"Generating dashboard for user {user_id}")
             
-            # Get streak status
-            streak_status = self.streak_manager.get_streak_status(user_id)
-            
-            # Get recent journal entries
-            recent_entries = self.journal_repo.get_user_entries(user_id, limit=10)
+            # Streak status, analytics (Postgres) and recent entries (MongoDB) are
+            # independent, so fetch them concurrently
+            with STAGE_SECONDS.time(stage='dashboard_fetch'):
+                streak_future = self.fetch_pool.submit(self.streak_manager.get_streak_status, user_id)
+                entries_future = self.fetch_pool.submit(
+                    self.journal_repo.get_user_entries, user_id, 5, 'summary'
+                )
+                analytics_future = self.fetch_pool.submit(
+                    self.streak_manager.get_streak_analytics, user_id, 30
+                )
+                summary_future = self.fetch_pool.submit(self.journal_repo.get_user_summary, user_id)
+                streak_status = streak_future.result()
+                recent_entries = entries_future.result()
+                analytics = analytics_future.result()
+                summary = summary_future.result()
             
-            # Get streak analytics
-            analytics = self.streak_manager.get_streak_analytics(user_id, days=30)
-            
-            # Process recent entries for summary
-            entry_summary = self._create_entry_summary(recent_entries)
+            # Summary covers the whole history from the maintained counters
+            entry_summary = self._create_entry_summary(summary)
             
             dashboard = {
                 'success': True, 
@@ -191,26 +684,34 @@ class EcoJournalService:
             'entry_id': entry_id,
             'user_id': user_id,
             'entry_date': entry_date.isoformat(),
-            'analysis': {
-                'sentiment': analysis_result['sentiment'],
-                'emotions': analysis_result['emotions'],
-                'eco_tags': analysis_result['eco_tags'],
-                'mixed_emotions': analysis_result['mixed_emotions'],
-                'emotion_summary': self.analyzer.get_emotion_summary(analysis_result)
-            },
+            'analysis': self._format_analysis(analysis_result),
             'inspiration': inspiration,
-            'streak': {
-                'current_streak': streak_result['current_streak'],
-                'longest_streak': streak_result['longest_streak'],
-                'total_entries': streak_result['total_entries'],
-                'streak_event': streak_result['streak_event'],
-                'new_achievements': streak_result['new_achievements'],
-                'next_milestone': streak_result['next_milestone'],
-                'freezes_remaining': streak_result['freezes_remaining']
-            },
+            'streak': self._format_streak(streak_result),
             'processed_at': datetime.utcnow().isoformat()
         }
     
+    def _format_analysis(self, analysis_result: Dict) -> Dict[str, Any]:
+        """Select the analysis fields returned to clients"""
+        return {
+            'sentiment': analysis_result['sentiment'],
+            'emotions': analysis_result['emotions'],
+            'eco_tags': analysis_result['eco_tags'],
+            'mixed_emotions': analysis_result['mixed_emotions'],
+            'emotion_summary': self.analyzer.get_emotion_summary(analysis_result)
+        }
+    
+    def _format_streak(self, streak_result: Dict) -> Dict[str, Any]:
+        """Select the streak fields returned to clients"""
+        return {
+            'current_streak': streak_result['current_streak'],
+            'longest_streak': streak_result['longest_streak'],
+            'total_entries': streak_result['total_entries'],
+            'streak_event': streak_result['streak_event'],
+            'new_achievements': streak_result['new_achievements'],
+            'next_milestone': streak_result['next_milestone'],
+            'freezes_remaining': streak_result['freezes_remaining']
+        }
+    
     def _create_error_response(self, error_message: str) -> Dict[str, Any]:
         """Create error response"""
         return {
@@ -219,9 +720,11 @@ class EcoJournalService:
             'processed_at': datetime.utcnow().isoformat()
         }
     
-    def _create_entry_summary(self, entries: List[Dict]) -> Dict[str, Any]:
-        """Create summary of recent journal entries"""
-        if not entries:
+    def _create_entry_summary(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a journal summary from the user's maintained all-time and rolling counts"""
+        all_time = summary.get('all_time') or {}
+        recent = summary.get('recent') or {}
+        if not all_time.get('total_entries'):
             return {
                 'total_entries': 0,
                 'dominant_sentiment': 'None',
@@ -229,54 +732,30 @@ class EcoJournalService:
                 'recent_emotions': []
             }
         
-        # Analyze sentiment distribution
         sentiment_counts = {'Positive': 0, 'Negative': 0, 'Neutral': 0, 'Mixed': 0}
-        all_eco_tags = []
-        all_emotions = []
-        
-        for entry in entries:
-            analysis = entry.get('analysis', {})
-            
-            # Count sentiments
-            sentiment = analysis.get('sentiment', {}).get('label', 'Neutral')
-            if analysis.get('mixed_emotions', False):
-                sentiment = 'Mixed'
-            sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-            
-            # Collect eco tags
-            all_eco_tags.extend(analysis.get('eco_tags', []))
-            
-            # Collect top emotions
-            top_emotions = analysis.get('emotions', {}).get('top_emotions', [])
-            for emotion in top_emotions[:2]:  # Top 2 emotions per entry
-                all_emotions.append(emotion.get('label', ''))
-        
-        # Find dominant sentiment
-        dominant_sentiment = max(sentiment_counts, key=sentiment_counts.get)
-        
-        # Find most common eco tags
-        eco_tag_counts = {}
-        for tag in all_eco_tags:
-            eco_tag_counts[tag] = eco_tag_counts.get(tag, 0) + 1
-        
-        common_eco_tags = sorted(eco_tag_counts.items(), key=lambda x: x[1], reverse=True)[:3]
-        
-        # Find most common emotions
-        emotion_counts = {}
-        for emotion in all_emotions:
-            if emotion:
-                emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-        
-        recent_emotions = sorted(emotion_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        sentiment_counts.update(all_time.get('sentiments', {}))
+        recent_sentiments = {'Positive': 0, 'Negative': 0, 'Neutral': 0, 'Mixed': 0}
+        recent_sentiments.update(recent.get('sentiments', {}))
         
         return {
-            'total_entries': len(entries),
+            'total_entries': all_time['total_entries'],
             'sentiment_distribution': sentiment_counts,
-            'dominant_sentiment': dominant_sentiment,
-            'common_eco_tags': [tag for tag, count in common_eco_tags],
-            'recent_emotions': [emotion for emotion, count in recent_emotions]
+            'dominant_sentiment': max(sentiment_counts, key=sentiment_counts.get),
+            'common_eco_tags': self._top_counts(all_time.get('eco_tags', {}), 3),
+            'recent_emotions': self._top_counts(recent.get('emotions', {}), 5),
+            'recent_window': {
+                'days': summary.get('window_days'),
+                'total_entries': recent.get('total_entries', 0),
+                'sentiment_distribution': recent_sentiments,
+                'common_eco_tags': self._top_counts(recent.get('eco_tags', {}), 3)
+            }
         }
     
+    def _top_counts(self, counts: Dict[str, int], n: int) -> List[str]:
+        """Keys of the n largest positive counts"""
+        ranked = sorted(counts.items(), key=lambda x: x[1], reverse=True)
+        return [key for key, count in ranked[:n] if count > 0]
+    
     def _generate_recommendations(self, streak_status: Dict, analytics: Dict) -> List[str]:
         """Generate personalized recommendations based on user data"""
         recommendations = []
@@ -0,0 +1,135 @@
+# backend/journal/keyword_tagger.py
+# Aho–Corasick keyword tagger for eco-categories
+
+from collections import deque
+from typing import Dict, List, Tuple
+
+
+class EcoKeywordTagger:
+    """Matches eco keywords and phrases in a single pass over the text"""
+
+    def __init__(self, keywords_by_category: Dict[str, List[str]]):
+        # Trie transitions, failure links and per-state pattern outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._patterns: List[Tuple[str, str]] = []  # (keyword, category)
+
+        for category, keywords in keywords_by_category.items():
+            for keyword in keywords:
+                self._add_pattern(self._normalize(keyword.strip()), category)
+
+        self._build_failure_links()
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Lowercase character by character so match offsets stay aligned with the input"""
+        chars = []
+        for ch in text:
+            lowered = ch.lower()
+            chars.append(lowered if len(lowered) == 1 else ch)
+        return ''.join(chars)
+
+    def _add_pattern(self, keyword: str, category: str):
+        """Insert a keyword into the trie"""
+        if not keyword:
+            return
+
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+
+        self._output[state].append(len(self._patterns))
+        self._patterns.append((keyword, category))
+
+    def _build_failure_links(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    @staticmethod
+    def _is_word_char(ch: str) -> bool:
+        return ch.isalnum() or ch == '_'
+
+    def find_matches(self, text: str) -> List[Dict]:
+        """
+        Find all whole-word keyword matches in text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            List of matches with keyword, category and [start, end) character span
+        """
+        if not text:
+            return []
+
+        normalized = self._normalize(text)
+        length = len(normalized)
+        matches = []
+        state = 0
+
+        for i, ch in enumerate(normalized):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+
+            for pattern_idx in self._output[state]:
+                keyword, category = self._patterns[pattern_idx]
+                start = i - len(keyword) + 1
+                end = i + 1
+
+                # Word-boundary check on both sides of the match
+                if start > 0 and self._is_word_char(normalized[start - 1]):
+                    continue
+                if end < length and self._is_word_char(normalized[end]):
+                    continue
+
+                matches.append({
+                    'keyword': keyword,
+                    'category': category,
+                    'start': start,
+                    'end': end
+                })
+
+        matches.sort(key=lambda m: (m['start'], -m['end']))
+        return matches
+
+    def extract(self, text: str) -> Tuple[List[str], List[Dict]]:
+        """
+        Extract eco tags and match spans
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Tuple of (tags in order of first appearance, match spans)
+        """
+        matches = self.find_matches(text)
+
+        tags = []
+        seen = set()
+        for match in matches:
+            if match['category'] not in seen:
+                seen.add(match['category'])
+                tags.append(match['category'])
+
+        return tags, matches
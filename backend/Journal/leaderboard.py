@@ -0,0 +1,356 @@
+# backend/journal/leaderboard.py
+# Streak leaderboards on a sorted-set interface (in-process skip list or Redis)
+
+import logging
+import random
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.Journal.config import Config
+
+logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
+logger = logging.getLogger(__name__)
+
+
+class _Node:
+    __slots__ = ("member", "score", "forward", "span", "backward")
+
+    def __init__(self, member, score, level: int):
+        self.member = member
+        self.score = score
+        self.forward: List[Optional["_Node"]] = [None] * level
+        self.span = [0] * level
+        self.backward: Optional["_Node"] = None
+
+
+class SkipListSortedSet:
+    """
+    In-process sorted set with the Redis z* interface
+
+    An indexable skip list ordered by (score, member), as Redis does it: every
+    forward link records how many elements it skips, so rank lookups and
+    rank-range reads are O(log n) along with inserts and removals.
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._scores: Dict[str, float] = {}
+        self._head = _Node(None, None, self.MAX_LEVEL)
+        self._tail: Optional[_Node] = None
+        self._level = 1
+        self._random = random.Random()
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < self.P:
+            level += 1
+        return level
+
+    def _insert(self, member: str, score: float):
+        update: List[_Node] = [self._head] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        x = self._head
+        for i in reversed(range(self._level)):
+            rank[i] = 0 if i == self._level - 1 else rank[i + 1]
+            while x.forward[i] is not None and (x.forward[i].score, x.forward[i].member) < (score, member):
+                rank[i] += x.span[i]
+                x = x.forward[i]
+            update[i] = x
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                self._head.span[i] = len(self._scores)
+            self._level = level
+
+        node = _Node(member, score, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+            node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+
+        node.backward = None if update[0] is self._head else update[0]
+        if node.forward[0] is not None:
+            node.forward[0].backward = node
+        else:
+            self._tail = node
+
+    def _delete(self, member: str, score: float):
+        update: List[_Node] = [self._head] * self.MAX_LEVEL
+        x = self._head
+        for i in reversed(range(self._level)):
+            while x.forward[i] is not None and (x.forward[i].score, x.forward[i].member) < (score, member):
+                x = x.forward[i]
+            update[i] = x
+
+        node = x.forward[0]
+        for i in range(self._level):
+            if update[i].forward[i] is node:
+                update[i].span[i] += node.span[i] - 1
+                update[i].forward[i] = node.forward[i]
+            else:
+                update[i].span[i] -= 1
+        if node.forward[0] is not None:
+            node.forward[0].backward = node.backward
+        else:
+            self._tail = node.backward
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+
+    def _bulk_load(self, mapping: Dict[str, float]):
+        """Build an empty list from many members at once: one sort, then linear linking"""
+        items = sorted((float(score), member) for member, score in mapping.items())
+        last = [self._head] * self.MAX_LEVEL
+        last_rank = [0] * self.MAX_LEVEL
+        previous = None
+        for rank, (score, member) in enumerate(items, start=1):
+            node = _Node(member, score, self._random_level())
+            for i in range(len(node.forward)):
+                last[i].forward[i] = node
+                last[i].span[i] = rank - last_rank[i]
+                last[i] = node
+                last_rank[i] = rank
+            node.backward = previous
+            previous = node
+            self._scores[member] = score
+        # Links to the end span the nodes after them, as insertion expects
+        self._level = max((i + 1 for i in range(self.MAX_LEVEL) if last_rank[i]), default=1)
+        for i in range(self._level):
+            last[i].span[i] = len(items) - last_rank[i]
+        self._tail = previous
+
+    def _node_at(self, rank: int) -> Optional[_Node]:
+        """Node at a 1-based ascending rank"""
+        traversed = 0
+        x = self._head
+        for i in reversed(range(self._level)):
+            while x.forward[i] is not None and traversed + x.span[i] <= rank:
+                traversed += x.span[i]
+                x = x.forward[i]
+            if traversed == rank:
+                return x
+        return None
+
+    def zadd(self, mapping: Dict[str, float]) -> int:
+        """Add or re-score members, returning how many were new"""
+        added = 0
+        with self._lock:
+            if not self._scores and len(mapping) > 1:
+                self._bulk_load(mapping)
+                return len(mapping)
+            for member, score in mapping.items():
+                score = float(score)
+                current = self._scores.get(member)
+                if current == score:
+                    continue
+                if current is None:
+                    added += 1
+                else:
+                    self._delete(member, current)
+                self._insert(member, score)
+                self._scores[member] = score
+        return added
+
+    def zrem(self, *members: str) -> int:
+        removed = 0
+        with self._lock:
+            for member in members:
+                score = self._scores.pop(member, None)
+                if score is not None:
+                    self._delete(member, score)
+                    removed += 1
+        return removed
+
+    def zscore(self, member: str) -> Optional[float]:
+        return self._scores.get(member)
+
+    def zcard(self) -> int:
+        return len(self._scores)
+
+    def zrevrank(self, member: str) -> Optional[int]:
+        """0-based rank counting from the highest score"""
+        with self._lock:
+            score = self._scores.get(member)
+            if score is None:
+                return None
+            rank = 0
+            x = self._head
+            for i in reversed(range(self._level)):
+                while x.forward[i] is not None and (x.forward[i].score, x.forward[i].member) <= (score, member):
+                    rank += x.span[i]
+                    x = x.forward[i]
+            return len(self._scores) - rank
+
+    def zrevrange(self, start: int, stop: int, withscores: bool = False) -> List:
+        """
+        Members by descending score between 0-based ranks start and stop (inclusive)
+
+        Negative ranks count from the end, as in Redis (-1 is the lowest score).
+        """
+        with self._lock:
+            length = len(self._scores)
+            if start < 0:
+                start = max(start + length, 0)
+            if stop < 0:
+                stop += length
+            stop = min(stop, length - 1)
+            if start > stop:
+                return []
+            x = self._node_at(length - start)
+            results = []
+            for _ in range(stop - start + 1):
+                results.append((x.member, x.score) if withscores else x.member)
+                x = x.backward
+            return results
+
+    def delete(self):
+        """Remove every member"""
+        with self._lock:
+            self._scores = {}
+            self._head = _Node(None, None, self.MAX_LEVEL)
+            self._tail = None
+            self._level = 1
+
+
+class RedisSortedSet:
+    """The same interface backed by one Redis sorted set (shared by every app process)"""
+
+    def __init__(self, client, key: str):
+        self.client = client
+        self.key = key
+
+    CHUNK = 10000
+
+    def zadd(self, mapping: Dict[str, float]) -> int:
+        """ZADD, sending large mappings in pipelined chunks so Redis is never blocked for long"""
+        if len(mapping) <= self.CHUNK:
+            return self.client.zadd(self.key, mapping)
+        items = list(mapping.items())
+        pipeline = self.client.pipeline(transaction=False)
+        for start in range(0, len(items), self.CHUNK):
+            pipeline.zadd(self.key, dict(items[start:start + self.CHUNK]))
+        return sum(pipeline.execute())
+
+    def zrem(self, *members: str) -> int:
+        return self.client.zrem(self.key, *members) if members else 0
+
+    def zscore(self, member: str) -> Optional[float]:
+        return self.client.zscore(self.key, member)
+
+    def zcard(self) -> int:
+        return self.client.zcard(self.key)
+
+    def zrevrank(self, member: str) -> Optional[int]:
+        return self.client.zrevrank(self.key, member)
+
+    def zrevrange(self, start: int, stop: int, withscores: bool = False) -> List:
+        return self.client.zrevrange(self.key, start, stop, withscores=withscores)
+
+    def delete(self):
+        self.client.delete(self.key)
+
+
+class StreakLeaderboard:
+    """Global and friends leaderboards of current and longest streaks"""
+
+    BOARDS = ("current", "longest")
+
+    def __init__(self, redis_url: Optional[str] = Config.LEADERBOARD_REDIS_URL):
+        if redis_url:
+            import redis  # only needed when the leaderboard is shared through Redis
+            client = redis.Redis.from_url(redis_url, decode_responses=True)
+            self._boards = {board: RedisSortedSet(client, f"leaderboard:{board}_streak") for board in self.BOARDS}
+        else:
+            # Per process: with several app workers each one keeps (and rebuilds) its own copy
+            self._boards = {board: SkipListSortedSet() for board in self.BOARDS}
+
+    @staticmethod
+    def _member(user_id: Any) -> str:
+        return str(user_id)
+
+    @staticmethod
+    def _user_id(member: str) -> Any:
+        return int(member) if member.isdigit() else member
+
+    def update(self, user_id: Any, current_streak: int, longest_streak: int):
+        """Record a user's streaks; users with a zero streak drop off that board"""
+        member = self._member(user_id)
+        try:
+            for board, streak in (("current", current_streak), ("longest", longest_streak)):
+                if streak > 0:
+                    self._boards[board].zadd({member: streak})
+                else:
+                    self._boards[board].zrem(member)
+        except Exception as e:
+            # The leaderboard is derived data - never fail the streak update over it
+            logger.error(f"Failed to update leaderboard for user {user_id}: {e}")
+
+    def rebuild(self, rows: Iterable[Tuple[Any, int, int]]) -> int:
+        """
+        Replace both boards with (user_id, current_streak, longest_streak) rows
+
+        Returns:
+            Number of users loaded
+        """
+        count = 0
+        scores = {"current": {}, "longest": {}}
+        for user_id, current_streak, longest_streak in rows:
+            member = self._member(user_id)
+            if current_streak:
+                scores["current"][member] = current_streak
+            if longest_streak:
+                scores["longest"][member] = longest_streak
+            count += 1
+
+        # Loading into an empty set is one sort plus linear linking
+        for board, mapping in scores.items():
+            self._boards[board].delete()
+            if mapping:
+                self._boards[board].zadd(mapping)
+        logger.info(f"🏅 Leaderboard rebuilt with {count} users")
+        return count
+
+    def top(self, board: str, k: int) -> List[Dict[str, Any]]:
+        """The k users with the highest streak on a board"""
+        if k <= 0:
+            return []  # zrevrange(0, -1) would return the whole board
+        return [
+            {'rank': rank, 'user_id': self._user_id(member), 'streak': int(score)}
+            for rank, (member, score) in enumerate(
+                self._boards[board].zrevrange(0, k - 1, withscores=True), start=1
+            )
+        ]
+
+    def rank(self, board: str, user_id: Any) -> Dict[str, Any]:
+        """A user's 1-based position on a board (None when they are not on it)"""
+        sorted_set = self._boards[board]
+        member = self._member(user_id)
+        position = sorted_set.zrevrank(member)
+        score = sorted_set.zscore(member)
+        return {
+            'user_id': user_id,
+            'rank': position + 1 if position is not None else None,
+            'streak': int(score) if score is not None else 0,
+            'total': sorted_set.zcard()
+        }
+
+    def friends(self, board: str, user_ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Rank a set of users among themselves (one score lookup each)"""
+        sorted_set = self._boards[board]
+        scored = []
+        for user_id in dict.fromkeys(user_ids):
+            score = sorted_set.zscore(self._member(user_id))
+            scored.append((int(score) if score is not None else 0, user_id))
+        scored.sort(key=lambda item: -item[0])
+        return [
+            {'rank': rank, 'user_id': user_id, 'streak': streak}
+            for rank, (streak, user_id) in enumerate(scored, start=1)
+        ]
@@ -0,0 +1,44 @@
+# backend/journal/lexicon_scorer.py
+# Lightweight lexicon-based emotion scorer used when the model is overloaded
+
+from typing import Dict, List
+
+from backend.Journal.keyword_tagger import EcoKeywordTagger
+
+
+class LexiconEmotionScorer:
+    """Scores emotions by counting lexicon words, producing pipeline-shaped output"""
+
+    def __init__(self, emotion_weights: Dict[str, Dict[str, float]], lexicon: Dict[str, List[str]]):
+        self.labels = [label for emotions in emotion_weights.values() for label in emotions]
+
+        # Every label also matches its own name ("joy", "pride", ...)
+        words_by_label = {label: [label] + list(lexicon.get(label, [])) for label in self.labels}
+        self._tagger = EcoKeywordTagger(words_by_label)
+
+    def score(self, text: str) -> List[Dict]:
+        """
+        Score a text against the emotion lexicon
+
+        Args:
+            text: Journal entry text
+
+        Returns:
+            List of {'label', 'score'} dicts shaped like the model pipeline output
+        """
+        counts = {label: 0 for label in self.labels}
+        for match in self._tagger.find_matches(text):
+            counts[match['category']] += 1
+
+        total = sum(counts.values())
+        if total == 0:
+            return [
+                {'label': label, 'score': 1.0 if label == 'neutral' else 0.0}
+                for label in self.labels
+            ]
+
+        return [{'label': label, 'score': count / total} for label, count in counts.items()]
+
+    def score_batch(self, texts: List[str]) -> List[List[Dict]]:
+        """Score several texts"""
+        return [self.score(text) for text in texts]
@@ -255,7 +255,7 @@ class EcoJournalCLI:
             print("Cancelled.")
             return
         
-        result = self.service.streak_manager.use_streak_freeze(self.user_id)
+        result = self.service.use_streak_freeze(self.user_id)
         
         if result['success']:
             print("✅ Streak freeze activated!")
@@ -0,0 +1,222 @@
+# backend/journal/reanalyze.py
+# Resumable bulk re-analysis of stored journal entries
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional
+
+from backend.Journal.config import Config
+from backend.Journal.analyzer import EcoJournalAnalyzer
+from Database.Journal import get_journal_repository, get_job_checkpoint_repository
+
+logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "reanalyze_journal_entries"
+
+# Per-process analyzer, created once by the pool initializer
+_worker_analyzer: Optional[EcoJournalAnalyzer] = None
+
+
+def _init_worker(threads_per_worker: int):
+    """Load the model once per worker process"""
+    global _worker_analyzer
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+    _worker_analyzer = EcoJournalAnalyzer()
+
+
+def _require_model(analyzer: EcoJournalAnalyzer):
+    """Refuse to run on the lexicon fallback, which would replace model analyses"""
+    if analyzer.emotion_classifier is None:
+        raise RuntimeError("Emotion model failed to load - re-analysis aborted")
+
+
+def _analyze_chunk(texts: List[str]) -> List[Dict]:
+    """Analyze one chunk of texts inside a worker process"""
+    _require_model(_worker_analyzer)
+    return _worker_analyzer.analyze_batch(texts)
+
+
+class JournalReanalysisJob:
+    """Re-runs analysis over journal_entries whose analysis_version is stale"""
+
+    def __init__(self, workers: int = Config.REANALYSIS_WORKERS,
+                 page_size: int = Config.REANALYSIS_PAGE_SIZE):
+        self.workers = max(1, workers)
+        self.page_size = page_size
+        self.analysis_version = Config.get_analysis_version()
+        self.journal_repo = get_journal_repository()
+        self.checkpoint_repo = get_job_checkpoint_repository()
+
+    def run(self, restart: bool = False, limit: int = None) -> Dict:
+        """
+        Stream entries in _id order and rewrite their analysis
+
+        Args:
+            restart: Ignore any saved checkpoint and start from the first entry
+            limit: Stop after this many entries (useful for trial runs)
+
+        Returns:
+            Dictionary with job statistics
+        """
+        state = self._load_state(restart)
+        logger.info(
+            f"🔁 Re-analysis to version {self.analysis_version} "
+            f"resuming after {state['last_id']} ({state['processed']} done)"
+        )
+
+        pool = self._create_pool()
+        local_analyzer = None if pool else EcoJournalAnalyzer()
+        if local_analyzer is not None:
+            _require_model(local_analyzer)
+        started = time.perf_counter()
+        processed_this_run = 0
+
+        analyze = (lambda texts: self._analyze_in_pool(pool, texts)) if pool else local_analyzer.analyze_batch
+
+        try:
+            finished = False
+            while limit is None or processed_this_run < limit:
+                page_size = self.page_size if limit is None else min(self.page_size, limit - processed_this_run)
+                page = self.journal_repo.get_entries_after(
+                    state['last_id'], page_size, exclude_version=self.analysis_version
+                )
+                if not page:
+                    finished = True
+                    break
+
+                # Failed rows are behind the checkpoint now, so remember them for the retry pass
+                failed_ids = self._reanalyze_page(page, analyze)
+                state['failed'] += len(failed_ids)
+                state['failed_ids'].extend(failed_ids)
+
+                state['last_id'] = page[-1]['_id']
+                state['processed'] += len(page)
+                processed_this_run += len(page)
+                self.checkpoint_repo.save(JOB_NAME, state)
+
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"📦 {state['processed']} entries re-analyzed "
+                    f"({processed_this_run / elapsed:.1f} entries/s this run)"
+                )
+
+            if finished and state['failed_ids']:
+                # One more try for rows that failed during the pass; rows failing again stay listed
+                retry = self.journal_repo.get_reanalyzable_entries(state['failed_ids'])
+                logger.info(f"🔁 Retrying {len(retry)} entries that failed earlier")
+                state['failed_ids'] = self._reanalyze_page(retry, analyze) if retry else []
+                self.checkpoint_repo.save(JOB_NAME, state)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"✅ Re-analysis finished: {processed_this_run} entries in {elapsed:.1f}s")
+        return {
+            'analysis_version': self.analysis_version,
+            'processed_this_run': processed_this_run,
+            'processed_total': state['processed'],
+            'failed_total': state['failed'],
+            'failed_pending_retry': len(state['failed_ids']),
+            'last_id': str(state['last_id']) if state['last_id'] else None,
+            'elapsed_seconds': round(elapsed, 2)
+        }
+
+    def _load_state(self, restart: bool) -> Dict:
+        """Load the checkpoint, discarding it if it belongs to another version"""
+        if restart:
+            self.checkpoint_repo.clear(JOB_NAME)
+
+        saved = self.checkpoint_repo.load(JOB_NAME)
+        if saved and saved.get('analysis_version') == self.analysis_version:
+            return {
+                'analysis_version': self.analysis_version,
+                'last_id': saved.get('last_id'),
+                'processed': saved.get('processed', 0),
+                'failed': saved.get('failed', 0),
+                'failed_ids': saved.get('failed_ids', [])
+            }
+
+        return {
+            'analysis_version': self.analysis_version,
+            'last_id': None,
+            'processed': 0,
+            'failed': 0,
+            'failed_ids': []
+        }
+
+    def _reanalyze_page(self, page: List[Dict], analyze) -> List:
+        """
+        Analyze a page of entries and write back the successful results
+
+        Failed rows keep their stored analysis.
+
+        Returns:
+            Ids of the rows that failed
+        """
+        analyses = analyze([entry.get('content', '') for entry in page])
+        updates, failed_ids = [], []
+        for entry, analysis in zip(page, analyses):
+            metadata = analysis['analysis_metadata']
+            version = metadata.get('analysis_version')
+            if metadata.get('error') or version is None:
+                failed_ids.append(entry['_id'])
+                continue
+            updates.append({
+                '_id': entry['_id'],
+                'analysis': analysis,
+                'analysis_version': version
+            })
+        self.journal_repo.bulk_update_analysis(updates)
+        return failed_ids
+
+    def _create_pool(self):
+        """Create the worker pool, or None to analyze in this process"""
+        if self.workers == 1:
+            return None
+
+        threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        context = multiprocessing.get_context("spawn")  # torch is not fork-safe
+        return context.Pool(self.workers, initializer=_init_worker, initargs=(threads_per_worker,))
+
+    def _analyze_in_pool(self, pool, texts: List[str]) -> List[Dict]:
+        """Split a page across workers and keep results in page order"""
+        chunk_size = -(-len(texts) // self.workers)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+        analyses = []
+        for chunk_result in pool.map(_analyze_chunk, chunks):
+            analyses.extend(chunk_result)
+        return analyses
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Re-analyze stored journal entries")
+    parser.add_argument("--workers", type=int, default=Config.REANALYSIS_WORKERS,
+                        help="Number of analyzer processes")
+    parser.add_argument("--page-size", type=int, default=Config.REANALYSIS_PAGE_SIZE,
+                        help="Entries fetched and written per round trip")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore the saved checkpoint")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Stop after this many entries")
+    args = parser.parse_args()
+
+    job = JournalReanalysisJob(workers=args.workers, page_size=args.page_size)
+    print(job.run(restart=args.restart, limit=args.limit))
+
+
+if __name__ == "__main__":
+    main()
+
+# run using: python -m backend.Journal.reanalyze --workers 4
@@ -1,9 +1,17 @@
 # backend/Journal/routes.py
 
+import asyncio
+import json
+import time
+
 from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+from datetime import date
 
+from backend.Journal.config import Config
 from backend.Journal.journal_service import EcoJournalService
 from backend.Auth.deps import get_current_user
 
@@ -13,6 +21,13 @@ router = APIRouter(prefix="/journal", tags=["Eco Journal"])
 class JournalEntryRequest(BaseModel):
     content: str
 
+class ImportedEntry(BaseModel):
+    date: date
+    content: str
+
+class JournalImportRequest(BaseModel):
+    entries: List[ImportedEntry]
+
 # Initialize service
 service = EcoJournalService()
 
@@ -41,6 +56,113 @@ def create_journal_entry(entry: JournalEntryRequest, user_id: int = Depends(get_
     return result
 
 
+@router.post("/entry/async", status_code=202)
+def submit_journal_entry(entry: JournalEntryRequest, user_id: int = Depends(get_current_user)):
+    """
+    Save a journal entry and update the streak immediately; analysis and
+    inspiration are produced in the background. Poll status_url or
+    subscribe to events_url for the result.
+    """
+    result = service.submit_journal_entry(user_id, entry.content)
+
+    if not result.get("success"):
+        raise HTTPException(status_code=400, detail=result.get("error", "Processing failed"))
+    return result
+
+
+@router.post("/import", status_code=202)
+def import_journal_entries(request: JournalImportRequest, user_id: int = Depends(get_current_user)):
+    """
+    Import dated entries for the logged-in user (e.g. from a paper journal).
+    The import runs in the background: entries are analyzed in batches and the
+    streak history is rebuilt in date order. Poll status_url for the result.
+    """
+    result = service.submit_journal_import(
+        user_id, [{"date": entry.date, "content": entry.content} for entry in request.entries]
+    )
+    if not result.get("success"):
+        raise HTTPException(status_code=400, detail=result.get("error", "Import failed"))
+    return result
+
+
+@router.get("/import/{job_id}")
+def get_import_status(job_id: str, user_id: int = Depends(get_current_user)):
+    """
+    Progress of one of the logged-in user's imports, with the summary once finished
+    """
+    result = service.get_import_status(job_id, user_id)
+    if not result.get("success"):
+        raise HTTPException(status_code=404, detail=result.get("error", "Import job not found"))
+    return result
+
+
+@router.get("/entry/{entry_id}/status")
+def get_entry_status(entry_id: str):
+    """
+    Get deferred analysis status for an entry (public)
+    """
+    result = service.get_entry_status(entry_id)
+    if not result.get("success"):
+        raise HTTPException(status_code=404, detail=result.get("error", "Entry not found"))
+    return result
+
+
+@router.get("/entry/{entry_id}/events")
+async def stream_entry_status(entry_id: str):
+    """
+    Server-Sent Events stream that delivers the analysis once it is ready
+    """
+    async def event_stream():
+        deadline = time.monotonic() + Config.SSE_TIMEOUT_SECONDS
+        while True:
+            result = await run_in_threadpool(service.get_entry_status, entry_id)
+
+            if not result.get("success"):
+                yield f"event: error\ndata: {json.dumps(result, default=str)}\n\n"
+                return
+            if result["analysis_status"] != "pending":
+                yield f"event: analysis\ndata: {json.dumps(result, default=str)}\n\n"
+                return
+            if time.monotonic() >= deadline:
+                yield f"event: timeout\ndata: {json.dumps(result, default=str)}\n\n"
+                return
+
+            yield ": pending\n\n"  # comment line keeps the connection alive
+            await asyncio.sleep(Config.SSE_POLL_SECONDS)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/entry/{entry_id}/similar")
+def get_similar_entries(entry_id: str, k: int = 5, scope: str = "user",
+                        user_id: int = Depends(get_current_user)):
+    """
+    Find the authenticated user's entries most similar to this one
+    (scope=global returns anonymized themes from all users)
+    """
+    if scope not in ("user", "global"):
+        raise HTTPException(status_code=400, detail="scope must be 'user' or 'global'")
+    result = service.find_similar_entries(user_id, entry_id, k=max(1, min(k, 50)), scope=scope)
+    if not result.get("success"):
+        raise HTTPException(status_code=404, detail=result.get("error", "Entry not found"))
+    return result
+
+
+@router.get("/search")
+def search_entries(q: str, eco_tag: Optional[str] = None, sentiment: Optional[str] = None,
+                   limit: int = 20, cursor: Optional[str] = None,
+                   user_id: int = Depends(get_current_user)):
+    """
+    Full-text search over the authenticated user's journal (BM25-ranked, cursor-paginated)
+    """
+    result = service.search_entries(user_id, q, limit=max(1, min(limit, 100)), cursor=cursor,
+                                    eco_tag=eco_tag, sentiment=sentiment)
+    if not result.get("success"):
+        raise HTTPException(status_code=400, detail=result.get("error", "Search failed"))
+    return result
+
+
 @router.get("/dashboard")
 def get_dashboard(user_id: int = Depends(get_current_user)):
     """
@@ -52,6 +174,35 @@ def get_dashboard(user_id: int = Depends(get_current_user)):
     return result
 
 
+@router.get("/leaderboard")
+def get_leaderboard(board: str = "current", k: int = 10, friends: Optional[str] = None,
+                    user_id: int = Depends(get_current_user)):
+    """
+    Streak leaderboard (board is current or longest) with the caller's rank;
+    pass friends=1,2,3 to rank only those users and the caller
+    """
+    friend_ids = None
+    if friends is not None:
+        try:
+            friend_ids = [int(friend) for friend in friends.split(",") if friend.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="friends must be a comma-separated list of user ids")
+    result = service.get_leaderboard(
+        user_id, board=board, k=max(1, min(k, Config.LEADERBOARD_MAX_K)), friend_ids=friend_ids
+    )
+    if not result.get("success"):
+        raise HTTPException(status_code=400, detail=result.get("error", "Leaderboard unavailable"))
+    return result
+
+
+@router.get("/reminders")
+def get_streak_reminders(dismiss: bool = False, user_id: int = Depends(get_current_user)):
+    """
+    Pending streak reminders for the authenticated user (dismiss=true marks them seen)
+    """
+    return service.get_streak_reminders(user_id, dismiss=dismiss)
+
+
 @router.get("/inspiration/{user_id}/{mood}")
 def get_inspiration_debug(user_id: int, mood: str):
     print(f">>> Debug: get_inspiration called with user_id={user_id!r}, mood={mood!r}")
@@ -62,12 +213,18 @@ def get_inspiration_debug(user_id: int, mood: str):
 
 
 @router.get("/entries/{user_id}")
-def get_user_entries(user_id: int):
+def get_user_entries(user_id: int, limit: int = 50, cursor: Optional[str] = None, view: str = "full"):
     """
-    Get all entries for a user (public)
+    Get entries for a user, newest first (public)
+    Pass next_cursor back as `cursor` for the next page; view is full, summary or ids
     """
-    result = service.journal_repo.get_user_entries(user_id)
-    return {"success": True, "entries": result}
+    try:
+        entries, next_cursor = service.journal_repo.get_user_entries_page(
+            user_id, limit=max(1, min(limit, 100)), cursor=cursor, view=view
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "entries": entries, "next_cursor": next_cursor}
 
 
 @router.get("/entry/{entry_id}")
@@ -0,0 +1,355 @@
+# backend/journal/similarity_index.py
+# In-memory vector indexes for "you wrote something similar" search
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.Journal.config import Config
+
+logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
+logger = logging.getLogger(__name__)
+
+
+def decode_embedding(raw: bytes) -> np.ndarray:
+    """Decode a stored float16 embedding"""
+    return np.frombuffer(raw, dtype='<f2')
+
+
+class ExactVectorIndex:
+    """Brute-force cosine search over a growable float16 matrix"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._vectors = np.zeros((64, dim), dtype=np.float16)
+        self._ids: List[Any] = []
+        self._positions: Dict[Any, int] = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:len(self._ids)]
+
+    @property
+    def ids(self) -> List[Any]:
+        return self._ids
+
+    def add(self, item_id: Any, vector: np.ndarray) -> Tuple[int, bool]:
+        """
+        Store a unit vector, replacing the one already held for item_id
+
+        Returns:
+            (row position, whether the id is new)
+        """
+        position = self._positions.get(item_id)
+        if position is not None:
+            self._vectors[position] = vector
+            return position, False
+
+        position = len(self._ids)
+        if position == self._vectors.shape[0]:
+            grown = np.zeros((position * 2, self.dim), dtype=np.float16)
+            grown[:position] = self._vectors
+            self._vectors = grown
+        self._vectors[position] = vector
+        self._ids.append(item_id)
+        self._positions[item_id] = position
+        return position, True
+
+    def extend(self, item_ids: List[Any], vectors: np.ndarray):
+        """Bulk-load rows into an empty index (ids must be unique)"""
+        self._vectors = np.zeros((max(64, len(item_ids)), self.dim), dtype=np.float16)
+        self._vectors[:len(item_ids)] = vectors
+        self._ids = list(item_ids)
+        self._positions = {item_id: position for position, item_id in enumerate(self._ids)}
+
+    def search(self, query: np.ndarray, k: int, exclude: Iterable[Any] = (),
+               positions: Optional[np.ndarray] = None) -> List[Tuple[Any, float]]:
+        """
+        Return the k most similar ids by cosine similarity
+
+        Args:
+            query: Unit query vector
+            k: Number of results
+            exclude: Ids to leave out (e.g. the query entry itself)
+            positions: Restrict the search to these rows
+
+        Returns:
+            List of (id, score) pairs, best first
+        """
+        if not self._ids:
+            return []
+
+        candidates = self.vectors if positions is None else self._vectors[positions]
+        scores = candidates.astype(np.float32) @ query.astype(np.float32)
+
+        exclude = set(exclude)
+        want = min(k + len(exclude), len(scores))
+        top = np.argpartition(-scores, want - 1)[:want]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for idx in top:
+            item_id = self._ids[idx if positions is None else positions[idx]]
+            if item_id in exclude:
+                continue
+            results.append((item_id, float(scores[idx])))
+            if len(results) == k:
+                break
+        return results
+
+
+class IVFVectorIndex:
+    """Inverted-file index: exact below a size threshold, probed k-means lists above it"""
+
+    def __init__(self, dim: int, n_lists: int = Config.SIMILARITY_IVF_LISTS,
+                 n_probes: int = Config.SIMILARITY_IVF_PROBES,
+                 train_threshold: int = Config.SIMILARITY_EXACT_MAX):
+        self.n_lists = n_lists
+        self.n_probes = n_probes
+        self.train_threshold = train_threshold
+        self._store = ExactVectorIndex(dim)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._assignment: List[int] = []  # list of each row
+        self._trained_size = 0
+
+    @classmethod
+    def build(cls, dim: int, item_ids: List[Any], vectors: np.ndarray, **kwargs) -> "IVFVectorIndex":
+        """Bulk-load an index and train it once if it is large enough"""
+        index = cls(dim, **kwargs)
+        index._store.extend(item_ids, vectors)
+        if len(index) >= index.train_threshold:
+            index.train()
+        return index
+
+    def __len__(self):
+        return len(self._store)
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def ids(self) -> List[Any]:
+        return self._store.ids
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._store.vectors
+
+    @property
+    def needs_training(self) -> bool:
+        """Large enough to train, or doubled since the last training"""
+        return len(self) >= self.train_threshold and len(self) >= 2 * self._trained_size
+
+    def add(self, item_id: Any, vector: np.ndarray):
+        """Add or replace one vector; training is left to the caller (see needs_training)"""
+        position, is_new = self._store.add(item_id, vector)
+        if not self.trained:
+            return
+
+        nearest = int(np.argmax(self._centroids @ vector.astype(np.float32)))
+        if is_new:
+            self._assignment.append(nearest)
+        else:
+            self._lists[self._assignment[position]].remove(position)
+            self._assignment[position] = nearest
+        self._lists[nearest].append(position)
+
+    def train(self, iterations: int = 10, sample_size: int = 50000):
+        """Fit spherical k-means centroids and rebuild the inverted lists"""
+        vectors = self._store.vectors.astype(np.float32)
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)]
+
+        n_lists = min(self.n_lists, len(sample))
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            # Sum each list's members in one pass over the sample sorted by list
+            order = np.argsort(assignment, kind='stable')
+            filled, starts = np.unique(assignment[order], return_index=True)
+            sums = np.add.reduceat(sample[order], starts)
+            centroids[filled] = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind='stable')
+        bounds = np.searchsorted(assignment[order], np.arange(1, n_lists))
+        self._lists = [chunk.tolist() for chunk in np.split(order, bounds)]
+        self._assignment = assignment.tolist()
+        self._centroids = centroids
+        self._trained_size = len(vectors)
+
+    def search(self, query: np.ndarray, k: int, exclude: Iterable[Any] = ()) -> List[Tuple[Any, float]]:
+        if not self.trained:
+            return self._store.search(query, k, exclude)
+
+        probes = np.argsort(-(self._centroids @ query.astype(np.float32)))[:self.n_probes]
+        positions = np.fromiter(
+            (position for c in probes for position in self._lists[c]), dtype=np.int64
+        )
+        if not len(positions):
+            return []
+        return self._store.search(query, k, exclude, positions=positions)
+
+
+class _Build:
+    """An index being loaded or retrained in the background"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.pending: List[Tuple[Any, np.ndarray]] = []  # adds made meanwhile, replayed on swap
+        self.error: Optional[Exception] = None
+
+
+_GLOBAL = object()  # index key of the all-users index
+
+
+class SimilarEntryIndex:
+    """
+    Per-user and global similarity indexes over journal entry embeddings
+
+    Indexes are bulk-loaded from MongoDB and (re)trained on background threads,
+    outside the lock, then swapped in; add() only appends to what is loaded.
+    Indexes older than max_age_seconds are reloaded the same way, so embeddings
+    rewritten by the re-analysis job (another process) show up.
+    """
+
+    def __init__(self, journal_repo, dim: int = Config.EMBEDDING_DIM,
+                 max_cached_users: int = Config.SIMILARITY_USER_CACHE,
+                 max_age_seconds: float = Config.SIMILARITY_INDEX_MAX_AGE_SECONDS):
+        self.journal_repo = journal_repo
+        self.dim = dim
+        self.max_cached_users = max_cached_users
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._user_indexes: "OrderedDict[Any, IVFVectorIndex]" = OrderedDict()
+        self._global_index: Optional[IVFVectorIndex] = None
+        self._built_at: Dict[Any, float] = {}
+        self._builds: Dict[Any, _Build] = {}
+
+    def add(self, entry_id: str, user_id: Any, vector: np.ndarray):
+        """Add (or replace) a freshly analyzed entry in every loaded index"""
+        with self._lock:
+            for key in (user_id, _GLOBAL):
+                index = self._get(key)
+                if index is not None:
+                    index.add(entry_id, vector)
+                    if index.needs_training:
+                        self._start_build(key, snapshot=index)
+                build = self._builds.get(key)
+                if build is not None:
+                    build.pending.append((entry_id, vector))
+
+    def warm_global(self):
+        """Start loading the global index in the background (e.g. at startup)"""
+        with self._lock:
+            if self._global_index is None:
+                self._start_build(_GLOBAL)
+
+    def search_user(self, user_id: Any, query: np.ndarray, k: int,
+                    exclude: Iterable[Any] = ()) -> List[Tuple[str, float]]:
+        """Search one user's entries"""
+        index = self._ready(user_id)
+        with self._lock:
+            return index.search(query, k, exclude)
+
+    def search_global(self, query: np.ndarray, k: int,
+                      exclude: Iterable[Any] = ()) -> List[Tuple[str, float]]:
+        """Search all users' entries"""
+        index = self._ready(_GLOBAL)
+        with self._lock:
+            return index.search(query, k, exclude)
+
+    def _get(self, key: Any) -> Optional[IVFVectorIndex]:
+        return self._global_index if key is _GLOBAL else self._user_indexes.get(key)
+
+    def _ready(self, key: Any) -> IVFVectorIndex:
+        """The loaded index for a key, waiting (without the lock) for a first load"""
+        with self._lock:
+            index = self._get(key)
+            if index is not None:
+                if key is not _GLOBAL:
+                    self._user_indexes.move_to_end(key)
+                if time.monotonic() - self._built_at.get(key, 0.0) > self.max_age_seconds:
+                    self._start_build(key)  # keep serving this one until the reload is swapped in
+                return index
+            build = self._start_build(key)
+
+        build.done.wait()
+        if build.error is not None:
+            raise build.error
+        with self._lock:
+            index = self._get(key)
+        return index if index is not None else IVFVectorIndex(self.dim)
+
+    def _start_build(self, key: Any, snapshot: Optional[IVFVectorIndex] = None) -> _Build:
+        """
+        Start a background load (from MongoDB) or retrain (from snapshot) of one index
+
+        Called with the lock held; a key has at most one build running.
+        """
+        build = self._builds.get(key)
+        if build is not None:
+            return build
+
+        build = self._builds[key] = _Build()
+        replaces = self._get(key)
+        if snapshot is not None:
+            # A view: rows are only appended or replaced, and replacements are replayed anyway
+            item_ids, vectors = list(snapshot.ids), snapshot.vectors
+            source = lambda: (item_ids, vectors)
+        else:
+            source = lambda: self._load_vectors(key)
+        threading.Thread(
+            target=self._build, args=(key, build, source, replaces),
+            name="similarity-index-build", daemon=True
+        ).start()
+        return build
+
+    def _build(self, key: Any, build: _Build, source, replaces: Optional[IVFVectorIndex]):
+        try:
+            item_ids, vectors = source()
+            index = IVFVectorIndex.build(self.dim, item_ids, vectors)
+            with self._lock:
+                for entry_id, vector in build.pending:
+                    index.add(entry_id, vector)
+                # Don't resurrect a user evicted meanwhile
+                if self._get(key) is replaces:
+                    self._install(key, index)
+        except Exception as e:
+            logger.error(f"Failed to build similarity index: {e}")
+            build.error = e
+        finally:
+            with self._lock:
+                self._builds.pop(key, None)
+            build.done.set()
+
+    def _install(self, key: Any, index: IVFVectorIndex):
+        """Swap in a built index, keeping an LRU of loaded users (lock held)"""
+        self._built_at[key] = time.monotonic()
+        if key is _GLOBAL:
+            self._global_index = index
+            return
+        self._user_indexes[key] = index
+        self._user_indexes.move_to_end(key)
+        if len(self._user_indexes) > self.max_cached_users:
+            evicted, _ = self._user_indexes.popitem(last=False)
+            self._built_at.pop(evicted, None)
+
+    def _load_vectors(self, key: Any) -> Tuple[List[str], np.ndarray]:
+        """Read every stored embedding for a key into one matrix"""
+        rows = self.journal_repo.iter_embeddings() if key is _GLOBAL else self.journal_repo.get_user_embeddings(key)
+        item_ids, raw = [], []
+        for entry_id, embedding in rows:
+            item_ids.append(entry_id)
+            raw.append(embedding)
+        vectors = np.frombuffer(b"".join(raw), dtype='<f2').reshape(len(item_ids), self.dim)
+        return item_ids, vectors
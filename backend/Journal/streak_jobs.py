@@ -0,0 +1,280 @@
+# backend/journal/streak_jobs.py
+# In-process scheduler for batch streak maintenance (reminders, freeze resets, freeze expiry, event compaction)
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.Journal.config import Config
+from backend.metrics import registry
+from Database.Journal import (
+    unit_of_work, get_job_checkpoint_repository, get_streak_reminder_repository,
+    month_start, ensure_streak_event_partitions, drop_streak_event_partitions_before
+)
+
+logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
+logger = logging.getLogger(__name__)
+
+JOB_USERS_TOTAL = registry.counter(
+    "streak_job_users_total", "Users scanned by scheduled streak jobs", ["job"]
+)
+JOB_SECONDS = registry.histogram(
+    "streak_job_seconds", "Duration of scheduled streak job runs", ["job"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+)
+
+
+class StreakBatchJob:
+    """Runs once per period over user_stats in keyset batches, checkpointing after each batch"""
+
+    name = "streak_job"
+
+    def __init__(self, batch_size: int = Config.STREAK_JOBS_BATCH_SIZE, checkpoint_repo=None,
+                 on_users_changed: Optional[Callable[[List[Any]], None]] = None,
+                 lease_seconds: int = Config.STREAK_JOBS_LEASE_SECONDS):
+        self.batch_size = batch_size
+        self.checkpoint_repo = checkpoint_repo or get_job_checkpoint_repository()
+        self.on_users_changed = on_users_changed
+        self.lease_seconds = lease_seconds
+        # Unique per process and job instance; every uvicorn worker runs its own scheduler
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def period(self, today: date) -> str:
+        """Key of the period the job runs once in (daily by default)"""
+        return today.isoformat()
+
+    def process_batch(self, today: date, after_user_id: int) -> Tuple[Optional[int], int, List[Any]]:
+        """
+        Handle the next batch of users in one transaction
+
+        Returns:
+            (last user id covered or None when done, users scanned, users whose stats changed)
+        """
+        raise NotImplementedError
+
+    def run(self, today: date) -> Optional[Dict]:
+        """
+        Run (or resume) the job for the period containing today
+
+        The job's lease is taken first and renewed after every batch, so with
+        several processes only one works through the checkpoint at a time.
+
+        Returns:
+            Job statistics, or None when the period was already done or another
+            process holds the lease
+        """
+        if not self.checkpoint_repo.acquire_lease(self.name, self.owner, self.lease_seconds):
+            return None
+        try:
+            return self._run_leased(today)
+        finally:
+            self.checkpoint_repo.release_lease(self.name, self.owner)
+
+    def _run_leased(self, today: date) -> Optional[Dict]:
+        period = self.period(today)
+        state = self.checkpoint_repo.load(self.name)
+        if not state or state.get('period') != period:
+            state = {'period': period, 'last_user_id': 0, 'scanned': 0, 'changed': 0, 'done': False}
+        if state.get('done'):
+            return None
+
+        started = time.perf_counter()
+        scanned_this_run = 0
+        with JOB_SECONDS.time(job=self.name):
+            while True:
+                last_user_id, scanned, changed = self.process_batch(today, state['last_user_id'])
+                if last_user_id is None:
+                    break
+                if changed and self.on_users_changed is not None:
+                    self.on_users_changed(changed)
+
+                state['last_user_id'] = last_user_id
+                state['scanned'] += scanned
+                state['changed'] += len(changed)
+                scanned_this_run += scanned
+                self.checkpoint_repo.save(self.name, state)
+                JOB_USERS_TOTAL.inc(scanned, job=self.name)
+                if not self.checkpoint_repo.acquire_lease(self.name, self.owner, self.lease_seconds):
+                    # Lease lapsed and was taken over; the new holder resumes from the checkpoint
+                    logger.warning(f"⚠️ {self.name} lost its lease after user {last_user_id}, stopping")
+                    return None
+
+        state['done'] = True
+        self.checkpoint_repo.save(self.name, state)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"✅ {self.name} ({period}): {state['scanned']} users scanned, {state['changed']} changed "
+            f"({scanned_this_run / max(elapsed, 1e-9):.0f} users/s this run)"
+        )
+        return {
+            'job': self.name,
+            'period': period,
+            'scanned': state['scanned'],
+            'changed': state['changed'],
+            'elapsed_seconds': round(elapsed, 2)
+        }
+
+
+class AtRiskReminderJob(StreakBatchJob):
+    """Daily: remind users whose streak ends yesterday that today's entry keeps it alive"""
+
+    name = "streak_at_risk_reminders"
+
+    def __init__(self, reminder_repo=None, **kwargs):
+        super().__init__(**kwargs)
+        self.reminder_repo = reminder_repo or get_streak_reminder_repository()
+
+    def process_batch(self, today: date, after_user_id: int):
+        with unit_of_work() as uow:
+            user_ids = uow.users.get_at_risk_user_ids(today - timedelta(days=1), after_user_id, self.batch_size)
+        if not user_ids:
+            return None, 0, []
+        self.reminder_repo.add_reminders(user_ids, today, 'streak_at_risk')
+        return user_ids[-1], len(user_ids), []
+
+
+class FreezeResetJob(StreakBatchJob):
+    """Monthly: give every user their streak freezes back"""
+
+    name = "streak_freeze_reset"
+
+    def period(self, today: date) -> str:
+        return today.strftime("%Y-%m")
+
+    def process_batch(self, today: date, after_user_id: int):
+        with unit_of_work() as uow:
+            return uow.users.reset_freezes_batch(after_user_id, self.batch_size)
+
+
+class FrozenStreakExpiryJob(StreakBatchJob):
+    """Daily: end frozen streaks whose freeze window has passed"""
+
+    name = "streak_freeze_expiry"
+
+    def __init__(self, reset_after_days: int = Config.STREAK_RESET_AFTER_DAYS, **kwargs):
+        super().__init__(**kwargs)
+        self.reset_after_days = reset_after_days
+
+    def process_batch(self, today: date, after_user_id: int):
+        # A frozen streak survives an entry up to reset_after_days after the last one
+        last_entry_before = today - timedelta(days=self.reset_after_days)
+        with unit_of_work() as uow:
+            expired = uow.users.expire_frozen_streaks_batch(last_entry_before, after_user_id, self.batch_size)
+            if not expired:
+                return None, 0, []
+            uow.streak_events.insert_events_bulk([
+                {
+                    'user_id': user_id,
+                    'event_type': 'freeze_expired',
+                    'streak_count': 0,
+                    'previous_streak': previous_streak,
+                    'metadata': {'last_entry_before': last_entry_before.isoformat()}
+                }
+                for user_id, previous_streak in expired
+            ])
+        user_ids = [user_id for user_id, _ in expired]
+        return user_ids[-1], len(user_ids), user_ids
+
+
+class StreakEventCompactionJob(StreakBatchJob):
+    """Monthly: roll streak events older than the raw retention window into daily rollups"""
+
+    name = "streak_event_compaction"
+
+    def __init__(self, raw_months: int = Config.STREAK_EVENTS_RAW_MONTHS,
+                 partitions_ahead: int = Config.STREAK_EVENTS_PARTITIONS_AHEAD, **kwargs):
+        super().__init__(**kwargs)
+        self.raw_months = raw_months
+        self.partitions_ahead = partitions_ahead
+
+    def period(self, today: date) -> str:
+        return today.strftime("%Y-%m")
+
+    def cutoff(self, today: date) -> date:
+        """Events before this day are compacted (whole months only)"""
+        return month_start(today, -self.raw_months)
+
+    def process_batch(self, today: date, after_user_id: int):
+        cutoff = self.cutoff(today)
+        with unit_of_work() as uow:
+            last_user_id, compacted = uow.streak_events.compact_events_batch(
+                datetime.combine(cutoff, datetime.min.time()), after_user_id, self.batch_size
+            )
+        if last_user_id is None:
+            # Every old row is rolled up: emptied partitions go, upcoming ones are created
+            dropped = drop_streak_event_partitions_before(cutoff)
+            if dropped:
+                logger.info(f"🗑️ Dropped streak event partitions: {', '.join(dropped)}")
+            ensure_streak_event_partitions(self.partitions_ahead)
+        return last_user_id, compacted, []
+
+
+class StreakJobScheduler:
+    """Background thread that runs each streak job once per period - no external cron needed"""
+
+    def __init__(self, jobs: List[StreakBatchJob], poll_interval: float = Config.STREAK_JOBS_POLL_SECONDS):
+        self.jobs = jobs
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def default(cls, on_users_changed: Optional[Callable[[List[Any]], None]] = None) -> "StreakJobScheduler":
+        """Scheduler with the reminder, freeze reset, freeze expiry and event compaction jobs"""
+        return cls([
+            AtRiskReminderJob(),
+            FreezeResetJob(on_users_changed=on_users_changed),
+            FrozenStreakExpiryJob(on_users_changed=on_users_changed),
+            StreakEventCompactionJob()
+        ])
+
+    def start(self):
+        """Start the scheduler thread (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="streak-jobs", daemon=True)
+        self._thread.start()
+        logger.info("✅ Streak job scheduler started")
+
+    def stop(self, timeout: float = 10.0):
+        """Signal the scheduler to stop after the current batch"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info("Streak job scheduler stopped")
+
+    def run_pending(self, today: Optional[date] = None) -> List[Dict]:
+        """Run every job whose current period has not finished yet"""
+        today = today or date.today()
+        results = []
+        for job in self.jobs:
+            if self._stop_event.is_set():
+                break
+            try:
+                result = job.run(today)
+                if result is not None:
+                    results.append(result)
+            except Exception as e:
+                # The checkpoint is kept, so the next poll resumes where this run stopped
+                logger.error(f"Streak job {job.name} failed: {e}")
+        return results
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.run_pending()
+            self._stop_event.wait(self.poll_interval)
+
+
+if __name__ == "__main__":
+    # Run any due jobs once, e.g. to catch up after downtime
+    for job_result in StreakJobScheduler.default().run_pending():
+        print(job_result)
+
+# run using: python -m backend.Journal.streak_jobs
@@ -1,9 +1,11 @@
 # backend/journal/streak_manager.py
 # Streak management and gamification logic
 
+import bisect
 import logging
-from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime, date, time, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
 from backend.Journal.config import Config
 #from Database import Journal
 
@@ -13,8 +15,8 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from Database.Journal import (
-    get_user_repository, get_streak_event_repository, 
-    get_achievement_repository, ACHIEVEMENTS
+    unit_of_work, ACHIEVEMENTS, MILESTONE_KEYS, MILESTONE_THRESHOLDS,
+    reached_achievements_mask, achievement_keys
 )
 
 logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
@@ -23,9 +25,10 @@ logger = logging.getLogger(__name__)
 class StreakManager:
     """Manages user streaks and gamification"""
     
-    def __init__(self):
+    def __init__(self, leaderboard=None):
         self.max_freezes = Config.MAX_FREEZES_PER_MONTH
         self.reset_after_days = Config.STREAK_RESET_AFTER_DAYS
+        self.leaderboard = leaderboard
         
     def update_user_streak(self, user_id: str, entry_date: date = None) -> Dict:
         """
@@ -42,68 +45,149 @@ class StreakManager:
             entry_date = date.today()
             
         try:
-            user_repo = get_user_repository()
-            streak_repo = get_streak_event_repository()
-            achievement_repo = get_achievement_repository()
-            
-            # Get or create user
-            user = user_repo.get_user_by_id(user_id)
-            if not user:
-                user = user_repo.create_user(user_id)
-                logger.info(f"Created new user: {user_id}")
+            # One transaction, three statements: locked read, upsert ... RETURNING, multi-row inserts.
+            # The row lock serializes concurrent entries for the same user.
+            with unit_of_work() as uow:
+                stats = uow.users.get_streak_state_for_update(user_id)
+                if stats['total_entries'] == 0:
+                    logger.info(f"Created new user: {user_id}")
+                user = SimpleNamespace(**stats)
+                
+                # Calculate new streak (may clear user.streak_frozen)
+                previous_streak = user.current_streak
+                new_streak_info = self._calculate_new_streak(user, entry_date)
+                
+                # Newly reached achievements come from the earned mask - usually none
+                new_bits = reached_achievements_mask(new_streak_info['streak']) & ~user.achievements_mask
+                new_achievement_keys = achievement_keys(new_bits)
+                
+                # Upsert user record
+                user = uow.users.upsert_streak(
+                    user_id,
+                    new_streak_info['streak'],
+                    entry_date,
+                    user.streak_frozen,
+                    new_bits
+                )
+                
+                # Log streak event
+                uow.streak_events.insert_events(user_id, [{
+                    'event_type': new_streak_info['event_type'],
+                    'streak_count': new_streak_info['streak'],
+                    'previous_streak': previous_streak,
+                    'metadata': new_streak_info.get('metadata', {})
+                }])
+                
+                # Award any newly reached achievements (no statement when the list is empty)
+                uow.achievements.insert_achievements(user_id, new_achievement_keys, new_streak_info['streak'])
+                
+                result = {
+                    'user_id': user_id,
+                    'current_streak': new_streak_info['streak'],
+                    'longest_streak': user.longest_streak,
+                    'total_entries': user.total_entries,
+                    'streak_event': new_streak_info['event_type'],
+                    'streak_frozen': user.streak_frozen,
+                    'freeze_count': user.freeze_count,
+                    'freezes_remaining': max(0, self.max_freezes - user.freeze_count),
+                    'new_achievements': [
+                        {
+                            'name': ACHIEVEMENTS[key]['name'],
+                            'description': ACHIEVEMENTS[key]['description'],
+                            'badge': ACHIEVEMENTS[key]['badge'],
+                            'streak_when_earned': new_streak_info['streak']
+                        }
+                        for key in new_achievement_keys
+                    ],
+                    'next_milestone': self._get_next_milestone(new_streak_info['streak']),
+                    'last_entry_date': entry_date.isoformat()
+                }
             
-            # Calculate new streak
-            previous_streak = user.current_streak
-            new_streak_info = self._calculate_new_streak(user, entry_date)
+            # Only once committed: no Redis round trip under the row lock, no unsaved streaks shown
+            if self.leaderboard is not None:
+                self.leaderboard.update(user_id, result['current_streak'], result['longest_streak'])
             
-            # Update user record
-            user = user_repo.update_user_streak(
-                user_id, 
-                new_streak_info['streak'], 
-                entry_date
-            )
+            logger.info(f"Streak updated for user {user_id}: {previous_streak} → {result['current_streak']}")
+            return result
             
-            # Log streak event
-            streak_repo.log_event(
-                user_id=user_id,
-                event_type=new_streak_info['event_type'],
-                streak_count=new_streak_info['streak'],
-                previous_streak=previous_streak,
-                metadata=new_streak_info.get('metadata', {})
-            )
+        except Exception as e:
+            logger.error(f"Failed to update streak for user {user_id}: {e}")
+            return self._create_error_result(user_id, str(e))
+    
+    def rebuild_streak_history(self, user_id: str, load_entry_dates: Callable[[], List[date]]) -> Dict:
+        """
+        Rebuild a user's streak counters and events by replaying every entry date in order
+        
+        Used after importing back-dated entries, which would otherwise be applied
+        out of order. Achievements are checked once, against the longest streak.
+        Streak freezes are not replayed.
+        
+        Args:
+            user_id: User identifier
+            load_entry_dates: Returns the date of every entry the user has (existing and
+                imported), any order; called once the stats row is locked, so entries
+                saved concurrently are either in the replay or wait for it
             
-            # Check for new achievements
-            new_achievements = achievement_repo.check_and_award_achievements(
-                user_id, new_streak_info['streak']
-            )
+        Returns:
+            Dictionary with the rebuilt streak information
+        """
+        try:
+            with unit_of_work() as uow:
+                # Lock the stats row first so live streak updates wait for the rebuild
+                uow.users.get_streak_state_for_update(user_id)
+                entry_dates = sorted(load_entry_dates())
+                
+                state = SimpleNamespace(current_streak=0, last_entry_date=None, streak_frozen=False)
+                longest_streak = 0
+                events = []
+                
+                # Single pass over the sorted dates, reusing the live streak rules
+                for entry_date in entry_dates:
+                    info = self._calculate_new_streak(state, entry_date)
+                    events.append({
+                        'event_type': info['event_type'],
+                        'streak_count': info['streak'],
+                        'previous_streak': state.current_streak,
+                        'metadata': info.get('metadata', {}),
+                        'created_at': datetime.combine(entry_date, time.min)
+                    })
+                    state.current_streak = info['streak']
+                    state.last_entry_date = entry_date
+                    longest_streak = max(longest_streak, info['streak'])
+                
+                user = uow.users.set_streak_state(
+                    user_id, state.current_streak, longest_streak, len(entry_dates), state.last_entry_date
+                )
+                uow.streak_events.replace_entry_events(user_id, events)
+                new_achievements = uow.achievements.check_and_award_achievements(user, longest_streak)
+                
+                result = {
+                    'user_id': user_id,
+                    'current_streak': user.current_streak,
+                    'longest_streak': user.longest_streak,
+                    'total_entries': user.total_entries,
+                    'events_rebuilt': len(events),
+                    'new_achievements': [
+                        {
+                            'name': achievement.achievement_name,
+                            'description': achievement.description,
+                            'badge': achievement.badge_emoji,
+                            'streak_when_earned': achievement.streak_count_when_earned
+                        }
+                        for achievement in new_achievements
+                    ],
+                    'next_milestone': self._get_next_milestone(user.current_streak),
+                    'last_entry_date': state.last_entry_date.isoformat() if state.last_entry_date else None
+                }
             
-            result = {
-                'user_id': user_id,
-                'current_streak': new_streak_info['streak'],
-                'longest_streak': user.longest_streak,
-                'total_entries': user.total_entries,
-                'streak_event': new_streak_info['event_type'],
-                'streak_frozen': user.streak_frozen,
-                'freeze_count': user.freeze_count,
-                'freezes_remaining': max(0, self.max_freezes - user.freeze_count),
-                'new_achievements': [
-                    {
-                        'name': achievement.achievement_name,
-                        'description': achievement.description,
-                        'badge': achievement.badge_emoji,
-                        'streak_when_earned': achievement.streak_count_when_earned
-                    }
-                    for achievement in new_achievements
-                ],
-                'next_milestone': self._get_next_milestone(new_streak_info['streak']),
-                'last_entry_date': entry_date.isoformat()
-            }
+            if self.leaderboard is not None:
+                self.leaderboard.update(user_id, result['current_streak'], result['longest_streak'])
             
-            logger.info(f"Streak updated for user {user_id}: {previous_streak} → {new_streak_info['streak']}")
+            logger.info(f"Streak history rebuilt for user {user_id}: {len(events)} events, longest {longest_streak}")
             return result
             
         except Exception as e:
-            logger.error(f"Failed to update streak for user {user_id}: {e}")
+            logger.error(f"Failed to rebuild streak history for user {user_id}: {e}")
             return self._create_error_result(user_id, str(e))
     
     def _calculate_new_streak(self, user, entry_date: date) -> Dict:
@@ -186,38 +270,39 @@ class StreakManager:
             Dictionary with freeze result
         """
         try:
-            user_repo = get_user_repository()
-            
-            # Try to use freeze
-            success = user_repo.use_streak_freeze(user_id)
-            
-            if success:
-                user = user_repo.get_user_by_id(user_id)
+            with unit_of_work() as uow:
+                user_repo = uow.users
                 
-                # Log the freeze event
-                streak_repo = get_streak_event_repository()
-                streak_repo.log_event(
-                    user_id=user_id,
-                    event_type='frozen',
-                    streak_count=user.current_streak,
-                    metadata={'freeze_count': user.freeze_count}
-                )
+                # Try to use freeze
+                success = user_repo.use_streak_freeze(user_id)
                 
-                logger.info(f"Streak frozen for user {user_id}")
-                return {
-                    'success': True,
-                    'message': 'Streak frozen successfully!',
-                    'current_streak': user.current_streak,
-                    'freeze_count': user.freeze_count,
-                    'freezes_remaining': max(0, self.max_freezes - user.freeze_count)
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': 'No freezes available or user not found',
-                    'freeze_count': 0,
-                    'freezes_remaining': 0
-                }
+                if success:
+                    user = user_repo.get_user_by_id(user_id)
+                    
+                    # Log the freeze event
+                    streak_repo = uow.streak_events
+                    streak_repo.log_event(
+                        user_id=user_id,
+                        event_type='frozen',
+                        streak_count=user.current_streak,
+                        metadata={'freeze_count': user.freeze_count}
+                    )
+                    
+                    logger.info(f"Streak frozen for user {user_id}")
+                    return {
+                        'success': True,
+                        'message': 'Streak frozen successfully!',
+                        'current_streak': user.current_streak,
+                        'freeze_count': user.freeze_count,
+                        'freezes_remaining': max(0, self.max_freezes - user.freeze_count)
+                    }
+                else:
+                    return {
+                        'success': False,
+                        'message': 'No freezes available or user not found',
+                        'freeze_count': 0,
+                        'freezes_remaining': 0
+                    }
                 
         except Exception as e:
             logger.error(f"Failed to use freeze for user {user_id}: {e}")
@@ -239,47 +324,48 @@ class StreakManager:
             Dictionary with current streak information
         """
         try:
-            user_repo = get_user_repository()
-            achievement_repo = get_achievement_repository()
-            
-            user = user_repo.get_user_by_id(user_id)
-            if not user:
-                return self._create_empty_status(user_id)
-            
-            # Get achievements
-            achievements = achievement_repo.get_user_achievements(user_id)
-            
-            # Check if streak is at risk
-            days_since_last_entry = 0
-            if user.last_entry_date:
-                days_since_last_entry = (date.today() - user.last_entry_date).days
-            
-            streak_at_risk = days_since_last_entry >= 1 and not user.streak_frozen
-            
-            return {
-                'user_id': user_id,
-                'current_streak': user.current_streak,
-                'longest_streak': user.longest_streak,
-                'total_entries': user.total_entries,
-                'last_entry_date': user.last_entry_date.isoformat() if user.last_entry_date else None,
-                'days_since_last_entry': days_since_last_entry,
-                'streak_frozen': user.streak_frozen,
-                'freeze_count': user.freeze_count,
-                'freezes_remaining': max(0, self.max_freezes - user.freeze_count),
-                'streak_at_risk': streak_at_risk,
-                'next_milestone': self._get_next_milestone(user.current_streak),
-                'achievements': [
-                    {
-                        'name': achievement.achievement_name,
-                        'description': achievement.description,
-                        'badge': achievement.badge_emoji,
-                        'earned_at': achievement.earned_at.isoformat(),
-                        'streak_when_earned': achievement.streak_count_when_earned
-                    }
-                    for achievement in achievements
-                ],
-                'created_at': user.created_at.isoformat()
-            }
+            with unit_of_work() as uow:
+                user_repo = uow.users
+                achievement_repo = uow.achievements
+                
+                user = user_repo.get_user_by_id(user_id)
+                if not user:
+                    return self._create_empty_status(user_id)
+                
+                # Get achievements
+                achievements = achievement_repo.get_user_achievements(user_id)
+                
+                # Check if streak is at risk
+                days_since_last_entry = 0
+                if user.last_entry_date:
+                    days_since_last_entry = (date.today() - user.last_entry_date).days
+                
+                streak_at_risk = days_since_last_entry >= 1 and not user.streak_frozen
+                
+                return {
+                    'user_id': user_id,
+                    'current_streak': user.current_streak,
+                    'longest_streak': user.longest_streak,
+                    'total_entries': user.total_entries,
+                    'last_entry_date': user.last_entry_date.isoformat() if user.last_entry_date else None,
+                    'days_since_last_entry': days_since_last_entry,
+                    'streak_frozen': user.streak_frozen,
+                    'freeze_count': user.freeze_count,
+                    'freezes_remaining': max(0, self.max_freezes - user.freeze_count),
+                    'streak_at_risk': streak_at_risk,
+                    'next_milestone': self._get_next_milestone(user.current_streak),
+                    'achievements': [
+                        {
+                            'name': achievement.achievement_name,
+                            'description': achievement.description,
+                            'badge': achievement.badge_emoji,
+                            'earned_at': achievement.earned_at.isoformat(),
+                            'streak_when_earned': achievement.streak_count_when_earned
+                        }
+                        for achievement in achievements
+                    ],
+                    'created_at': user.created_at.isoformat()
+                }
             
         except Exception as e:
             logger.error(f"Failed to get streak status for user {user_id}: {e}")
@@ -297,48 +383,32 @@ class StreakManager:
             Dictionary with analytics data
         """
         try:
-            streak_repo = get_streak_event_repository()
-            
-            events = streak_repo.get_user_events(user_id, limit=100)
-            
-            # Filter events within the specified time period
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-            recent_events = [
-                event for event in events 
-                if event.created_at >= cutoff_date
-            ]
-            
-            # Calculate statistics
-            event_types = {}
-            streak_progression = []
-            
-            for event in recent_events:
-                event_type = event.event_type
-                event_types[event_type] = event_types.get(event_type, 0) + 1
+            with unit_of_work() as uow:
+                streak_repo = uow.streak_events
                 
-                streak_progression.append({
-                    'date': event.created_at.date().isoformat(),
-                    'streak_count': event.streak_count,
-                    'event_type': event_type
-                })
-            
-            # Calculate consistency metrics
-            total_events = len(recent_events)
-            continued_events = event_types.get('continued', 0)
-            broken_events = event_types.get('broken', 0)
-            
-            consistency_rate = (continued_events / total_events * 100) if total_events > 0 else 0
-            
-            return {
-                'user_id': user_id,
-                'analysis_period_days': days,
-                'total_events': total_events,
-                'event_breakdown': event_types,
-                'consistency_rate': round(consistency_rate, 2),
-                'streak_progression': streak_progression[-30:],  # Last 30 events
-                'average_streak_length': self._calculate_average_streak_length(events),
-                'longest_streak_in_period': max([e.streak_count for e in recent_events]) if recent_events else 0
-            }
+                # Aggregated in SQL over the (user_id, created_at) index
+                cutoff_date = datetime.utcnow() - timedelta(days=days)
+                event_types, longest_in_period = streak_repo.get_event_counts(user_id, cutoff_date)
+                streak_progression = streak_repo.get_streak_progression(user_id, cutoff_date, limit=30)
+                average_streak_length = streak_repo.get_average_run_length(user_id)
+                
+                # Calculate consistency metrics
+                total_events = sum(event_types.values())
+                continued_events = event_types.get('continued', 0)
+                broken_events = event_types.get('broken', 0)
+                
+                consistency_rate = (continued_events / total_events * 100) if total_events > 0 else 0
+                
+                return {
+                    'user_id': user_id,
+                    'analysis_period_days': days,
+                    'total_events': total_events,
+                    'event_breakdown': event_types,
+                    'consistency_rate': round(consistency_rate, 2),
+                    'streak_progression': streak_progression,  # Last 30 events
+                    'average_streak_length': average_streak_length,
+                    'longest_streak_in_period': longest_in_period
+                }
             
         except Exception as e:
             logger.error(f"Failed to get analytics for user {user_id}: {e}")
@@ -346,39 +416,18 @@ class StreakManager:
     
     def _get_next_milestone(self, current_streak: int) -> Optional[Dict]:
         """Get the next milestone achievement"""
-        for achievement_key, info in ACHIEVEMENTS.items():
-            if current_streak < info['streak_required']:
-                return {
-                    'name': info['name'],
-                    'badge': info['badge'],
-                    'required_streak': info['streak_required'],
-                    'days_remaining': info['streak_required'] - current_streak,
-                    'progress_percentage': round((current_streak / info['streak_required']) * 100, 1)
-                }
-        return None  # Already achieved all milestones
-    
-    def _calculate_average_streak_length(self, events: List) -> float:
-        """Calculate average streak length from events"""
-        if not events:
-            return 0.0
+        position = bisect.bisect_right(MILESTONE_THRESHOLDS, current_streak)
+        if position == len(MILESTONE_THRESHOLDS):
+            return None  # Already achieved all milestones
         
-        streak_lengths = []
-        current_streak_start = None
-        
-        for event in reversed(events):  # Process chronologically
-            if event.event_type == 'started':
-                current_streak_start = 1
-            elif event.event_type == 'continued' and current_streak_start is not None:
-                current_streak_start += 1
-            elif event.event_type == 'broken' and current_streak_start is not None:
-                streak_lengths.append(current_streak_start)
-                current_streak_start = None
-        
-        # Add current ongoing streak if exists
-        if current_streak_start is not None:
-            streak_lengths.append(current_streak_start)
-        
-        return sum(streak_lengths) / len(streak_lengths) if streak_lengths else 0.0
+        info = ACHIEVEMENTS[MILESTONE_KEYS[position]]
+        return {
+            'name': info['name'],
+            'badge': info['badge'],
+            'required_streak': info['streak_required'],
+            'days_remaining': info['streak_required'] - current_streak,
+            'progress_percentage': round((current_streak / info['streak_required']) * 100, 1)
+        }
     
     def _create_empty_status(self, user_id: str) -> Dict:
         """Create empty status for new user"""
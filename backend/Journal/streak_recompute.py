@@ -0,0 +1,222 @@
+# backend/journal/streak_recompute.py
+# Recompute every user's streak state from their entry dates (audit or rebuild)
+
+import argparse
+import itertools
+import logging
+import multiprocessing
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.Journal.config import Config
+from Database.Journal import (
+    get_journal_repository, unit_of_work, achievement_keys,
+    MILESTONE_THRESHOLDS, MILESTONE_REACHED_MASKS
+)
+
+logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
+logger = logging.getLogger(__name__)
+
+_THRESHOLDS = np.asarray(MILESTONE_THRESHOLDS, dtype=np.int64)
+_REACHED_MASKS = np.asarray(MILESTONE_REACHED_MASKS, dtype=np.int64)
+
+
+def compute_streaks(user_index: np.ndarray, days: np.ndarray, entry_counts: np.ndarray,
+                    continue_gap_days: int = 1) -> Dict[str, np.ndarray]:
+    """
+    Replay the streak rules for many users at once with array operations
+
+    Args:
+        user_index: User position of each distinct entry day, sorted by user then day
+        days: Day numbers (days since the epoch), ascending within each user
+        entry_counts: Number of entries written on each of those days
+        continue_gap_days: Largest gap in days that keeps a streak going
+            (1 = consecutive days only, as without a freeze)
+
+    Returns:
+        Per-day 'streaks', plus per-user 'users' (user positions), 'current_streak',
+        'longest_streak', 'total_entries', 'last_day' and 'achievements_mask'
+    """
+    n = len(days)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return {key: empty for key in (
+            'streaks', 'users', 'current_streak', 'longest_streak',
+            'total_entries', 'last_day', 'achievements_mask'
+        )}
+
+    first = np.ones(n, dtype=bool)
+    first[1:] = user_index[1:] != user_index[:-1]
+    gaps = np.zeros(n, dtype=np.int64)
+    gaps[1:] = np.diff(days)
+
+    # A run starts at each user's first day and after every gap too long to bridge
+    run_start = first | (gaps > continue_gap_days)
+    positions = np.arange(n)
+    streaks = positions - np.maximum.accumulate(np.where(run_start, positions, 0)) + 1
+
+    user_starts = np.flatnonzero(first)
+    user_ends = np.append(user_starts[1:], n) - 1
+    longest = np.maximum.reduceat(streaks, user_starts)
+    totals = np.add.reduceat(entry_counts, user_starts)
+
+    return {
+        'streaks': streaks,
+        'users': user_index[user_starts],
+        'current_streak': streaks[user_ends],
+        'longest_streak': longest,
+        'total_entries': totals,
+        'last_day': days[user_ends],
+        'achievements_mask': _REACHED_MASKS[np.searchsorted(_THRESHOLDS, longest, side='right')]
+    }
+
+
+def recompute_chunk(user_ids: List[Any], continue_gap_days: int = 1, apply: bool = False) -> Dict[str, int]:
+    """
+    Recompute one chunk of users, comparing with (and optionally overwriting) user_stats
+
+    Args:
+        user_ids: Users to recompute
+        continue_gap_days: See compute_streaks
+        apply: Write the recomputed counters and missing achievements
+
+    Returns:
+        Counts of users seen, users whose stored state differed and achievements awarded
+    """
+    rows = get_journal_repository().get_entry_day_counts(user_ids)
+    if not rows:
+        return {'users': 0, 'mismatched': 0, 'awarded': 0}
+
+    positions = {user_id: i for i, user_id in enumerate(user_ids)}
+    user_index = np.fromiter((positions[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+    days = np.array([row[1] for row in rows], dtype='datetime64[D]').astype(np.int64)
+    entry_counts = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+    order = np.lexsort((days, user_index))
+
+    result = compute_streaks(user_index[order], days[order], entry_counts[order], continue_gap_days)
+    last_days = result['last_day'].astype('datetime64[D]').tolist()
+
+    with unit_of_work() as uow:
+        # Keyed by str: MongoDB may hold user ids as strings, user_stats as integers
+        stored = {str(user_id): row for user_id, row in uow.users.get_streak_states(user_ids).items()}
+        states, awards, mismatched = [], [], 0
+        for i, position in enumerate(result['users'].tolist()):
+            user_id = user_ids[position]
+            state = {
+                'user_id': user_id,
+                'current_streak': int(result['current_streak'][i]),
+                'longest_streak': int(result['longest_streak'][i]),
+                'total_entries': int(result['total_entries'][i]),
+                'last_entry_date': last_days[i],
+                'achievements_mask': int(result['achievements_mask'][i])
+            }
+            previous = stored.get(str(user_id))
+            earned = previous.achievements_mask if previous is not None else 0
+            if previous is None or (
+                previous.current_streak, previous.longest_streak,
+                previous.total_entries, previous.last_entry_date, earned
+            ) != (
+                state['current_streak'], state['longest_streak'],
+                state['total_entries'], state['last_entry_date'], state['achievements_mask']
+            ):
+                mismatched += 1
+            states.append(state)
+            awards.extend(
+                (user_id, key, state['longest_streak'])
+                for key in achievement_keys(state['achievements_mask'] & ~earned)
+            )
+
+        if apply:
+            uow.users.bulk_upsert_streak_states(states)
+            uow.achievements.insert_awards(awards)
+
+    return {'users': len(states), 'mismatched': mismatched, 'awarded': len(awards)}
+
+
+def _recompute_task(args) -> Dict[str, int]:
+    """Pool entry point"""
+    return recompute_chunk(*args)
+
+
+class StreakRecomputeJob:
+    """Recomputes user_stats from journal_entries for every user, chunked across processes"""
+
+    def __init__(self, workers: int = Config.STREAK_RECOMPUTE_WORKERS,
+                 chunk_users: int = Config.STREAK_RECOMPUTE_CHUNK_USERS,
+                 continue_gap_days: int = 1):
+        self.workers = max(1, workers)
+        self.chunk_users = chunk_users
+        self.continue_gap_days = continue_gap_days
+        self.journal_repo = get_journal_repository()
+
+    def run(self, apply: bool = False, limit_chunks: Optional[int] = None) -> Dict:
+        """
+        Recompute every user with entries
+
+        Streak freezes are user actions rather than entry dates, so they are not
+        replayed; a frozen-and-resumed streak shows up as a mismatch unless
+        continue_gap_days covers the gap.
+
+        Args:
+            apply: Write the results (otherwise only report mismatches)
+            limit_chunks: Stop after this many chunks (useful for trial runs)
+
+        Returns:
+            Dictionary with job statistics
+        """
+        started = time.perf_counter()
+        totals = {'users': 0, 'mismatched': 0, 'awarded': 0}
+        # islice stops paging user ids once the limit is reached
+        batches = itertools.islice(self.journal_repo.iter_user_id_batches(self.chunk_users), limit_chunks)
+        tasks = ((user_ids, self.continue_gap_days, apply) for user_ids in batches)
+
+        pool = None
+        if self.workers > 1:
+            # pymongo clients are not fork-safe
+            pool = multiprocessing.get_context("spawn").Pool(self.workers)
+        try:
+            results = pool.imap_unordered(_recompute_task, tasks) if pool else map(_recompute_task, tasks)
+            for chunk_totals in results:
+                for key, value in chunk_totals.items():
+                    totals[key] += value
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"📦 {totals['users']} users recomputed, {totals['mismatched']} mismatched "
+                    f"({totals['users'] / elapsed:.0f} users/s)"
+                )
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"✅ Streak recompute finished: {totals['users']} users in {elapsed:.1f}s")
+        return {**totals, 'applied': apply, 'elapsed_seconds': round(elapsed, 2)}
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Recompute streak state from journal entry dates")
+    parser.add_argument("--apply", action="store_true",
+                        help="Write the recomputed state (default: audit only)")
+    parser.add_argument("--workers", type=int, default=Config.STREAK_RECOMPUTE_WORKERS,
+                        help="Number of worker processes")
+    parser.add_argument("--chunk-users", type=int, default=Config.STREAK_RECOMPUTE_CHUNK_USERS,
+                        help="Users per worker task")
+    parser.add_argument("--continue-gap-days", type=int, default=1,
+                        help="Largest gap in days that keeps a streak going")
+    parser.add_argument("--limit-chunks", type=int, default=None,
+                        help="Stop after this many chunks")
+    args = parser.parse_args()
+
+    job = StreakRecomputeJob(workers=args.workers, chunk_users=args.chunk_users,
+                             continue_gap_days=args.continue_gap_days)
+    print(job.run(apply=args.apply, limit_chunks=args.limit_chunks))
+
+
+if __name__ == "__main__":
+    main()
+
+# run using: python -m backend.Journal.streak_recompute --workers 8 --apply
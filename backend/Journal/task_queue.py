@@ -0,0 +1,194 @@
+# backend/journal/task_queue.py
+# Durable SQLite-backed queue for deferred journal analysis
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class AnalysisTaskQueue:
+    """Persistent work queue for entries waiting on model analysis"""
+
+    def __init__(self, db_path: str, lease_seconds: int = 300, max_attempts: int = 5,
+                 max_backoff_seconds: int = 300):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.max_backoff_seconds = max_backoff_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._setup()
+
+    def _setup(self):
+        """Create the task table; WAL keeps readers from blocking the worker"""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    entry_id TEXT NOT NULL UNIQUE,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_error TEXT
+                )
+            """)
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(analysis_tasks)")}
+            if 'priority' not in columns:
+                self._conn.execute(
+                    "ALTER TABLE analysis_tasks ADD COLUMN priority INTEGER NOT NULL DEFAULT 0"
+                )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_tasks_ready "
+                "ON analysis_tasks (status, available_at)"
+            )
+
+    def enqueue(self, entry_id: str, payload: Dict[str, Any], priority: int = 0):
+        """Add an entry to the queue (re-enqueueing the same entry is a no-op)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO analysis_tasks (entry_id, payload, priority, available_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (entry_id, json.dumps(payload, default=str), priority, now, now)
+            )
+
+    def claim(self, limit: int, max_priority: int = None) -> List[Dict[str, Any]]:
+        """
+        Lease up to `limit` ready tasks
+
+        Tasks whose lease expired (e.g. the worker crashed) become claimable again,
+        counting the lost lease as an attempt, so a task that keeps crashing the
+        worker is parked after max_attempts. Lower priority values are claimed first.
+
+        Args:
+            limit: Maximum number of tasks to claim
+            max_priority: Only claim tasks up to this priority value
+
+        Returns:
+            List of tasks with id, entry_id, attempts and decoded payload
+        """
+        now = time.time()
+        query = (
+            "SELECT id, entry_id, payload, status, attempts FROM analysis_tasks "
+            "WHERE status IN ('pending', 'processing') AND available_at <= ?"
+        )
+        params = [now]
+        if max_priority is not None:
+            query += " AND priority <= ?"
+            params.append(max_priority)
+        query += " ORDER BY priority, id LIMIT ?"
+        params.append(limit)
+
+        claimed, expired = [], []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row in self._conn.execute(query, params).fetchall():
+                    # Still 'processing' here means the previous lease ran out
+                    attempts = row['attempts'] + (row['status'] == 'processing')
+                    if attempts >= self.max_attempts:
+                        expired.append((attempts, row['id']))
+                    else:
+                        claimed.append((row, attempts))
+                if expired:
+                    self._conn.executemany(
+                        "UPDATE analysis_tasks SET status = 'failed', attempts = ?, "
+                        "last_error = 'Lease expired' WHERE id = ?",
+                        expired
+                    )
+                if claimed:
+                    self._conn.executemany(
+                        "UPDATE analysis_tasks SET status = 'processing', attempts = ?, available_at = ? "
+                        "WHERE id = ?",
+                        [(attempts, now + self.lease_seconds, row['id']) for row, attempts in claimed]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return [
+            {
+                'id': row['id'],
+                'entry_id': row['entry_id'],
+                'attempts': attempts,
+                'payload': json.loads(row['payload'])
+            }
+            for row, attempts in claimed
+        ]
+
+    def complete(self, task_ids: List[int]):
+        """Remove finished tasks"""
+        if not task_ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM analysis_tasks WHERE id = ?", [(task_id,) for task_id in task_ids]
+            )
+
+    def fail(self, task_id: int, error: str, payload: Optional[Dict[str, Any]] = None,
+             count_attempt: bool = True):
+        """
+        Schedule a retry with exponential backoff (capped at max_backoff_seconds),
+        or park the task after max attempts
+
+        Args:
+            task_id: Task to retry
+            error: Reason, kept as last_error
+            payload: Replacement payload for the retry (None keeps the current one)
+            count_attempt: False for outages that say nothing about the task (e.g. the
+                model being unavailable): the task is retried after max_backoff_seconds
+                and never parked
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, payload FROM analysis_tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+            if row is None:
+                return
+            if count_attempt:
+                attempts = row['attempts'] + 1
+                delay = min(2 ** attempts, self.max_backoff_seconds)
+            else:
+                attempts = row['attempts']
+                delay = self.max_backoff_seconds
+            status = 'failed' if attempts >= self.max_attempts else 'pending'
+            encoded = row['payload'] if payload is None else json.dumps(payload, default=str)
+            self._conn.execute(
+                "UPDATE analysis_tasks SET status = ?, attempts = ?, available_at = ?, last_error = ?, "
+                "payload = ? WHERE id = ?",
+                (status, attempts, time.time() + delay, error[:500], encoded, task_id)
+            )
+
+    def depth(self, max_priority: int = None) -> int:
+        """Number of tasks waiting or in progress, optionally only up to a priority"""
+        query = "SELECT COUNT(*) FROM analysis_tasks WHERE status IN ('pending', 'processing')"
+        params = ()
+        if max_priority is not None:
+            query += " AND priority <= ?"
+            params = (max_priority,)
+
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return row[0]
+
+    def get_task(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Get queue state for an entry, if it is still queued"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, attempts, last_error FROM analysis_tasks WHERE entry_id = ?",
+                (entry_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
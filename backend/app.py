@@ -5,10 +5,12 @@
 
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_jwt_auth.exceptions import AuthJWTException
 import auth_config
+from backend.metrics import registry as metrics_registry
+from Database.Journal import request_scope, ensure_streak_constraints
 
 # import routes
 from backend.Auth import routes as auth_routes
@@ -27,6 +29,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# one Postgres session per request, shared by the repositories and always closed
+@app.middleware("http")
+async def database_request_scope(request: Request, call_next):
+    with request_scope():
+        return await call_next(request)
+
 # Global exception handler for fastapi_jwt_auth exceptions
 @app.exception_handler(AuthJWTException)
 def authjwt_exception_handler(request, exc: AuthJWTException):
@@ -39,6 +47,27 @@ app.include_router(auth_routes.router)
 app.include_router(calculator_routes.router)  #  register calculator API
 app.include_router(journal_routes.router) #register journal backend API
 
+# background workers
+@app.on_event("startup")
+def start_background_workers():
+    ensure_streak_constraints()
+    journal_routes.service.journal_repo.ensure_indexes()
+    journal_routes.service.reminder_repo.ensure_indexes()
+    journal_routes.service.rebuild_leaderboard()
+    journal_routes.service.similarity_index.warm_global()
+    journal_routes.service.start_analysis_worker()
+    journal_routes.service.start_streak_jobs()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    journal_routes.service.stop_streak_jobs()
+    journal_routes.service.stop_analysis_worker()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of in-process metrics"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 def root():
     return {"message": "Welcome to Eco-App Backend!"}
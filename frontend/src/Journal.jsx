@@ -68,7 +68,7 @@ export default function Journal() {
   async function loadEntries(id) {
     if (!id) return;
     try {
-      const res = await fetch(`${API_BASE}/journal/entries/${id}`, {
+      const res = await fetch(`${API_BASE}/journal/entries/${id}?view=summary`, {
         method: "GET",
         headers: { "Content-Type": "application/json" },
       });